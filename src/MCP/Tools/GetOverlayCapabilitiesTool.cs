@@ -1,5 +1,6 @@
 using System.ComponentModel;
 using ModelContextProtocol.Server;
+using OverlayCompanion.Services;
 
 namespace OverlayCompanion.MCP.Tools;
 
@@ -9,9 +10,11 @@ namespace OverlayCompanion.MCP.Tools;
 [McpServerToolType]
 public static class GetOverlayCapabilitiesTool
 {
-    [McpServerTool, Description("Get overlay engine capabilities: opacity, color formats, click-through, compositor")]
-    public static string GetOverlayCapabilities()
+    [McpServerTool, Description("Get overlay engine capabilities: opacity, color formats, click-through, compositor, and the capture/monitor/cursor/input methods that work in this session")]
+    public static async Task<string> GetOverlayCapabilities(ICapabilityProbeService capabilityProbe)
     {
+        // Shares the startup probe (or the stored profile) rather than probing again
+        var profile = await capabilityProbe.GetProfileAsync();
         var compositor = Environment.GetEnvironmentVariable("WAYLAND_DISPLAY") != null ? "wayland" : "unknown";
 
         var payload = new
@@ -22,6 +25,14 @@ public static class GetOverlayCapabilitiesTool
             opacity_range = new { min = 0.0, max = 1.0, default_value = 0.5 },
             color_formats = new[] { "#RRGGBB", "#RRGGBBAA", "#RGB", "0xRRGGBB", "named (fallback)" },
             layering = new { uses_layer_shell = false, notes = "web-only viewer; native desktop layer-shell is disabled in this build" },
+            session = new { type = profile.SessionType, compositor = profile.Compositor, profile_key = profile.Key, probed_at = profile.ProbedAt },
+            methods = profile.Methods.ToDictionary(
+                kv => kv.Key,
+                kv => new
+                {
+                    best = profile.Ranked(kv.Key).FirstOrDefault(),
+                    ranked = kv.Value.Select(m => new { name = m.Name, available = m.Available, latency_ms = m.LatencyMs, error = m.Error })
+                }),
             coordinates = new { origin = "global", monitor_relative_under_layer_shell = true, tool_inputs = "tools accept monitor-relative coords; auto-adjust to global when not using layer-shell" }
         };
         // Coordinate system notes: global coords everywhere; when layer-shell is active the window is per-monitor and drawing
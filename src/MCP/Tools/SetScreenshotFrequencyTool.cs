@@ -12,13 +12,14 @@ namespace OverlayCompanion.MCP.Tools;
 [McpServerToolType]
 public static class SetScreenshotFrequencyTool
 {
-    [McpServerTool, Description("Configure automatic screenshot capture frequency")]
+    [McpServerTool, Description("Configure automatic screenshot capture frequency. Captured frames are kept in a ring buffer; take_screenshot with max_age_ms reuses the latest one")]
     [RequiresUnreferencedCode("JSON serialization may require types that cannot be statically analyzed")]
     public static async Task<string> SetScreenshotFrequency(
+        ICaptureSchedulerService captureScheduler,
         IScreenCaptureService screenCaptureService,
         IModeManager modeManager,
         [Description("Screenshot mode (off, interval, on_change)")] string mode,
-        [Description("Interval in milliseconds for interval mode")] int intervalMs = 1000)
+        [Description("Interval in milliseconds for interval mode, and between change checks for on_change")] int intervalMs = 1000)
     {
         // Check if action is allowed in current mode
         if (!modeManager.CanExecuteAction("set_screenshot_frequency"))
@@ -31,33 +32,39 @@ public static class SetScreenshotFrequencyTool
             throw new ArgumentException("mode parameter is required");
         }
 
-        // Validate mode
-        var validModes = new[] { "off", "interval", "on_change" };
-        if (!validModes.Contains(mode.ToLower()))
+        // Fail here rather than on every tick when no source yields full frames
+        // (e.g. only scaled Wayland tool captures that cannot be cropped)
+        if (mode.ToLowerInvariant() is "interval" or "on_change")
         {
-            throw new ArgumentException($"Invalid mode: {mode}. Valid modes are: {string.Join(", ", validModes)}");
+            var frame = await screenCaptureService.CaptureFrameAsync(maxAgeMs: intervalMs);
+            if (frame == null && !screenCaptureService.CanCaptureFrames)
+            {
+                throw new InvalidOperationException("Scheduled capture is not available: no capture source produces full frames that can be decoded and cropped to the monitor layout");
+            }
         }
 
-        // Validate interval
-        if (intervalMs < 100)
-        {
-            intervalMs = 100; // Minimum 100ms to prevent system overload
-        }
-
-        // TODO: Implement automatic screenshot capture service
-        // For now, just validate and return success (mock implementation)
-        var success = true;
-        var appliedIntervalMs = intervalMs;
-
-        Console.WriteLine($"Screenshot frequency set to {mode} mode with {appliedIntervalMs}ms interval");
+        // Validates the mode; intervals below 100ms are raised to prevent system overload
+        captureScheduler.Configure(mode, intervalMs);
+        var stats = captureScheduler.Stats;
 
         // Return JSON string response
         var response = new
         {
-            ok = success,
-            mode = mode.ToLower(),
-            applied_interval_ms = appliedIntervalMs,
-            service_configured = success
+            ok = true,
+            mode = captureScheduler.Mode,
+            applied_interval_ms = captureScheduler.IntervalMs,
+            service_configured = true,
+            buffer_capacity = captureScheduler.Capacity,
+            latest_frame_id = captureScheduler.LatestFrameId,
+            stats = new
+            {
+                ticks = stats.Ticks,
+                captured = stats.Captured,
+                unchanged = stats.Unchanged,
+                skipped_busy = stats.SkippedBusy,
+                failed = stats.Failed,
+                stopped_reason = stats.StoppedReason
+            }
         };
 
         return System.Text.Json.JsonSerializer.Serialize(response);
@@ -13,15 +13,21 @@ namespace OverlayCompanion.MCP.Tools;
 [McpServerToolType]
 public static class TakeScreenshotTool
 {
-    [McpServerTool, Description("Take a screenshot of the screen or a specific region")]
+    // Above this share of changed pixels a delta costs about as much as a keyframe
+    private const double MaxDeltaFraction = 0.5;
+
+    [McpServerTool, Description("Take a screenshot of the screen or a specific region. Pass since_frame_id (0 to start) to get only the tiles that changed since that frame")]
     [RequiresUnreferencedCode("JSON serialization may require types that cannot be statically analyzed")]
     public static async Task<string> TakeScreenshot(
         IScreenCaptureService screenCaptureService,
         IModeManager modeManager,
+        ICaptureSchedulerService captureScheduler,
         [Description("X coordinate of the region to capture (optional)")] int? x = null,
         [Description("Y coordinate of the region to capture (optional)")] int? y = null,
         [Description("Width of the region to capture (optional)")] int? width = null,
-        [Description("Height of the region to capture (optional)")] int? height = null)
+        [Description("Height of the region to capture (optional)")] int? height = null,
+        [Description("Reuse the last full-screen frame if it is at most this many milliseconds old; regions are cropped from it in memory (optional)")] int? max_age_ms = null,
+        [Description("Return only tiles changed since this frame_id from a previous response; a full keyframe is returned if that frame is no longer kept (optional, full screen only)")] long? since_frame_id = null)
     {
         // Check if action is allowed in current mode
         if (!modeManager.CanExecuteAction("take_screenshot"))
@@ -36,8 +42,22 @@ public static class TakeScreenshotTool
             region = new ScreenRegion(x.Value, y.Value, width.Value, height.Value);
         }
 
+        if (since_frame_id.HasValue)
+        {
+            if (region != null)
+            {
+                throw new ArgumentException("since_frame_id cannot be combined with a region");
+            }
+            var delta = await TakeDeltaScreenshot(screenCaptureService, captureScheduler, since_frame_id.Value, max_age_ms);
+            if (delta != null)
+            {
+                return delta;
+            }
+            // No in-process frame to diff (undecodable tool output); fall through to a plain screenshot
+        }
+
         // Capture screenshot
-        var screenshot = await screenCaptureService.CaptureScreenAsync(region, region == null);
+        var screenshot = await screenCaptureService.CaptureScreenAsync(region, region == null, max_age_ms);
 
         // Return JSON string response
         var response = new
@@ -54,9 +74,65 @@ public static class TakeScreenshotTool
             } : null,
             monitor_index = screenshot.MonitorIndex,
             display_scale = screenshot.DisplayScale,
+            captured_at = screenshot.Timestamp,
+            from_cache = screenshot.FromCache,
             viewport_scroll = new { x = 0, y = 0 }
         };
 
         return System.Text.Json.JsonSerializer.Serialize(response);
     }
+
+    private static async Task<string?> TakeDeltaScreenshot(
+        IScreenCaptureService screenCaptureService,
+        ICaptureSchedulerService captureScheduler,
+        long sinceFrameId,
+        int? maxAgeMs)
+    {
+        var frame = await screenCaptureService.CaptureFrameAsync(maxAgeMs);
+        if (frame == null)
+        {
+            return null;
+        }
+
+        // Unchanged captures map to the already stored frame and keep its id
+        var current = captureScheduler.Register(frame);
+        var image = current.Frame;
+        var baseFrame = captureScheduler.GetFrame(sinceFrameId);
+        var dirty = baseFrame != null ? current.Blocks.DirtyRegionsSince(baseFrame.Blocks) : null;
+        var dirtyPixels = dirty?.Sum(r => (long)r.Width * r.Height) ?? 0;
+        var keyframe = dirty == null || dirtyPixels > MaxDeltaFraction * image.Width * image.Height;
+
+        var tiles = keyframe
+            ? new List<object>()
+            : dirty!.Select(r => (object)new
+            {
+                x = r.X,
+                y = r.Y,
+                width = r.Width,
+                height = r.Height,
+                image_base64 = Convert.ToBase64String(
+                    image.Crop(new ScreenRegion(image.OriginX + r.X, image.OriginY + r.Y, r.Width, r.Height))!.EncodePng())
+            }).ToList();
+
+        var response = new
+        {
+            frame_id = current.Id,
+            base_frame_id = sinceFrameId,
+            keyframe,
+            keyframe_reason = !keyframe ? null
+                : baseFrame == null ? "base frame not available"
+                : dirty == null ? "frame size changed"
+                : "most of the screen changed",
+            image_base64 = keyframe ? Convert.ToBase64String(image.EncodePng()) : null,
+            width = image.Width,
+            height = image.Height,
+            origin = new { x = image.OriginX, y = image.OriginY },
+            tile_size = BlockGrid.BlockSize,
+            tiles,
+            changed_pixels = keyframe ? (long)image.Width * image.Height : dirtyPixels,
+            captured_at = image.Timestamp
+        };
+
+        return System.Text.Json.JsonSerializer.Serialize(response);
+    }
 }
@@ -29,6 +29,7 @@ public class Screenshot
     public int MonitorIndex { get; set; }
     public double DisplayScale { get; set; } = 1.0;
     public DateTime Timestamp { get; set; } = DateTime.UtcNow;
+    public bool FromCache { get; set; }
     public ScreenRegion? CaptureRegion { get; set; }
 
     public string ToBase64() => Convert.ToBase64String(ImageData);
@@ -71,6 +71,11 @@ public class Program
         builder.Services.AddSingleton<ISettingsService, SettingsService>();
         builder.Services.AddSingleton<IClipboardBridgeService, ClipboardBridgeService>();
         builder.Services.AddSingleton<IConnectionManagementService, ConnectionManagementService>();
+        builder.Services.AddSingleton<ICapabilityProbeService, CapabilityProbeService>();
+        builder.Services.AddSingleton<ICaptureSchedulerService, CaptureSchedulerService>();
+        // Nothing can advance a virtual clock here (/debug/time/advance is HTTP
+        // only), so temporary overlays would never expire
+        builder.Services.AddSingleton(TimeProvider.System);
 
         // Add MCP server with official SDK using stdio transport (standard for MCP servers)
         builder.Services
@@ -80,7 +85,12 @@ public class Program
 
         var host = builder.Build();
 
+        // Probe capture/monitor/cursor/input tools in the background (or load the stored profile)
+        _ = host.Services.GetRequiredService<ICapabilityProbeService>().GetProfileAsync();
+
         var logger = host.Services.GetRequiredService<ILogger<Program>>();
+        if (VirtualTimeProvider.IsRequested)
+            logger.LogWarning("OC_VIRTUAL_TIME=1 is ignored with stdio transport; overlay timers use the system clock");
         logger.LogWarning("Starting Overlay Companion MCP Server (DEPRECATED stdio transport)...");
         logger.LogWarning("STDIO transport is deprecated. Please use HTTP transport (default) for better performance and features.");
         logger.LogInformation("Server will listen for stdio MCP connections from Jan.ai or other MCP clients");
@@ -116,8 +126,12 @@ public class Program
         builder.Services.AddSingleton<ISettingsService, SettingsService>();
         builder.Services.AddSingleton<IClipboardBridgeService, ClipboardBridgeService>();
         builder.Services.AddSingleton<IConnectionManagementService, ConnectionManagementService>();
+        builder.Services.AddSingleton<ICapabilityProbeService, CapabilityProbeService>();
+        builder.Services.AddSingleton<ICaptureSchedulerService, CaptureSchedulerService>();
         builder.Services.AddSingleton<UpdateService>();
         builder.Services.AddSingleton<IOverlayEventBroadcaster, OverlayEventBroadcaster>();
+        var overlayTime = CreateOverlayTimeProvider();
+        builder.Services.AddSingleton(overlayTime);
         builder.Services.AddHttpClient();
 
         // Register KasmVNC integration service
@@ -175,6 +189,9 @@ public class Program
 
         var app = builder.Build();
 
+        // Probe capture/monitor/cursor/input tools in the background (or load the stored profile)
+        _ = app.Services.GetRequiredService<ICapabilityProbeService>().GetProfileAsync();
+
         var logger = app.Services.GetRequiredService<ILogger<Program>>();
         logger.LogInformation("Starting Overlay Companion with Native HTTP Transport (Primary)...");
         logger.LogInformation("HTTP transport provides multi-client support, streaming, web integration, and image handling");
@@ -185,6 +202,22 @@ public class Program
         // Enable CORS
         app.UseCors();
 
+        // Server-Timing lets clients separate server handling time from transport.
+        // MCP responses start streaming only once the tool result is written, so
+        // the header covers the whole tool call.
+        app.Use(async (context, next) =>
+        {
+            var stopwatch = System.Diagnostics.Stopwatch.StartNew();
+            context.Response.OnStarting(() =>
+            {
+                context.Response.Headers["Server-Timing"] = string.Create(
+                    System.Globalization.CultureInfo.InvariantCulture,
+                    $"app;dur={stopwatch.Elapsed.TotalMilliseconds:F3}");
+                return Task.CompletedTask;
+            });
+            await next();
+        });
+
         // WebSocket for overlay events
         app.MapOverlayWebSockets();
 
@@ -206,6 +239,36 @@ public class Program
             return Results.Json(new { ok = true, overlay_id = id });
         });
 
+        // Test control surface for the virtual overlay clock; only mapped when
+        // OC_VIRTUAL_TIME=1, so production servers never expose it
+        if (overlayTime is VirtualTimeProvider virtualTime)
+        {
+            logger.LogWarning("OC_VIRTUAL_TIME=1: overlay timers run on virtual time; advance via POST /debug/time/advance?ms=N");
+
+            app.MapGet("/debug/time", () => Results.Json(new
+            {
+                virtual_time = true,
+                now = virtualTime.GetUtcNow(),
+                pending_timers = virtualTime.PendingTimers
+            }));
+
+            app.MapPost("/debug/time/advance", (int? ms) =>
+            {
+                if (ms is null or < 0)
+                {
+                    return Results.BadRequest(new { error = "ms must be a non-negative integer" });
+                }
+                var fired = virtualTime.Advance(TimeSpan.FromMilliseconds(ms.Value));
+                return Results.Json(new
+                {
+                    advanced_ms = ms.Value,
+                    fired,
+                    now = virtualTime.GetUtcNow(),
+                    pending_timers = virtualTime.PendingTimers
+                });
+            });
+        }
+
         // Map MCP endpoints (native HTTP transport with streaming support)
         // Preferred root path "/" for MCP per current policy
         app.MapMcp("/");
@@ -371,6 +434,12 @@ public class Program
         }
     }
 
+    // HTTP overlay clock: virtual (advanced via /debug/time/advance) when OC_VIRTUAL_TIME=1
+    private static TimeProvider CreateOverlayTimeProvider()
+    {
+        return VirtualTimeProvider.IsRequested ? new VirtualTimeProvider() : TimeProvider.System;
+    }
+
     // Smoke-test hooks: write readiness file if requested (web-only)
     private static void ConfigureSmokeTestHooks()
     {
@@ -0,0 +1,432 @@
+using System.Diagnostics;
+using System.Text.Json;
+using Microsoft.Extensions.Logging;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// One detection method (an external tool) as measured by the probe
+/// </summary>
+public sealed class ProbedMethod
+{
+    public string Name { get; set; } = string.Empty;
+    public bool Available { get; set; }
+    public double? LatencyMs { get; set; }
+    public string? Error { get; set; }
+}
+
+/// <summary>
+/// Working methods per category for one session type and compositor,
+/// best first
+/// </summary>
+public sealed class CapabilityProfile
+{
+    public string SessionType { get; set; } = string.Empty;
+    public string Compositor { get; set; } = string.Empty;
+    public DateTime ProbedAt { get; set; }
+    public Dictionary<string, List<ProbedMethod>> Methods { get; set; } = new();
+
+    public string Key => ProfileKey(SessionType, Compositor);
+
+    public static string ProfileKey(string sessionType, string compositor) => $"{sessionType}/{compositor}";
+
+    public IReadOnlyList<string> Ranked(string category) =>
+        Methods.TryGetValue(category, out var methods)
+            ? methods.Where(m => m.Available).Select(m => m.Name).ToList()
+            : Array.Empty<string>();
+}
+
+/// <summary>
+/// Interface for the startup capability probe
+/// </summary>
+public interface ICapabilityProbeService
+{
+    /// <summary>
+    /// Profile in use, or null while the first probe is still running
+    /// </summary>
+    CapabilityProfile? Current { get; }
+
+    /// <summary>
+    /// Load the persisted profile for this session or probe once; repeated
+    /// calls share the same task
+    /// </summary>
+    Task<CapabilityProfile> GetProfileAsync();
+
+    /// <summary>
+    /// The given methods that worked when probed, in rank order, followed by
+    /// the remaining ones in their original order, so callers keep their
+    /// full fallback chain. Returns methods unchanged when there is no
+    /// profile yet.
+    /// </summary>
+    IReadOnlyList<T> Order<T>(string category, IReadOnlyList<T> methods, Func<T, string> name);
+
+    /// <summary>
+    /// False only when the profile says the method did not work
+    /// </summary>
+    bool IsUsable(string category, string method);
+
+    /// <summary>
+    /// A ranked method failed at runtime; re-probe in the background
+    /// (rate limited) so the profile catches up with installs/removals
+    /// </summary>
+    void ReportFailure(string category, string method);
+}
+
+/// <summary>
+/// Detects once which external tools work for screen capture, monitor
+/// queries, cursor position and input injection, instead of every call
+/// walking its fallback chain (one process spawn per failed attempt).
+/// All candidates are probed in parallel; capture, monitor and cursor
+/// methods are ranked by measured latency. gnome-screenshot and spectacle
+/// flash the screen, play a sound or notify on every capture, so they are
+/// only checked to start (--version), rank after the measured tools and
+/// prove themselves on first use. Input injection cannot be
+/// exercised without side effects, so those methods are checked for their
+/// prerequisites and keep the session-native preference order.
+/// Profiles are stored in ~/.overlay-companion/capabilities.json keyed by
+/// session type and compositor; OC_CAPABILITY_REPROBE=1 ignores the stored
+/// profile.
+/// </summary>
+public class CapabilityProbeService : ICapabilityProbeService
+{
+    public const string Capture = "capture";
+    public const string Monitors = "monitors";
+    public const string Cursor = "cursor";
+    public const string Input = "input";
+
+    private static readonly TimeSpan ProbeTimeout = TimeSpan.FromSeconds(5);
+    private static readonly TimeSpan MaxProfileAge = TimeSpan.FromDays(7);
+    private static readonly TimeSpan ReprobeInterval = TimeSpan.FromMinutes(5);
+    private static readonly JsonSerializerOptions JsonOptions = new()
+    {
+        PropertyNamingPolicy = JsonNamingPolicy.SnakeCaseLower,
+        WriteIndented = true
+    };
+
+    private readonly ILogger<CapabilityProbeService> _logger;
+    private readonly string _profilePath;
+    private readonly object _lock = new();
+    private Task<CapabilityProfile>? _probeTask;
+    private volatile CapabilityProfile? _profile;
+    private DateTime _lastProbeStarted = DateTime.MinValue;
+
+    public CapabilityProfile? Current => _profile;
+
+    public CapabilityProbeService(ILogger<CapabilityProbeService> logger)
+    {
+        _logger = logger;
+        var dataDir = Path.Combine(Environment.GetFolderPath(Environment.SpecialFolder.UserProfile), ".overlay-companion");
+        _profilePath = Path.Combine(dataDir, "capabilities.json");
+    }
+
+    public Task<CapabilityProfile> GetProfileAsync()
+    {
+        lock (_lock)
+        {
+            return _probeTask ??= LoadOrProbeAsync();
+        }
+    }
+
+    public IReadOnlyList<T> Order<T>(string category, IReadOnlyList<T> methods, Func<T, string> name)
+    {
+        var profile = _profile;
+        if (profile == null) return methods;
+
+        var ranked = profile.Ranked(category)
+            .SelectMany(r => methods.Where(m => name(m) == r))
+            .ToList();
+        ranked.AddRange(methods.Where(m => !ranked.Contains(m)));
+        return ranked;
+    }
+
+    public bool IsUsable(string category, string method)
+    {
+        var profile = _profile;
+        if (profile == null || !profile.Methods.TryGetValue(category, out var methods)) return true;
+        var probed = methods.FirstOrDefault(m => m.Name == method);
+        return probed == null || probed.Available || !methods.Any(m => m.Available);
+    }
+
+    public void ReportFailure(string category, string method)
+    {
+        var profile = _profile;
+        if (profile == null || !profile.Ranked(category).Contains(method)) return;
+
+        lock (_lock)
+        {
+            if (_probeTask is { IsCompleted: false } || DateTime.UtcNow - _lastProbeStarted < ReprobeInterval) return;
+            _logger.LogInformation("{Category} method {Method} failed; re-probing capabilities", category, method);
+            _probeTask = ProbeAndSaveAsync();
+        }
+    }
+
+    private async Task<CapabilityProfile> LoadOrProbeAsync()
+    {
+        var (sessionType, compositor) = DetectSession();
+        var reprobe = Environment.GetEnvironmentVariable("OC_CAPABILITY_REPROBE") is "1" or "true";
+        if (!reprobe)
+        {
+            var stored = (await LoadProfilesAsync()).GetValueOrDefault(CapabilityProfile.ProfileKey(sessionType, compositor));
+            if (stored != null && DateTime.UtcNow - stored.ProbedAt < MaxProfileAge)
+            {
+                _profile = stored;
+                _logger.LogInformation("Using stored capability profile {Key} from {ProbedAt:u}", stored.Key, stored.ProbedAt);
+                return stored;
+            }
+        }
+        return await ProbeAndSaveAsync();
+    }
+
+    private async Task<CapabilityProfile> ProbeAndSaveAsync()
+    {
+        _lastProbeStarted = DateTime.UtcNow;
+        var (sessionType, compositor) = DetectSession();
+        var stopwatch = Stopwatch.StartNew();
+
+        var capture = ProbeCaptureAsync();
+        var monitors = ProbeMonitorsAsync();
+        var cursor = ProbeCursorAsync();
+        var input = ProbeInputAsync(sessionType);
+        await Task.WhenAll(capture, monitors, cursor, input);
+
+        var profile = new CapabilityProfile
+        {
+            SessionType = sessionType,
+            Compositor = compositor,
+            ProbedAt = DateTime.UtcNow,
+            Methods = new Dictionary<string, List<ProbedMethod>>
+            {
+                [Capture] = RankByLatency(capture.Result),
+                [Monitors] = RankByLatency(monitors.Result),
+                [Cursor] = RankByLatency(cursor.Result),
+                [Input] = input.Result
+            }
+        };
+        _profile = profile;
+
+        _logger.LogInformation("Capability probe for {Key} took {Elapsed} ms: {Summary}", profile.Key,
+            stopwatch.ElapsedMilliseconds,
+            string.Join("; ", profile.Methods.Select(kv => $"{kv.Key}={string.Join(",", profile.Ranked(kv.Key))}")));
+
+        try
+        {
+            await SaveProfileAsync(profile);
+        }
+        catch (Exception ex)
+        {
+            _logger.LogWarning(ex, "Failed to store capability profile in {Path}", _profilePath);
+        }
+        return profile;
+    }
+
+    private static List<ProbedMethod> RankByLatency(ProbedMethod[] methods) =>
+        methods.OrderBy(m => m.Available ? 0 : 1).ThenBy(m => m.LatencyMs ?? double.MaxValue).ToList();
+
+    private static Task<ProbedMethod[]> ProbeCaptureAsync()
+    {
+        // Same full-screen invocations as ScreenCaptureService's fallback
+        // chain; null args marks a tool with visible side effects per capture
+        var tools = new (string tool, Func<string, string>? args)[]
+        {
+            ("grim", f => f),
+            ("gnome-screenshot", null),
+            ("spectacle", null),
+            ("maim", f => f),
+            ("scrot", f => f),
+            ("import", f => $"-window root {f}")
+        };
+        return Task.WhenAll(tools.Select(async t =>
+        {
+            if (t.args == null)
+            {
+                // Installed and starts; no latency, so it ranks after the measured tools
+                var method = await ProbeCommandAsync(t.tool, t.tool, "--version", _ => true);
+                method.LatencyMs = null;
+                return method;
+            }
+
+            var file = Path.Combine(Path.GetTempPath(), $"oc-probe-{Guid.NewGuid():N}.png");
+            try
+            {
+                return await ProbeCommandAsync(t.tool, t.tool, t.args(file),
+                    _ => File.Exists(file) && new FileInfo(file).Length > 0);
+            }
+            finally
+            {
+                try { File.Delete(file); } catch { }
+            }
+        }));
+    }
+
+    private static Task<ProbedMethod[]> ProbeMonitorsAsync()
+    {
+        return Task.WhenAll(
+            ProbeCommandAsync("swaymsg", "swaymsg", "-t get_outputs -r", o => o.TrimStart().StartsWith('[')),
+            ProbeCommandAsync("hyprctl", "hyprctl", "monitors -j", o => o.TrimStart().StartsWith('[')),
+            ProbeCommandAsync("xrandr", "xrandr", "--query", o => o.Contains(" connected")),
+            ProbeCommandAsync("xdpyinfo", "xdpyinfo", "", o => o.Contains("dimensions:")));
+    }
+
+    private static Task<ProbedMethod[]> ProbeCursorAsync()
+    {
+        return Task.WhenAll(InputMonitorService.CursorMethods.Select(m =>
+            ProbeCommandAsync(m.tool, m.tool, m.args, o => InputMonitorService.TryParseCursorPosition(o, out _))));
+    }
+
+    private static async Task<List<ProbedMethod>> ProbeInputAsync(string sessionType)
+    {
+        var wayland = sessionType == "wayland";
+
+        var ydotool = new ProbedMethod { Name = "ydotool" };
+        if (FindExecutable("ydotool") == null) ydotool.Error = "not installed";
+        else if (FindYdotoolSocket() == null) ydotool.Error = "ydotoold socket not found";
+        else ydotool.Available = true;
+
+        var wtype = new ProbedMethod { Name = "wtype" };
+        if (FindExecutable("wtype") == null) wtype.Error = "not installed";
+        else if (!wayland) wtype.Error = "not a Wayland session";
+        else wtype.Available = true;
+
+        // The only injector with a side-effect free call that proves the connection works
+        var xdotool = await ProbeCommandAsync("xdotool", "xdotool", "getdisplaygeometry", o => o.Trim().Length > 0);
+
+        // xdotool reaches only XWayland clients under Wayland, so it stays last there
+        var preference = wayland ? new[] { ydotool, wtype, xdotool } : new[] { xdotool, ydotool, wtype };
+        return preference.OrderBy(m => m.Available ? 0 : 1).ToList();
+    }
+
+    private static async Task<ProbedMethod> ProbeCommandAsync(string name, string command, string arguments, Func<string, bool> validate)
+    {
+        var result = new ProbedMethod { Name = name };
+        if (FindExecutable(command) == null)
+        {
+            result.Error = "not installed";
+            return result;
+        }
+
+        try
+        {
+            var stopwatch = Stopwatch.StartNew();
+            using var process = Process.Start(new ProcessStartInfo
+            {
+                FileName = command,
+                Arguments = arguments,
+                UseShellExecute = false,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                CreateNoWindow = true
+            });
+            if (process == null)
+            {
+                result.Error = "failed to start";
+                return result;
+            }
+
+            var stdout = process.StandardOutput.ReadToEndAsync();
+            var stderr = process.StandardError.ReadToEndAsync();
+            using var timeout = new CancellationTokenSource(ProbeTimeout);
+            try
+            {
+                await process.WaitForExitAsync(timeout.Token);
+            }
+            catch (OperationCanceledException)
+            {
+                try { process.Kill(entireProcessTree: true); } catch { }
+                result.Error = $"timed out after {ProbeTimeout.TotalSeconds}s";
+                return result;
+            }
+            var output = await stdout;
+            await stderr;
+            stopwatch.Stop();
+
+            if (process.ExitCode != 0)
+                result.Error = $"exit code {process.ExitCode}";
+            else if (!validate(output))
+                result.Error = "unexpected output";
+            else
+            {
+                result.Available = true;
+                result.LatencyMs = Math.Round(stopwatch.Elapsed.TotalMilliseconds, 1);
+            }
+        }
+        catch (Exception ex)
+        {
+            result.Error = ex.Message;
+        }
+        return result;
+    }
+
+    /// <summary>
+    /// Session type and compositor the profile is keyed by
+    /// </summary>
+    public static (string sessionType, string compositor) DetectSession()
+    {
+        var sessionType = Environment.GetEnvironmentVariable("XDG_SESSION_TYPE")?.Trim().ToLowerInvariant();
+        if (string.IsNullOrEmpty(sessionType) || sessionType == "tty")
+        {
+            sessionType = !string.IsNullOrEmpty(Environment.GetEnvironmentVariable("WAYLAND_DISPLAY")) ? "wayland"
+                : !string.IsNullOrEmpty(Environment.GetEnvironmentVariable("DISPLAY")) ? "x11"
+                : "none";
+        }
+
+        string compositor;
+        if (!string.IsNullOrEmpty(Environment.GetEnvironmentVariable("SWAYSOCK"))) compositor = "sway";
+        else if (!string.IsNullOrEmpty(Environment.GetEnvironmentVariable("HYPRLAND_INSTANCE_SIGNATURE"))) compositor = "hyprland";
+        else
+        {
+            // e.g. "ubuntu:GNOME" or "KDE"
+            var desktop = Environment.GetEnvironmentVariable("XDG_CURRENT_DESKTOP");
+            compositor = string.IsNullOrWhiteSpace(desktop) ? "unknown" : desktop.Split(':').Last().Trim().ToLowerInvariant();
+        }
+        return (sessionType, compositor);
+    }
+
+    private static string? FindExecutable(string name)
+    {
+        foreach (var dir in (Environment.GetEnvironmentVariable("PATH") ?? string.Empty).Split(':', StringSplitOptions.RemoveEmptyEntries))
+        {
+            var candidate = Path.Combine(dir, name);
+            if (File.Exists(candidate)) return candidate;
+        }
+        return null;
+    }
+
+    private static string? FindYdotoolSocket()
+    {
+        var candidates = new[]
+        {
+            Environment.GetEnvironmentVariable("YDOTOOL_SOCKET"),
+            Environment.GetEnvironmentVariable("XDG_RUNTIME_DIR") is { Length: > 0 } runtime ? Path.Combine(runtime, ".ydotool_socket") : null,
+            "/tmp/.ydotool_socket"
+        };
+        return candidates.FirstOrDefault(p => !string.IsNullOrEmpty(p) && File.Exists(p));
+    }
+
+    private async Task<Dictionary<string, CapabilityProfile>> LoadProfilesAsync()
+    {
+        try
+        {
+            if (File.Exists(_profilePath))
+            {
+                var json = await File.ReadAllTextAsync(_profilePath);
+                return JsonSerializer.Deserialize<Dictionary<string, CapabilityProfile>>(json, JsonOptions) ?? new();
+            }
+        }
+        catch (Exception ex)
+        {
+            _logger.LogWarning(ex, "Ignoring unreadable capability profile {Path}", _profilePath);
+        }
+        return new();
+    }
+
+    private async Task SaveProfileAsync(CapabilityProfile profile)
+    {
+        var profiles = await LoadProfilesAsync();
+        profiles[profile.Key] = profile;
+
+        Directory.CreateDirectory(Path.GetDirectoryName(_profilePath)!);
+        var tempPath = _profilePath + ".tmp";
+        await File.WriteAllTextAsync(tempPath, JsonSerializer.Serialize(profiles, JsonOptions));
+        File.Move(tempPath, _profilePath, overwrite: true);
+    }
+}
@@ -0,0 +1,357 @@
+using OverlayCompanion.Models;
+using System.Numerics;
+using System.Runtime.InteropServices;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// A frame captured by the scheduler, with its per-block content hashes
+/// </summary>
+public sealed class ScheduledFrame
+{
+    public long Id { get; init; }
+    public CapturedFrame Frame { get; init; } = new();
+    public BlockGrid Blocks { get; init; } = BlockGrid.Empty;
+
+    /// <summary>
+    /// Blocks that differ from the previous stored frame (all of them for the first)
+    /// </summary>
+    public int ChangedBlocks { get; init; }
+}
+
+/// <summary>
+/// Frame divided into BlockSize x BlockSize blocks (edge blocks smaller),
+/// each reduced to a 64-bit hash of its pixels. Cheap enough to compute on
+/// every scheduler tick (one multiply per 8 bytes) and precise enough to
+/// tell which parts of the screen changed.
+/// </summary>
+public sealed class BlockGrid
+{
+    public const int BlockSize = 64;
+
+    public static readonly BlockGrid Empty = new(0, 0, 0, 0, Array.Empty<ulong>());
+
+    public int Width { get; }
+    public int Height { get; }
+    public int Columns { get; }
+    public int Rows { get; }
+    public ulong[] Hashes { get; }
+
+    private BlockGrid(int width, int height, int columns, int rows, ulong[] hashes)
+    {
+        Width = width;
+        Height = height;
+        Columns = columns;
+        Rows = rows;
+        Hashes = hashes;
+    }
+
+    public static BlockGrid Compute(CapturedFrame frame)
+    {
+        int columns = (frame.Width + BlockSize - 1) / BlockSize;
+        int rows = (frame.Height + BlockSize - 1) / BlockSize;
+        var hashes = new ulong[columns * rows];
+        Array.Fill(hashes, 0xCBF29CE484222325UL);
+
+        for (int y = 0; y < frame.Height; y++)
+        {
+            var row = frame.Pixels.AsSpan(y * frame.Stride, frame.Width * 4);
+            int offset = (y / BlockSize) * columns;
+            for (int bx = 0; bx < columns; bx++)
+            {
+                int x0 = bx * BlockSize;
+                int len = Math.Min(BlockSize, frame.Width - x0) * 4;
+                hashes[offset + bx] = Mix(hashes[offset + bx], row.Slice(x0 * 4, len));
+            }
+        }
+        return new BlockGrid(frame.Width, frame.Height, columns, rows, hashes);
+    }
+
+    private static ulong Mix(ulong hash, ReadOnlySpan<byte> data)
+    {
+        // The X byte of BGRX is padding and may hold anything, so it is masked out
+        const ulong ColorMask = 0x00FFFFFF00FFFFFFUL;
+        var words = MemoryMarshal.Cast<byte, ulong>(data);
+        foreach (var word in words)
+            hash = BitOperations.RotateLeft(hash ^ (word & ColorMask), 29) * 0x9E3779B97F4A7C15UL;
+        if ((data.Length & 7) != 0)
+        {
+            var tail = MemoryMarshal.Read<uint>(data[(words.Length * 8)..]);
+            hash = BitOperations.RotateLeft(hash ^ (tail & 0x00FFFFFFu), 29) * 0x9E3779B97F4A7C15UL;
+        }
+        return hash;
+    }
+
+    /// <summary>
+    /// Indexes of blocks whose hash differs from other's; every block when
+    /// the frame size changed
+    /// </summary>
+    public List<int> ChangedSince(BlockGrid other)
+    {
+        if (other.Width != Width || other.Height != Height)
+            return Enumerable.Range(0, Hashes.Length).ToList();
+
+        var changed = new List<int>();
+        for (int i = 0; i < Hashes.Length; i++)
+        {
+            if (Hashes[i] != other.Hashes[i]) changed.Add(i);
+        }
+        return changed;
+    }
+
+    /// <summary>
+    /// Changed blocks as rectangles in frame pixel coordinates, with
+    /// horizontally adjacent blocks of a row merged into one rectangle (one
+    /// image header per run instead of per block). Null when the frame size
+    /// changed and the grids cannot be compared.
+    /// </summary>
+    public List<ScreenRegion>? DirtyRegionsSince(BlockGrid other)
+    {
+        if (other.Width != Width || other.Height != Height) return null;
+
+        var regions = new List<ScreenRegion>();
+        for (int row = 0; row < Rows; row++)
+        {
+            int y = row * BlockSize, h = Math.Min(BlockSize, Height - y);
+            int col = 0;
+            while (col < Columns)
+            {
+                int i = row * Columns + col;
+                if (Hashes[i] == other.Hashes[i])
+                {
+                    col++;
+                    continue;
+                }
+                int start = col;
+                while (col < Columns && Hashes[row * Columns + col] != other.Hashes[row * Columns + col]) col++;
+                int x = start * BlockSize;
+                regions.Add(new ScreenRegion(x, y, Math.Min(col * BlockSize, Width) - x, h));
+            }
+        }
+        return regions;
+    }
+}
+
+/// <summary>
+/// Interface for background screenshot capture (set_screenshot_frequency)
+/// </summary>
+public interface ICaptureSchedulerService
+{
+    string Mode { get; }
+    int IntervalMs { get; }
+    int Capacity { get; }
+
+    /// <summary>
+    /// Id of the newest stored frame, 0 before the first one
+    /// </summary>
+    long LatestFrameId { get; }
+
+    ScheduledFrame? LatestFrame { get; }
+
+    /// <summary>
+    /// Stored frame by id, or null once it has left the ring buffer
+    /// </summary>
+    ScheduledFrame? GetFrame(long id);
+
+    /// <summary>
+    /// Store a frame captured outside the scheduler (an on-demand
+    /// screenshot) so it gets an id. Returns the latest frame instead when
+    /// it is the same capture or no block changed.
+    /// </summary>
+    ScheduledFrame Register(CapturedFrame frame);
+
+    SchedulerStats Stats { get; }
+
+    void Configure(string mode, int intervalMs);
+
+    event EventHandler<ScheduledFrame>? FrameCaptured;
+}
+
+public sealed record SchedulerStats(long Ticks, long Captured, long Unchanged, long SkippedBusy, long Failed, DateTime? LastTickAt, string? StoppedReason);
+
+/// <summary>
+/// Captures the screen in the background for set_screenshot_frequency:
+/// - interval: store a frame on every tick
+/// - on_change: capture on every tick but store only when a block hash changed
+/// Frames go into a ring buffer of OC_FRAME_BUFFER_SIZE (default 8) entries
+/// so agents can read already captured frames by id instead of paying
+/// capture latency per request; scheduled captures also refresh the frame
+/// ScreenCaptureService serves max_age_ms requests from. A tick that fires
+/// while the previous capture is still running is skipped, never queued.
+/// When the screen capture service has no source of pixel frames left the
+/// scheduler turns itself off and reports why in Stats.StoppedReason.
+/// </summary>
+public sealed class CaptureSchedulerService : ICaptureSchedulerService, IDisposable
+{
+    public const int MinIntervalMs = 100;
+
+    private readonly IScreenCaptureService _screenCapture;
+    private readonly TimeProvider _time;
+    private readonly object _lock = new();
+    private readonly ScheduledFrame?[] _ring;
+    private ITimer? _timer;
+    private int _busy;
+    private long _latestId;
+    private long _ticks, _captured, _unchanged, _skippedBusy, _failed;
+    private DateTime? _lastTickAt;
+    private string? _stoppedReason;
+    // Bumped by Configure so a tick of a replaced timer cannot stop the new one
+    private int _generation;
+
+    public string Mode { get; private set; } = "off";
+    public int IntervalMs { get; private set; } = 1000;
+    public int Capacity => _ring.Length;
+    public long LatestFrameId => Interlocked.Read(ref _latestId);
+    public ScheduledFrame? LatestFrame => GetFrame(LatestFrameId);
+
+    public SchedulerStats Stats
+    {
+        get
+        {
+            lock (_lock)
+            {
+                return new SchedulerStats(_ticks, _captured, _unchanged, _skippedBusy, _failed, _lastTickAt, _stoppedReason);
+            }
+        }
+    }
+
+    public event EventHandler<ScheduledFrame>? FrameCaptured;
+
+    public CaptureSchedulerService(IScreenCaptureService screenCapture, TimeProvider? timeProvider = null)
+    {
+        _screenCapture = screenCapture;
+        _time = timeProvider ?? TimeProvider.System;
+        var sizeEnv = Environment.GetEnvironmentVariable("OC_FRAME_BUFFER_SIZE");
+        var size = int.TryParse(sizeEnv, out var n) && n > 0 ? n : 8;
+        _ring = new ScheduledFrame?[size];
+    }
+
+    public void Configure(string mode, int intervalMs)
+    {
+        mode = mode.ToLowerInvariant();
+        if (mode is not ("off" or "interval" or "on_change"))
+            throw new ArgumentException($"Invalid mode: {mode}. Valid modes are: off, interval, on_change");
+
+        lock (_lock)
+        {
+            Mode = mode;
+            IntervalMs = Math.Max(intervalMs, MinIntervalMs);
+            _stoppedReason = null;
+            _timer?.Dispose();
+            _timer = null;
+            if (mode != "off")
+            {
+                var period = TimeSpan.FromMilliseconds(IntervalMs);
+                var generation = ++_generation;
+                _timer = _time.CreateTimer(_ => _ = TickAsync(generation), null, TimeSpan.Zero, period);
+            }
+        }
+    }
+
+    public ScheduledFrame? GetFrame(long id)
+    {
+        if (id <= 0) return null;
+        lock (_lock)
+        {
+            var slot = _ring[id % _ring.Length];
+            return slot?.Id == id ? slot : null;
+        }
+    }
+
+    public ScheduledFrame Register(CapturedFrame frame)
+    {
+        return Store(frame, onlyIfChanged: true);
+    }
+
+    private async Task TickAsync(int generation)
+    {
+        lock (_lock)
+        {
+            _ticks++;
+            _lastTickAt = _time.GetUtcNow().UtcDateTime;
+        }
+        if (Interlocked.CompareExchange(ref _busy, 1, 0) != 0)
+        {
+            lock (_lock) _skippedBusy++;
+            return;
+        }
+
+        try
+        {
+            var frame = await _screenCapture.CaptureFrameAsync();
+            if (frame == null)
+            {
+                lock (_lock) _failed++;
+                // Not transient: every later tick would fail the same way
+                if (!_screenCapture.CanCaptureFrames)
+                    Stop(generation, "no full-frame capture source: tool screenshots cannot be decoded or cropped to the monitor layout");
+                return;
+            }
+            Store(frame, onlyIfChanged: Mode == "on_change");
+        }
+        catch (Exception ex)
+        {
+            lock (_lock) _failed++;
+            Console.Error.WriteLine($"[scheduler] capture failed: {ex.Message}");
+        }
+        finally
+        {
+            Interlocked.Exchange(ref _busy, 0);
+        }
+    }
+
+    private void Stop(int generation, string reason)
+    {
+        lock (_lock)
+        {
+            if (generation != _generation || _timer == null) return;
+            _timer.Dispose();
+            _timer = null;
+            Mode = "off";
+            _stoppedReason = reason;
+        }
+        Console.Error.WriteLine($"[scheduler] stopped: {reason}");
+    }
+
+    private ScheduledFrame Store(CapturedFrame frame, bool onlyIfChanged)
+    {
+        // A cached frame handed out again (max_age_ms) is already stored
+        if (LatestFrame is { } latest && ReferenceEquals(latest.Frame, frame)) return latest;
+
+        // Hashing runs outside the lock; it is the expensive part
+        var blocks = BlockGrid.Compute(frame);
+        ScheduledFrame scheduled;
+        lock (_lock)
+        {
+            var previous = _latestId > 0 ? _ring[_latestId % _ring.Length] : null;
+            var changed = previous == null ? blocks.Hashes.Length : blocks.ChangedSince(previous.Blocks).Count;
+            if (onlyIfChanged && previous != null && changed == 0)
+            {
+                _unchanged++;
+                return previous;
+            }
+
+            scheduled = new ScheduledFrame
+            {
+                Id = _latestId + 1,
+                Frame = frame,
+                Blocks = blocks,
+                ChangedBlocks = changed
+            };
+            _ring[scheduled.Id % _ring.Length] = scheduled;
+            Interlocked.Exchange(ref _latestId, scheduled.Id);
+            _captured++;
+        }
+        FrameCaptured?.Invoke(this, scheduled);
+        return scheduled;
+    }
+
+    public void Dispose()
+    {
+        lock (_lock)
+        {
+            _timer?.Dispose();
+            _timer = null;
+        }
+    }
+}
@@ -0,0 +1,79 @@
+using OverlayCompanion.Models;
+using System;
+using System.Threading.Tasks;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Uncompressed frame grabbed in-process: 32-bit BGRX pixels, top-down,
+/// placed at (OriginX, OriginY) in virtual desktop coordinates.
+/// </summary>
+public sealed class CapturedFrame
+{
+    public byte[] Pixels { get; init; } = Array.Empty<byte>();
+    public int Width { get; init; }
+    public int Height { get; init; }
+    public int Stride { get; init; }
+    public int OriginX { get; init; }
+    public int OriginY { get; init; }
+    public DateTime Timestamp { get; init; } = DateTime.UtcNow;
+    public string Backend { get; init; } = string.Empty;
+
+    public ScreenRegion Bounds => new(OriginX, OriginY, Width, Height);
+
+    /// <summary>
+    /// Copy of the part of this frame inside region (desktop coordinates),
+    /// or null when they do not overlap.
+    /// </summary>
+    public CapturedFrame? Crop(ScreenRegion region)
+    {
+        int x0 = Math.Max(region.X, OriginX);
+        int y0 = Math.Max(region.Y, OriginY);
+        int x1 = Math.Min(region.X + region.Width, OriginX + Width);
+        int y1 = Math.Min(region.Y + region.Height, OriginY + Height);
+        if (x1 <= x0 || y1 <= y0) return null;
+
+        int w = x1 - x0, h = y1 - y0, stride = w * 4;
+        var pixels = new byte[stride * h];
+        for (int row = 0; row < h; row++)
+        {
+            Buffer.BlockCopy(Pixels, (y0 - OriginY + row) * Stride + (x0 - OriginX) * 4,
+                pixels, row * stride, stride);
+        }
+        return new CapturedFrame
+        {
+            Pixels = pixels,
+            Width = w,
+            Height = h,
+            Stride = stride,
+            OriginX = x0,
+            OriginY = y0,
+            Timestamp = Timestamp,
+            Backend = Backend
+        };
+    }
+
+    /// <summary>
+    /// Already encoded form of this frame (a capture tool's PNG), returned by
+    /// EncodePng instead of re-encoding
+    /// </summary>
+    public byte[]? EncodedPng { init => _png = value; }
+    private byte[]? _png;
+
+    public byte[] EncodePng() => _png ??= PngEncoder.EncodeBgrx(Pixels, Width, Height, Stride);
+}
+
+/// <summary>
+/// In-process capture source that keeps its connection or session open
+/// between frames. Backends return null when they cannot serve a request,
+/// and ScreenCaptureService falls back to the external tool chain.
+/// </summary>
+public interface ICaptureBackend : IDisposable
+{
+    string Name { get; }
+
+    /// <summary>
+    /// Grab the whole virtual desktop, or null if the backend is unusable.
+    /// </summary>
+    Task<CapturedFrame?> CaptureAsync();
+}
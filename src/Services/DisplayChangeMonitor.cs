@@ -0,0 +1,278 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Net.Sockets;
+using System.Runtime.InteropServices;
+using System.Text;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Raises Changed when the output layout may have changed, from whichever
+/// event sources the session offers:
+/// - sway: a long-lived `swaymsg -t subscribe -m '["output"]'`
+/// - Hyprland: monitoradded/monitorremoved/configreloaded on socket2
+/// - X11: RandR RRScreenChangeNotify on a dedicated display connection
+/// Sources that are unavailable are skipped silently; callers keep a TTL as
+/// a safety net for changes nothing reports (e.g. scale set via gsettings).
+/// A hotplug or mode switch arrives as a burst of events, so Changed is
+/// raised once, DebounceInterval after the last event of a burst.
+/// </summary>
+public sealed class DisplayChangeMonitor : IDisposable
+{
+    public static readonly TimeSpan DebounceInterval = TimeSpan.FromMilliseconds(250);
+
+    private readonly CancellationTokenSource _cts = new();
+    private readonly List<IDisposable> _resources = new();
+    private readonly Timer _debounce;
+    private string? _pendingReason;
+    private bool _started;
+
+    public DisplayChangeMonitor()
+    {
+        _debounce = new Timer(_ => Flush(), null, Timeout.Infinite, Timeout.Infinite);
+    }
+
+    public event EventHandler<string>? Changed;
+
+    public IReadOnlyList<string> Sources => _sources;
+    private readonly List<string> _sources = new();
+
+    public void Start()
+    {
+        lock (_resources)
+        {
+            if (_started) return;
+            _started = true;
+
+            if (!string.IsNullOrEmpty(Environment.GetEnvironmentVariable("SWAYSOCK")))
+                TryStart("sway", StartSwaySubscription);
+            var hypr = Environment.GetEnvironmentVariable("HYPRLAND_INSTANCE_SIGNATURE");
+            if (!string.IsNullOrEmpty(hypr))
+                TryStart("hyprland", () => StartHyprlandSocket(hypr));
+            if (!string.IsNullOrEmpty(Environment.GetEnvironmentVariable("DISPLAY")) &&
+                string.IsNullOrEmpty(Environment.GetEnvironmentVariable("WAYLAND_DISPLAY")))
+                TryStart("randr", StartRandRWatcher);
+        }
+    }
+
+    private void TryStart(string name, Func<bool> start)
+    {
+        try
+        {
+            if (start()) _sources.Add(name);
+        }
+        catch (Exception ex)
+        {
+            Console.Error.WriteLine($"[display] {name} change events unavailable: {ex.Message}");
+        }
+    }
+
+    private void Raise(string reason)
+    {
+        lock (_debounce) _pendingReason = reason;
+        try { _debounce.Change(DebounceInterval, Timeout.InfiniteTimeSpan); } catch (ObjectDisposedException) { }
+    }
+
+    private void Flush()
+    {
+        string? reason;
+        lock (_debounce)
+        {
+            reason = _pendingReason;
+            _pendingReason = null;
+        }
+        if (reason != null && !_cts.IsCancellationRequested) Changed?.Invoke(this, reason);
+    }
+
+    private bool StartSwaySubscription()
+    {
+        var psi = new ProcessStartInfo
+        {
+            FileName = "swaymsg",
+            UseShellExecute = false,
+            RedirectStandardOutput = true,
+            RedirectStandardError = true,
+            CreateNoWindow = true
+        };
+        foreach (var arg in new[] { "-t", "subscribe", "-m", "[\"output\"]" }) psi.ArgumentList.Add(arg);
+        var process = Process.Start(psi);
+        if (process == null) return false;
+        _resources.Add(new ProcessHandle(process));
+        _ = Task.Run(async () =>
+        {
+            try
+            {
+                // swaymsg pretty-prints, so one object spans several lines;
+                // the first is the acknowledgement of the subscription itself
+                var json = new StringBuilder();
+                int depth = 0;
+                bool inString = false, escaped = false;
+                while (!_cts.IsCancellationRequested && await process.StandardOutput.ReadLineAsync(_cts.Token) is { } line)
+                {
+                    foreach (var c in line)
+                    {
+                        if (inString)
+                        {
+                            if (escaped) escaped = false;
+                            else if (c == '\\') escaped = true;
+                            else if (c == '"') inString = false;
+                        }
+                        else if (c == '"') inString = true;
+                        else if (c == '{') depth++;
+                        else if (c == '}') depth--;
+                    }
+                    json.AppendLine(line);
+                    if (depth > 0) continue;
+
+                    var text = json.ToString();
+                    json.Clear();
+                    depth = 0;
+                    if (!string.IsNullOrWhiteSpace(text) && !IsSubscribeAck(text)) Raise("sway output event");
+                }
+            }
+            catch (OperationCanceledException) { }
+            catch (IOException) { }
+        });
+        return true;
+    }
+
+    private static bool IsSubscribeAck(string json)
+    {
+        try
+        {
+            using var doc = JsonDocument.Parse(json);
+            return doc.RootElement.ValueKind == JsonValueKind.Object && doc.RootElement.TryGetProperty("success", out _);
+        }
+        catch (JsonException)
+        {
+            return false;
+        }
+    }
+
+    private bool StartHyprlandSocket(string signature)
+    {
+        // UID is a shell variable, not exported, so the fallback asks libc
+        var runtime = Environment.GetEnvironmentVariable("XDG_RUNTIME_DIR") is { Length: > 0 } dir ? dir : $"/run/user/{getuid()}";
+        var candidates = new[]
+        {
+            Path.Combine(runtime, "hypr", signature, ".socket2.sock"),
+            Path.Combine("/tmp/hypr", signature, ".socket2.sock") // before Hyprland 0.40
+        };
+        var path = Array.Find(candidates, File.Exists);
+        if (path == null)
+        {
+            Console.Error.WriteLine($"[display] hyprland socket2 not found (looked in {string.Join(", ", candidates)})");
+            return false;
+        }
+
+        var socket = new Socket(AddressFamily.Unix, SocketType.Stream, ProtocolType.Unspecified);
+        socket.Connect(new UnixDomainSocketEndPoint(path));
+        _resources.Add(socket);
+        _ = Task.Run(async () =>
+        {
+            try
+            {
+                using var reader = new StreamReader(new NetworkStream(socket, ownsSocket: false));
+                while (!_cts.IsCancellationRequested && await reader.ReadLineAsync(_cts.Token) is { } line)
+                {
+                    if (line.StartsWith("monitoradded", StringComparison.Ordinal) ||
+                        line.StartsWith("monitorremoved", StringComparison.Ordinal) ||
+                        line.StartsWith("configreloaded", StringComparison.Ordinal))
+                    {
+                        Raise("hyprland " + line.Split(">>", 2)[0]);
+                    }
+                }
+            }
+            catch (OperationCanceledException) { }
+            catch (IOException) { }
+            catch (SocketException) { }
+        });
+        return true;
+    }
+
+    [DllImport("libc")] private static extern uint getuid();
+
+    // RandR over its own display connection. XPending is polled rather than
+    // blocking in XNextEvent so the connection can be closed on Dispose.
+    [DllImport("libX11.so.6")] private static extern int XInitThreads();
+    [DllImport("libX11.so.6")] private static extern IntPtr XOpenDisplay(string? name);
+    [DllImport("libX11.so.6")] private static extern int XCloseDisplay(IntPtr display);
+    [DllImport("libX11.so.6")] private static extern nuint XDefaultRootWindow(IntPtr display);
+    [DllImport("libX11.so.6")] private static extern int XPending(IntPtr display);
+    [DllImport("libX11.so.6")] private static extern int XNextEvent(IntPtr display, IntPtr eventReturn);
+    [DllImport("libXrandr.so.2")] private static extern int XRRQueryExtension(IntPtr display, out int eventBase, out int errorBase);
+    [DllImport("libXrandr.so.2")] private static extern void XRRSelectInput(IntPtr display, nuint window, int mask);
+
+    private const int RRScreenChangeNotifyMask = 1 << 0;
+    private const int XEventSize = 192; // sizeof(XEvent) on LP64
+
+    private bool StartRandRWatcher()
+    {
+        XInitThreads();
+        var display = XOpenDisplay(null);
+        if (display == IntPtr.Zero) return false;
+        if (XRRQueryExtension(display, out var eventBase, out _) == 0)
+        {
+            XCloseDisplay(display);
+            return false;
+        }
+        XRRSelectInput(display, XDefaultRootWindow(display), RRScreenChangeNotifyMask);
+
+        var thread = new Thread(() =>
+        {
+            var ev = Marshal.AllocHGlobal(XEventSize);
+            try
+            {
+                while (!_cts.IsCancellationRequested)
+                {
+                    if (XPending(display) == 0)
+                    {
+                        _cts.Token.WaitHandle.WaitOne(250);
+                        continue;
+                    }
+                    XNextEvent(display, ev);
+                    if (Marshal.ReadInt32(ev) == eventBase) Raise("randr screen change");
+                }
+            }
+            finally
+            {
+                Marshal.FreeHGlobal(ev);
+                XCloseDisplay(display);
+            }
+        })
+        { IsBackground = true, Name = "randr-watch" };
+        thread.Start();
+        return true;
+    }
+
+    private sealed class ProcessHandle : IDisposable
+    {
+        private readonly Process _process;
+        public ProcessHandle(Process process) => _process = process;
+
+        public void Dispose()
+        {
+            try { if (!_process.HasExited) _process.Kill(); } catch { }
+            _process.Dispose();
+        }
+    }
+
+    public void Dispose()
+    {
+        _cts.Cancel();
+        _debounce.Dispose();
+        lock (_resources)
+        {
+            foreach (var r in _resources)
+            {
+                try { r.Dispose(); } catch { }
+            }
+            _resources.Clear();
+        }
+    }
+}
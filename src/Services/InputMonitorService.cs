@@ -34,6 +34,22 @@ public class InputMonitorService : IInputMonitorService
     private Timer? _mouseTimer;
     private ScreenPoint _lastMousePosition = new(0, 0);
     private readonly int _pollingIntervalMs;
+    private readonly ICapabilityProbeService? _capabilities;
+
+    // Cursor position sources, Wayland-first; CapabilityProbeService probes
+    // the same list. sway has no IPC query for the pointer position
+    // (get_seats carries no coordinates), so wlrctl covers it.
+    internal static readonly (string tool, string args)[] CursorMethods =
+    {
+        ("wlrctl", "pointer location"),
+        ("hyprctl", "-j cursorpos"),
+        ("xdotool", "getmouselocation --shell")
+    };
+
+    // After every cursor method failed, polls return the last known position
+    // until this time instead of spawning each tool again every 50 ms
+    private static readonly TimeSpan CursorRetryInterval = TimeSpan.FromSeconds(5);
+    private DateTime _cursorRetryAt = DateTime.MinValue;
 
     public event EventHandler<InputEvent>? MouseMoved;
     public event EventHandler<InputEvent>? MouseClicked;
@@ -41,9 +57,10 @@ public class InputMonitorService : IInputMonitorService
 
     public bool IsMonitoring => _isMonitoring;
 
-    public InputMonitorService(int pollingIntervalMs = 50) // 20 FPS default
+    public InputMonitorService(int pollingIntervalMs = 50, ICapabilityProbeService? capabilities = null) // 20 FPS default
     {
         _pollingIntervalMs = pollingIntervalMs;
+        _capabilities = capabilities;
     }
 
     public void StartMonitoring()
@@ -97,199 +114,124 @@ public class InputMonitorService : IInputMonitorService
 
     private ScreenPoint GetCursorPositionFromSystem()
     {
-        try
+        // The probe found no working cursor tool: nothing to spawn
+        if (_capabilities?.Current is { } profile &&
+            profile.Methods.ContainsKey(CapabilityProbeService.Cursor) &&
+            profile.Ranked(CapabilityProbeService.Cursor).Count == 0)
         {
-            // Wayland-first: try wev/wtype utilities or ydotool (root)
-            var process = new Process
-            {
-                StartInfo = new ProcessStartInfo
-                {
-                    FileName = "sh",
-                    Arguments = "-lc 'command -v wlrctl >/dev/null 2>&1 && wlrctl pointer location || command -v hyprctl >/dev/null 2>&1 && hyprctl -j cursorpos || command -v swaymsg >/dev/null 2>&1 && swaymsg -t get_seats'",
-                    UseShellExecute = false,
-                    RedirectStandardOutput = true,
-                    CreateNoWindow = true
-                }
-            };
-
-            process.Start();
-            var output = process.StandardOutput.ReadToEnd();
-            process.WaitForExit();
-
-            if (process.ExitCode == 0 && !string.IsNullOrWhiteSpace(output))
-            {
-                // Try to parse "x y" or JSON {"x":..,"y":..}
-                output = output.Trim();
-                if (output.StartsWith("{"))
-                {
-                    try
-                    {
-                        var doc = System.Text.Json.JsonDocument.Parse(output);
-                        if (doc.RootElement.TryGetProperty("x", out var xEl) && doc.RootElement.TryGetProperty("y", out var yEl))
-                        {
-                            return new ScreenPoint(xEl.GetInt32(), yEl.GetInt32());
-                        }
-                    }
-                    catch { }
-                }
-                else
-                {
-                    var parts = output.Split(new[] { ' ', '\t' }, StringSplitOptions.RemoveEmptyEntries);
-                    if (parts.Length >= 2 && int.TryParse(parts[0], out var x) && int.TryParse(parts[1], out var y))
-                    {
-                        return new ScreenPoint(x, y);
-                    }
-                }
-            }
+            return _lastMousePosition;
         }
-        catch { }
+        if (DateTime.UtcNow < _cursorRetryAt) return _lastMousePosition;
 
-        try
+        // Best method first once the capability probe has run; until then
+        // (or without a probe) the Wayland-first chain is tried in order
+        var methods = _capabilities?.Order(CapabilityProbeService.Cursor, CursorMethods, m => m.tool) ?? CursorMethods;
+        foreach (var (tool, args) in methods)
         {
-            // Fallback to X11 xdotool
-            var process = new Process
+            try
             {
-                StartInfo = new ProcessStartInfo
+                using var process = Process.Start(new ProcessStartInfo
                 {
-                    FileName = "xdotool",
-                    Arguments = "getmouselocation --shell",
+                    FileName = tool,
+                    Arguments = args,
                     UseShellExecute = false,
                     RedirectStandardOutput = true,
+                    RedirectStandardError = true,
                     CreateNoWindow = true
-                }
-            };
+                });
+                if (process == null) continue;
 
-            process.Start();
-            var output = process.StandardOutput.ReadToEnd();
-            process.WaitForExit();
+                var stderr = process.StandardError.ReadToEndAsync();
+                var output = process.StandardOutput.ReadToEnd();
+                process.WaitForExit();
+                stderr.Wait();
 
-            if (process.ExitCode == 0)
-            {
-                var lines = output.Split('\n');
-                int x = 0, y = 0;
-
-                foreach (var line in lines)
+                if (process.ExitCode == 0 && TryParseCursorPosition(output, out var position))
                 {
-                    if (line.StartsWith("X=") && int.TryParse(line.Substring(2), out x)) continue;
-                    if (line.StartsWith("Y=") && int.TryParse(line.Substring(2), out y)) continue;
+                    return position;
                 }
-
-                return new ScreenPoint(x, y);
             }
-        }
-        catch
-        {
-            // Fallback for when xdotool is not available
+            catch
+            {
+                // Try next method
+            }
+            _capabilities?.ReportFailure(CapabilityProbeService.Cursor, tool);
         }
 
         // Return last known position or origin
+        _cursorRetryAt = DateTime.UtcNow + CursorRetryInterval;
         return _lastMousePosition;
     }
 
     /// <summary>
-    /// Simulate a mouse click at the specified position
-    /// Added for MCP tool support
+    /// Parse cursor output: JSON {"x":..,"y":..} (hyprctl), xdotool's
+    /// --shell X=/Y= lines, or "x y" / "x,y" text (wlrctl)
     /// </summary>
-    public async Task<bool> SimulateClickAsync(ScreenPoint position, string button = "left", int clicks = 1)
+    public static bool TryParseCursorPosition(string output, out ScreenPoint position)
     {
-        try
-        {
-            var buttonNum = button.ToLower() switch
-            {
-                "right" => "3",
-                "middle" => "2",
-                _ => "1" // left
-            };
+        position = new ScreenPoint(0, 0);
+        output = output.Trim();
+        if (output.Length == 0) return false;
 
-            // Wayland-first: try ydotool (may require uinput permissions)
+        if (output.StartsWith("{"))
+        {
             try
             {
-                var whichYdt = new Process
-                {
-                    StartInfo = new ProcessStartInfo
-                    {
-                        FileName = "sh",
-                        Arguments = "-lc 'command -v ydotool'",
-                        UseShellExecute = false,
-                        RedirectStandardOutput = true,
-                        RedirectStandardError = true,
-                        CreateNoWindow = true
-                    }
-                };
-                whichYdt.Start();
-                whichYdt.WaitForExit();
-                if (whichYdt.ExitCode == 0)
+                using var doc = System.Text.Json.JsonDocument.Parse(output);
+                if (doc.RootElement.TryGetProperty("x", out var xEl) && doc.RootElement.TryGetProperty("y", out var yEl))
                 {
-                    var move = new Process
-                    {
-                        StartInfo = new ProcessStartInfo
-                        {
-                            FileName = "ydotool",
-                            Arguments = $"mousemove {position.X} {position.Y}",
-                            UseShellExecute = false,
-                            RedirectStandardError = true,
-                            CreateNoWindow = true
-                        }
-                    };
-                    move.Start();
-                    await move.WaitForExitAsync();
-                    if (move.ExitCode == 0)
-                    {
-                        bool ok = true;
-                        for (int i = 0; i < clicks; i++)
-                        {
-                            var clickProc = new Process
-                            {
-                                StartInfo = new ProcessStartInfo
-                                {
-                                    FileName = "ydotool",
-                                    Arguments = $"click {buttonNum}",
-                                    UseShellExecute = false,
-                                    RedirectStandardError = true,
-                                    CreateNoWindow = true
-                                }
-                            };
-                            clickProc.Start();
-                            await clickProc.WaitForExitAsync();
-                            if (clickProc.ExitCode != 0) { ok = false; break; }
-                        }
-                        if (ok)
-                        {
-                            var inputEvent = new InputEvent
-                            {
-                                Position = position,
-                                EventType = "click",
-                                Data = $"{button}:{clicks}"
-                            };
-                            MouseClicked?.Invoke(this, inputEvent);
-                            return true;
-                        }
-                    }
+                    position = new ScreenPoint((int)xEl.GetDouble(), (int)yEl.GetDouble());
+                    return true;
                 }
             }
-            catch
-            {
-                // fall through to X11 fallback
-            }
+            catch { }
+            return false;
+        }
 
-            // Fallback: xdotool (X11)
-            var process = new Process
+        if (output.StartsWith("X="))
+        {
+            int? sx = null, sy = null;
+            foreach (var line in output.Split('\n'))
             {
-                StartInfo = new ProcessStartInfo
-                {
-                    FileName = "xdotool",
-                    Arguments = $"mousemove {position.X} {position.Y} click --repeat {clicks} {buttonNum}",
-                    UseShellExecute = false,
-                    RedirectStandardOutput = true,
-                    RedirectStandardError = true,
-                    CreateNoWindow = true
-                }
-            };
+                if (line.StartsWith("X=") && int.TryParse(line.Substring(2), out var vx)) sx = vx;
+                if (line.StartsWith("Y=") && int.TryParse(line.Substring(2), out var vy)) sy = vy;
+            }
+            if (sx == null || sy == null) return false;
+            position = new ScreenPoint(sx.Value, sy.Value);
+            return true;
+        }
 
-            process.Start();
-            await process.WaitForExitAsync();
+        var parts = output.Split(new[] { ' ', '\t', ',' }, StringSplitOptions.RemoveEmptyEntries);
+        if (parts.Length >= 2 && int.TryParse(parts[0], out var x) && int.TryParse(parts[1], out var y))
+        {
+            position = new ScreenPoint(x, y);
+            return true;
+        }
+        return false;
+    }
 
-            if (process.ExitCode == 0)
+    /// <summary>
+    /// Simulate a mouse click at the specified position
+    /// Added for MCP tool support
+    /// </summary>
+    public async Task<bool> SimulateClickAsync(ScreenPoint position, string button = "left", int clicks = 1)
+    {
+        var buttonNum = button.ToLower() switch
+        {
+            "right" => "3",
+            "middle" => "2",
+            _ => "1" // left
+        };
+
+        // Wayland-first: ydotool (may require uinput permissions), then xdotool (X11)
+        var tools = new[] { "ydotool", "xdotool" };
+        foreach (var tool in _capabilities?.Order(CapabilityProbeService.Input, tools, t => t) ?? tools)
+        {
+            var ok = tool == "ydotool"
+                ? await RunToolAsync("ydotool", $"mousemove {position.X} {position.Y}") &&
+                  await ClickWithYdotoolAsync(buttonNum, clicks)
+                : await RunToolAsync("xdotool", $"mousemove {position.X} {position.Y} click --repeat {clicks} {buttonNum}");
+            if (ok)
             {
                 var inputEvent = new InputEvent
                 {
@@ -297,19 +239,24 @@ public class InputMonitorService : IInputMonitorService
                     EventType = "click",
                     Data = $"{button}:{clicks}"
                 };
-
                 MouseClicked?.Invoke(this, inputEvent);
                 return true;
             }
-        }
-        catch
-        {
-            // Click failed
+            _capabilities?.ReportFailure(CapabilityProbeService.Input, tool);
         }
 
         return false;
     }
 
+    private static async Task<bool> ClickWithYdotoolAsync(string buttonNum, int clicks)
+    {
+        for (int i = 0; i < clicks; i++)
+        {
+            if (!await RunToolAsync("ydotool", $"click {buttonNum}")) return false;
+        }
+        return true;
+    }
+
     /// <summary>
     /// Simulate typing text
     /// Added for MCP tool support
@@ -322,25 +269,14 @@ public class InputMonitorService : IInputMonitorService
         var delayMs = 60000 / charactersPerMinute; // milliseconds per character
         var escaped = text.Replace("\"", "\\\"");
 
-        // Wayland-first: try wtype
-        try
+        // Wayland-first: wtype, then xdotool (X11)
+        var tools = new[] { "wtype", "xdotool" };
+        foreach (var tool in _capabilities?.Order(CapabilityProbeService.Input, tools, t => t) ?? tools)
         {
-            var process = new Process
-            {
-                StartInfo = new ProcessStartInfo
-                {
-                    FileName = "wtype",
-                    Arguments = $"-d {delayMs} -- \"{escaped}\"",
-                    UseShellExecute = false,
-                    RedirectStandardOutput = true,
-                    RedirectStandardError = true,
-                    CreateNoWindow = true
-                }
-            };
-
-            process.Start();
-            await process.WaitForExitAsync();
-            if (process.ExitCode == 0)
+            var ok = tool == "wtype"
+                ? await RunToolAsync("wtype", $"-d {delayMs} -- \"{escaped}\"")
+                : await RunToolAsync("xdotool", $"type --delay {delayMs} \"{escaped}\"");
+            if (ok)
             {
                 var inputEvent = new InputEvent
                 {
@@ -351,49 +287,37 @@ public class InputMonitorService : IInputMonitorService
                 KeyPressed?.Invoke(this, inputEvent);
                 return true;
             }
-        }
-        catch
-        {
-            // fall through to X11 fallback
+            _capabilities?.ReportFailure(CapabilityProbeService.Input, tool);
         }
 
-        // Fallback: xdotool (X11)
+        return false;
+    }
+
+    private static async Task<bool> RunToolAsync(string tool, string arguments)
+    {
         try
         {
-            var process = new Process
+            using var process = Process.Start(new ProcessStartInfo
             {
-                StartInfo = new ProcessStartInfo
-                {
-                    FileName = "xdotool",
-                    Arguments = $"type --delay {delayMs} \"{escaped}\"",
-                    UseShellExecute = false,
-                    RedirectStandardOutput = true,
-                    RedirectStandardError = true,
-                    CreateNoWindow = true
-                }
-            };
-
-            process.Start();
+                FileName = tool,
+                Arguments = arguments,
+                UseShellExecute = false,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                CreateNoWindow = true
+            });
+            if (process == null) return false;
+
+            // Drain both pipes; a chatty tool would otherwise block on a full one
+            var stdout = process.StandardOutput.ReadToEndAsync();
+            var stderr = process.StandardError.ReadToEndAsync();
             await process.WaitForExitAsync();
-
-            if (process.ExitCode == 0)
-            {
-                var inputEvent = new InputEvent
-                {
-                    Position = GetCurrentMousePosition(),
-                    EventType = "key",
-                    Data = text
-                };
-
-                KeyPressed?.Invoke(this, inputEvent);
-                return true;
-            }
+            await Task.WhenAll(stdout, stderr);
+            return process.ExitCode == 0;
         }
         catch
         {
-            // Typing failed
+            return false;
         }
-
-        return false;
     }
 }
@@ -52,6 +52,11 @@ public interface IKasmVNCService : IDisposable
     Task<bool> TestConnectionAsync();
     Task<bool> ConnectAsync();
     Task DisconnectAsync();
+
+    /// <summary>
+    /// Raised when KasmVNC reports a display_changed message
+    /// </summary>
+    event EventHandler? DisplayChanged;
 }
 
 public class KasmVNCService : IKasmVNCService
@@ -64,6 +69,8 @@ public class KasmVNCService : IKasmVNCService
     private readonly SemaphoreSlim _connectionSemaphore = new(1, 1);
     private bool _disposed;
 
+    public event EventHandler? DisplayChanged;
+
     public KasmVNCService(HttpClient httpClient, IOptions<KasmVNCOptions> options, ILogger<KasmVNCService> logger)
     {
         _httpClient = httpClient;
@@ -236,7 +243,8 @@ public class KasmVNCService : IKasmVNCService
     private async Task HandleDisplayChanged(JsonElement message)
     {
         _logger.LogInformation("KasmVNC display configuration changed");
-        // Could trigger display info refresh or notify other services
+        // Lets ScreenCaptureService drop its cached monitor layout
+        DisplayChanged?.Invoke(this, EventArgs.Empty);
         await Task.CompletedTask;
     }
 
@@ -2,6 +2,7 @@ using OverlayCompanion.Models;
 using OverlayCompanion.UI;
 using System;
 using System.Collections.Concurrent;
+using System.Threading;
 using System.Threading.Tasks;
 using System.Linq;
 
@@ -34,13 +35,19 @@ public class OverlayService : IOverlayService
 {
     private readonly ConcurrentDictionary<string, OverlayElement> _activeOverlays = new();
     private readonly ConcurrentDictionary<string, IOverlayWindow> _overlayWindows = new();
+    private readonly ConcurrentDictionary<string, ITimer> _expiryTimers = new();
 
 
     private readonly OverlayCompanion.Web.IOverlayEventBroadcaster? _broadcaster;
 
-    public OverlayService(OverlayCompanion.Web.IOverlayEventBroadcaster? broadcaster = null)
+    // All overlay timing (temporary_ms expiry, batch staggering, window
+    // auto-hide) goes through this clock so tests can swap in virtual time
+    private readonly TimeProvider _time;
+
+    public OverlayService(OverlayCompanion.Web.IOverlayEventBroadcaster? broadcaster = null, TimeProvider? timeProvider = null)
     {
         _broadcaster = broadcaster;
+        _time = timeProvider ?? TimeProvider.System;
     }
 
     public event EventHandler<OverlayElement>? OverlayCreated;
@@ -55,7 +62,8 @@ public class OverlayService : IOverlayService
             Color = color,
             Label = label,
             TemporaryMs = temporaryMs,
-            ClickThrough = clickThrough
+            ClickThrough = clickThrough,
+            CreatedAt = _time.GetUtcNow().UtcDateTime
         };
 
         // Create and show overlay window
@@ -67,13 +75,7 @@ public class OverlayService : IOverlayService
         _overlayWindows[overlay.Id] = window;
 
         // Set up automatic removal if temporary
-        if (temporaryMs > 0)
-        {
-            _ = Task.Delay(temporaryMs).ContinueWith(async _ =>
-            {
-                await RemoveOverlayAsync(overlay.Id);
-            });
-        }
+        ScheduleExpiry(overlay);
 
         OverlayCreated?.Invoke(this, overlay);
         if (_broadcaster != null) await _broadcaster.BroadcastOverlayCreatedAsync(overlay);
@@ -83,19 +85,14 @@ public class OverlayService : IOverlayService
     public async Task<string> DrawOverlayAsync(OverlayElement overlay)
     {
         // Use the provided overlay object directly to preserve all properties (id, click-through, opacity, etc.)
+        overlay.CreatedAt = _time.GetUtcNow().UtcDateTime;
         var window = CreateOverlayWindow(overlay);
         await window.ShowAsync();
 
         _activeOverlays[overlay.Id] = overlay;
         _overlayWindows[overlay.Id] = window;
 
-        if (overlay.TemporaryMs > 0)
-        {
-            _ = Task.Delay(overlay.TemporaryMs).ContinueWith(async _ =>
-            {
-                await RemoveOverlayAsync(overlay.Id);
-            });
-        }
+        ScheduleExpiry(overlay);
 
         OverlayCreated?.Invoke(this, overlay);
         if (_broadcaster != null) await _broadcaster.BroadcastOverlayCreatedAsync(overlay);
@@ -107,6 +104,9 @@ public class OverlayService : IOverlayService
         if (!_activeOverlays.TryRemove(overlayId, out var overlay))
             return false;
 
+        if (_expiryTimers.TryRemove(overlayId, out var timer))
+            timer.Dispose();
+
         if (_overlayWindows.TryRemove(overlayId, out var window))
         {
             await window.HideAsync();
@@ -132,7 +132,7 @@ public class OverlayService : IOverlayService
                 overlayIds.Add(id);
 
                 // Small delay between overlays
-                await Task.Delay(100);
+                await Task.Delay(TimeSpan.FromMilliseconds(100), _time);
             }
         }
         else
@@ -182,10 +182,32 @@ public class OverlayService : IOverlayService
         return true;
     }
 
+    private void ScheduleExpiry(OverlayElement overlay)
+    {
+        if (overlay.TemporaryMs <= 0) return;
+
+        // One-shot timer on the injected clock; removed early if the overlay is
+        // removed first, so a stale timer never outlives its overlay. Armed
+        // only once stored, so a short TemporaryMs (or a virtual clock advanced
+        // on another thread) cannot fire before the entry exists; the callback
+        // acts only while the entry is still its own.
+        ITimer? timer = null;
+        timer = _time.CreateTimer(_ =>
+        {
+            if (!_expiryTimers.TryRemove(new KeyValuePair<string, ITimer>(overlay.Id, timer!))) return;
+            timer!.Dispose();
+            _ = RemoveOverlayAsync(overlay.Id);
+        }, null, Timeout.InfiniteTimeSpan, Timeout.InfiniteTimeSpan);
+        if (_expiryTimers.TryRemove(overlay.Id, out var previous))
+            previous.Dispose();
+        _expiryTimers[overlay.Id] = timer;
+        timer.Change(TimeSpan.FromMilliseconds(overlay.TemporaryMs), Timeout.InfiniteTimeSpan);
+    }
+
     private IOverlayWindow CreateOverlayWindow(OverlayElement overlay)
     {
         // Web-only build: always use mock overlay window (rendering handled in browser via WebSocket events)
-        return new MockOverlayWindow(overlay);
+        return new MockOverlayWindow(overlay, _time);
     }
 }
 
@@ -0,0 +1,131 @@
+using System;
+using System.Buffers.Binary;
+using System.IO;
+using System.IO.Compression;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Minimal PNG decoder for screenshots written by the external capture
+/// tools, so their output can be cached and cropped like in-process
+/// frames. Handles what those tools write: 8-bit RGB/RGBA, non-interlaced,
+/// any filter. Other formats (palette, 16-bit, Adam7) return null and the
+/// caller keeps the encoded image as is.
+/// </summary>
+public static class PngDecoder
+{
+    private static readonly byte[] Signature = { 0x89, 0x50, 0x4E, 0x47, 0x0D, 0x0A, 0x1A, 0x0A };
+
+    /// <summary>
+    /// Decode to 32-bit BGRX pixels (stride width * 4), or null when the
+    /// image is not in a supported format.
+    /// </summary>
+    public static CapturedFrame? DecodeToBgrx(byte[] png)
+    {
+        try
+        {
+            return Decode(png);
+        }
+        catch (Exception ex) when (ex is InvalidDataException or EndOfStreamException or ArgumentException or IndexOutOfRangeException)
+        {
+            return null;
+        }
+    }
+
+    private static CapturedFrame? Decode(byte[] png)
+    {
+        if (png.Length < Signature.Length || !png.AsSpan(0, Signature.Length).SequenceEqual(Signature)) return null;
+
+        int width = 0, height = 0, channels = 0;
+        using var idat = new MemoryStream();
+        int pos = Signature.Length;
+        while (pos + 8 <= png.Length)
+        {
+            int length = BinaryPrimitives.ReadInt32BigEndian(png.AsSpan(pos));
+            var type = System.Text.Encoding.ASCII.GetString(png, pos + 4, 4);
+            var data = png.AsSpan(pos + 8, length);
+            pos += 12 + length; // length, type, data, CRC
+
+            if (type == "IHDR")
+            {
+                width = BinaryPrimitives.ReadInt32BigEndian(data);
+                height = BinaryPrimitives.ReadInt32BigEndian(data[4..]);
+                byte bitDepth = data[8], colorType = data[9], interlace = data[12];
+                if (bitDepth != 8 || interlace != 0) return null;
+                channels = colorType switch { 2 => 3, 6 => 4, _ => 0 };
+                if (channels == 0) return null;
+            }
+            else if (type == "IDAT")
+            {
+                idat.Write(data);
+            }
+            else if (type == "IEND")
+            {
+                break;
+            }
+        }
+        if (width <= 0 || height <= 0 || channels == 0) return null;
+
+        int rowBytes = width * channels, stride = width * 4;
+        var pixels = new byte[stride * height];
+        var previous = new byte[rowBytes];
+        var current = new byte[rowBytes];
+
+        idat.Position = 0;
+        using var z = new ZLibStream(idat, CompressionMode.Decompress);
+        for (int y = 0; y < height; y++)
+        {
+            int filter = z.ReadByte();
+            if (filter < 0) return null;
+            z.ReadExactly(current);
+            Unfilter(filter, current, previous, channels);
+
+            var dst = pixels.AsSpan(y * stride, stride);
+            for (int x = 0, s = 0; x < width; x++, s += channels)
+            {
+                dst[x * 4] = current[s + 2];
+                dst[x * 4 + 1] = current[s + 1];
+                dst[x * 4 + 2] = current[s];
+                dst[x * 4 + 3] = 0xFF;
+            }
+            (previous, current) = (current, previous);
+        }
+
+        return new CapturedFrame
+        {
+            Pixels = pixels,
+            Width = width,
+            Height = height,
+            Stride = stride
+        };
+    }
+
+    private static void Unfilter(int filter, byte[] row, byte[] prior, int bpp)
+    {
+        switch (filter)
+        {
+            case 0:
+                break;
+            case 1: // Sub
+                for (int i = bpp; i < row.Length; i++) row[i] += row[i - bpp];
+                break;
+            case 2: // Up
+                for (int i = 0; i < row.Length; i++) row[i] += prior[i];
+                break;
+            case 3: // Average
+                for (int i = 0; i < row.Length; i++)
+                    row[i] += (byte)(((i >= bpp ? row[i - bpp] : 0) + prior[i]) >> 1);
+                break;
+            case 4: // Paeth
+                for (int i = 0; i < row.Length; i++)
+                {
+                    int a = i >= bpp ? row[i - bpp] : 0, b = prior[i], c = i >= bpp ? prior[i - bpp] : 0;
+                    int p = a + b - c, pa = Math.Abs(p - a), pb = Math.Abs(p - b), pc = Math.Abs(p - c);
+                    row[i] += (byte)(pa <= pb && pa <= pc ? a : pb <= pc ? b : c);
+                }
+                break;
+            default:
+                throw new InvalidDataException($"unknown PNG filter {filter}");
+        }
+    }
+}
@@ -0,0 +1,103 @@
+using System;
+using System.Buffers.Binary;
+using System.IO;
+using System.IO.Compression;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Minimal PNG encoder for frames grabbed in-process (no System.Drawing,
+/// no external tools). Writes 8-bit RGB with the Sub filter on every row,
+/// which compresses desktop content well at ZLib's fastest level.
+/// </summary>
+public static class PngEncoder
+{
+    private static readonly byte[] Signature = { 0x89, 0x50, 0x4E, 0x47, 0x0D, 0x0A, 0x1A, 0x0A };
+    private static readonly uint[] CrcTable = BuildCrcTable();
+
+    /// <summary>
+    /// Encode 32-bit little-endian BGRX/BGRA pixels (alpha ignored).
+    /// </summary>
+    public static byte[] EncodeBgrx(ReadOnlySpan<byte> pixels, int width, int height, int stride,
+        CompressionLevel level = CompressionLevel.Fastest)
+    {
+        if (width <= 0 || height <= 0) throw new ArgumentException("Image must not be empty");
+        if (stride < width * 4 || pixels.Length < stride * (height - 1) + width * 4)
+            throw new ArgumentException("Pixel buffer is smaller than width/height/stride describe");
+
+        using var output = new MemoryStream(width * height + 1024);
+        output.Write(Signature);
+
+        Span<byte> ihdr = stackalloc byte[13];
+        BinaryPrimitives.WriteInt32BigEndian(ihdr, width);
+        BinaryPrimitives.WriteInt32BigEndian(ihdr[4..], height);
+        ihdr[8] = 8;  // bit depth
+        ihdr[9] = 2;  // color type: truecolor
+        ihdr[10] = 0; // deflate
+        ihdr[11] = 0; // adaptive filtering
+        ihdr[12] = 0; // no interlace
+        WriteChunk(output, "IHDR", ihdr);
+
+        using (var idat = new MemoryStream(width * height))
+        {
+            using (var z = new ZLibStream(idat, level, leaveOpen: true))
+            {
+                var row = new byte[1 + width * 3];
+                row[0] = 1; // Sub: each byte minus the same channel of the previous pixel
+                for (int y = 0; y < height; y++)
+                {
+                    var src = pixels.Slice(y * stride, width * 4);
+                    byte pr = 0, pg = 0, pb = 0;
+                    for (int x = 0, o = 1; x < width; x++, o += 3)
+                    {
+                        byte b = src[x * 4], g = src[x * 4 + 1], r = src[x * 4 + 2];
+                        row[o] = (byte)(r - pr);
+                        row[o + 1] = (byte)(g - pg);
+                        row[o + 2] = (byte)(b - pb);
+                        pr = r; pg = g; pb = b;
+                    }
+                    z.Write(row, 0, row.Length);
+                }
+            }
+            WriteChunk(output, "IDAT", idat.GetBuffer().AsSpan(0, (int)idat.Length));
+        }
+
+        WriteChunk(output, "IEND", ReadOnlySpan<byte>.Empty);
+        return output.ToArray();
+    }
+
+    private static void WriteChunk(Stream output, string type, ReadOnlySpan<byte> data)
+    {
+        Span<byte> header = stackalloc byte[8];
+        BinaryPrimitives.WriteInt32BigEndian(header, data.Length);
+        for (int i = 0; i < 4; i++) header[4 + i] = (byte)type[i];
+        output.Write(header);
+        output.Write(data);
+
+        uint crc = UpdateCrc(0xFFFFFFFFu, header[4..]);
+        crc = UpdateCrc(crc, data) ^ 0xFFFFFFFFu;
+        Span<byte> trailer = stackalloc byte[4];
+        BinaryPrimitives.WriteUInt32BigEndian(trailer, crc);
+        output.Write(trailer);
+    }
+
+    private static uint UpdateCrc(uint crc, ReadOnlySpan<byte> data)
+    {
+        foreach (var b in data)
+            crc = CrcTable[(crc ^ b) & 0xFF] ^ (crc >> 8);
+        return crc;
+    }
+
+    private static uint[] BuildCrcTable()
+    {
+        var table = new uint[256];
+        for (uint n = 0; n < 256; n++)
+        {
+            uint c = n;
+            for (int k = 0; k < 8; k++)
+                c = (c & 1) != 0 ? 0xEDB88320u ^ (c >> 1) : c >> 1;
+            table[n] = c;
+        }
+        return table;
+    }
+}
@@ -1,7 +1,9 @@
 using OverlayCompanion.Models;
 using System;
 using System.Diagnostics;
+using System.Globalization;
 using System.IO;
+using System.Threading;
 using System.Threading.Tasks;
 using System.Text.Json;
 
@@ -13,37 +15,166 @@ namespace OverlayCompanion.Services;
 /// </summary>
 public interface IScreenCaptureService
 {
-    Task<Screenshot> CaptureScreenAsync(ScreenRegion? region = null, bool fullScreen = true);
-    Task<Screenshot> CaptureMonitorAsync(int monitorIndex);
+    Task<Screenshot> CaptureScreenAsync(ScreenRegion? region = null, bool fullScreen = true, int? maxAgeMs = null);
+    Task<Screenshot> CaptureMonitorAsync(int monitorIndex, int? maxAgeMs = null);
+    Task<CapturedFrame?> CaptureFrameAsync(int? maxAgeMs = null);
+
+    /// <summary>
+    /// False once it is known that neither a persistent backend nor the
+    /// tool captures can produce a full frame with pixels, so
+    /// CaptureFrameAsync keeps returning null until the display changes
+    /// </summary>
+    bool CanCaptureFrames { get; }
+
     Task<(int width, int height)> GetScreenResolutionAsync();
     Task<List<MonitorInfo>> GetMonitorsAsync();
     Task<MonitorInfo?> GetMonitorInfoAsync(int monitorIndex);
+    void InvalidateDisplayCache(string reason);
     event EventHandler<Screenshot>? ScreenCaptured;
 }
 
 /// <summary>
-/// Linux-native screen capture implementation using external tools
+/// Linux-native screen capture implementation
+/// Frames come from a persistent in-process backend (X11 MIT-SHM or a
+/// wlr-screencopy session) when one is usable, otherwise from the external
+/// tool chain (grim, gnome-screenshot, spectacle, maim, scrot, import).
+/// The latest full frame is kept so region and monitor requests that
+/// accept a max age are cropped from it in memory.
 /// Extracted and adapted from GraphicalJobApplicationGuidanceSystem
 /// Removed job-specific context, added MCP-compatible features
 /// </summary>
-public class ScreenCaptureService : IScreenCaptureService
+public class ScreenCaptureService : IScreenCaptureService, IDisposable
 {
     public event EventHandler<Screenshot>? ScreenCaptured;
 
-    public async Task<Screenshot> CaptureScreenAsync(ScreenRegion? region = null, bool fullScreen = true)
+    // OC_CAPTURE_BACKEND: auto (default), x11-shm, wlr-screencopy, or
+    // subprocess to always use the external tools
+    private readonly Lazy<ICaptureBackend?> _backend = new(CreateBackend);
+
+    // Most recent full desktop frame; concurrent grabs are serialized so a
+    // burst of requests with a max age shares one capture
+    private readonly SemaphoreSlim _frameLock = new(1, 1);
+    private volatile CapturedFrame? _latestFrame;
+    // Cleared when a tool capture cannot be cropped (undecodable or scaled
+    // output), so region requests go straight to the region tools
+    private volatile bool _toolFramesCroppable = true;
+
+    // Monitor layout, resolution and scale are queried once (several process
+    // spawns) and reused until a display change event, a KasmVNC
+    // display_changed message or the TTL (OC_DISPLAY_CACHE_TTL_SECONDS,
+    // default 30, 0 disables caching) says otherwise
+    private sealed record DisplayTopology(List<MonitorInfo> Monitors, int Width, int Height, double Scale, DateTime LoadedAt);
+
+    private readonly SemaphoreSlim _topologyLock = new(1, 1);
+    private readonly TimeSpan _topologyTtl;
+    private readonly DisplayChangeMonitor _displayChanges = new();
+    private readonly IKasmVNCService? _kasmVnc;
+    private readonly ICapabilityProbeService? _capabilities;
+    private volatile DisplayTopology? _topology;
+    private long _topologyGeneration;
+
+    public ScreenCaptureService(IKasmVNCService? kasmVnc = null, ICapabilityProbeService? capabilities = null)
+    {
+        _capabilities = capabilities;
+
+        var ttlEnv = Environment.GetEnvironmentVariable("OC_DISPLAY_CACHE_TTL_SECONDS");
+        if (!double.TryParse(ttlEnv, NumberStyles.Float, CultureInfo.InvariantCulture, out var ttlSeconds) || ttlSeconds < 0)
+            ttlSeconds = 30;
+        _topologyTtl = TimeSpan.FromSeconds(ttlSeconds);
+
+        _displayChanges.Changed += OnDisplayChanged;
+        _kasmVnc = kasmVnc;
+        if (_kasmVnc != null) _kasmVnc.DisplayChanged += OnKasmDisplayChanged;
+    }
+
+    public void InvalidateDisplayCache(string reason)
     {
+        Interlocked.Increment(ref _topologyGeneration);
+        _topology = null;
+        _latestFrame = null;
+        _toolFramesCroppable = true;
+    }
+
+    private void OnDisplayChanged(object? sender, string reason) => InvalidateDisplayCache(reason);
+
+    private void OnKasmDisplayChanged(object? sender, EventArgs e) => InvalidateDisplayCache("kasmvnc display_changed");
+
+    private async Task<DisplayTopology> GetTopologyAsync()
+    {
+        var cached = _topology;
+        if (cached != null && DateTime.UtcNow - cached.LoadedAt < _topologyTtl) return cached;
+
+        await _topologyLock.WaitAsync();
         try
         {
-            var imageData = await CaptureUsingLinuxTools(region, fullScreen);
+            // Another caller may have loaded it while we waited
+            cached = _topology;
+            if (cached != null && DateTime.UtcNow - cached.LoadedAt < _topologyTtl) return cached;
+
+            if (_topologyTtl > TimeSpan.Zero) _displayChanges.Start();
+            var generation = Interlocked.Read(ref _topologyGeneration);
+
+            var monitorsTask = QueryMonitorsAsync();
+            var resolutionTask = QueryScreenResolutionAsync();
+            var scaleTask = QueryDisplayScaleAsync();
+            await Task.WhenAll(monitorsTask, resolutionTask, scaleTask);
+
+            var (width, height) = resolutionTask.Result;
+            var topology = new DisplayTopology(monitorsTask.Result, width, height, scaleTask.Result, DateTime.UtcNow);
+            // A change event during the queries means this answer may already be stale
+            if (_topologyTtl > TimeSpan.Zero && Interlocked.Read(ref _topologyGeneration) == generation)
+                _topology = topology;
+            return topology;
+        }
+        finally
+        {
+            _topologyLock.Release();
+        }
+    }
+
+    public async Task<Screenshot> CaptureScreenAsync(ScreenRegion? region = null, bool fullScreen = true, int? maxAgeMs = null)
+    {
+        try
+        {
+            // A tool capture is only decoded when the frame is kept for
+            // max_age_ms reuse; otherwise a full-screen PNG is returned as is
+            // and a region goes to the region tools (no capture, decode, crop
+            // and re-encode of the whole desktop)
+            var keep = maxAgeMs > 0;
+            var (frame, png, fromCache) = await GetFullFrameAsync(maxAgeMs, decodeToolCapture: keep, acceptPng: region == null);
+
+            byte[] imageData;
+            int? imageWidth = null, imageHeight = null;
+            var capturedAt = DateTime.UtcNow;
+            var part = frame != null && region != null ? frame.Crop(region) : frame;
+            if (part != null)
+            {
+                // Regions are cropped from the full frame, which also avoids the
+                // interactive selectors some region tools open
+                imageData = part.EncodePng();
+                (imageWidth, imageHeight) = (part.Width, part.Height);
+                capturedAt = part.Timestamp;
+            }
+            else if (png != null && region == null)
+            {
+                imageData = png;
+            }
+            else
+            {
+                imageData = await CaptureUsingLinuxTools(region, fullScreen);
+                fromCache = false;
+            }
             var (width, height) = await GetScreenResolutionAsync();
 
             var screenshot = new Screenshot
             {
                 ImageData = imageData,
-                Width = region?.Width ?? width,
-                Height = region?.Height ?? height,
+                Width = imageWidth ?? region?.Width ?? width,
+                Height = imageHeight ?? region?.Height ?? height,
                 MonitorIndex = await DetectMonitorIndexAsync(region),
                 DisplayScale = await GetDisplayScaleAsync(),
+                Timestamp = capturedAt,
+                FromCache = fromCache,
                 CaptureRegion = region
             };
 
@@ -58,7 +189,7 @@ public class ScreenCaptureService : IScreenCaptureService
         }
     }
 
-    public async Task<Screenshot> CaptureMonitorAsync(int monitorIndex)
+    public async Task<Screenshot> CaptureMonitorAsync(int monitorIndex, int? maxAgeMs = null)
     {
         var monitor = await GetMonitorInfoAsync(monitorIndex);
         if (monitor == null)
@@ -69,11 +200,106 @@ public class ScreenCaptureService : IScreenCaptureService
         // Create region for specific monitor
         var region = new ScreenRegion(monitor.X, monitor.Y, monitor.Width, monitor.Height);
 
-        var screenshot = await CaptureScreenAsync(region, fullScreen: false);
+        var screenshot = await CaptureScreenAsync(region, fullScreen: false, maxAgeMs);
         screenshot.MonitorIndex = monitorIndex;
         return screenshot;
     }
 
+    public async Task<CapturedFrame?> CaptureFrameAsync(int? maxAgeMs = null)
+    {
+        return (await GetFullFrameAsync(maxAgeMs, decodeToolCapture: true, acceptPng: false)).frame;
+    }
+
+    public bool CanCaptureFrames => _backend.Value != null || _toolFramesCroppable;
+
+    /// <summary>
+    /// Latest full desktop frame if it is at most maxAgeMs old, otherwise a
+    /// new one from the backend or, failing that, the full-screen tools.
+    /// A tool capture is decoded (and kept) only with decodeToolCapture;
+    /// one that is not decoded, cannot be decoded or does not line up with
+    /// the monitor layout (scaled Wayland outputs) comes back as png only.
+    /// The tools are not run at all when the caller can use neither.
+    /// </summary>
+    private async Task<(CapturedFrame? frame, byte[]? png, bool fromCache)> GetFullFrameAsync(int? maxAgeMs, bool decodeToolCapture, bool acceptPng)
+    {
+        if (TryGetCachedFrame(maxAgeMs) is { } cached) return (cached, null, true);
+
+        await _frameLock.WaitAsync();
+        try
+        {
+            // Another caller may have captured while we waited
+            if (TryGetCachedFrame(maxAgeMs) is { } fresh) return (fresh, null, true);
+
+            var frame = _backend.Value != null ? await _backend.Value.CaptureAsync() : null;
+            byte[]? png = null;
+            if (frame == null)
+            {
+                var decode = decodeToolCapture && _toolFramesCroppable;
+                if (!decode && !acceptPng) return (null, null, false);
+                png = await CaptureUsingLinuxTools();
+                if (decode)
+                {
+                    frame = await DecodeToolCaptureAsync(png);
+                    _toolFramesCroppable = frame != null;
+                }
+            }
+            if (frame != null) _latestFrame = frame;
+            return (frame, png, false);
+        }
+        finally
+        {
+            _frameLock.Release();
+        }
+    }
+
+    private CapturedFrame? TryGetCachedFrame(int? maxAgeMs)
+    {
+        var cached = _latestFrame;
+        if (cached == null || maxAgeMs is not > 0) return null;
+        return (DateTime.UtcNow - cached.Timestamp).TotalMilliseconds <= maxAgeMs.Value ? cached : null;
+    }
+
+    private async Task<CapturedFrame?> DecodeToolCaptureAsync(byte[] png)
+    {
+        var decoded = PngDecoder.DecodeToBgrx(png);
+        if (decoded == null) return null;
+
+        // Full-screen tools write the bounding box of the layout; anything
+        // else (e.g. physical pixels of scaled outputs) cannot be cropped
+        // with desktop coordinates
+        var monitors = (await GetTopologyAsync()).Monitors;
+        int minX = monitors.Min(m => m.X), minY = monitors.Min(m => m.Y);
+        int maxX = monitors.Max(m => m.X + m.Width), maxY = monitors.Max(m => m.Y + m.Height);
+        if (decoded.Width != maxX - minX || decoded.Height != maxY - minY) return null;
+
+        return new CapturedFrame
+        {
+            Pixels = decoded.Pixels,
+            Width = decoded.Width,
+            Height = decoded.Height,
+            Stride = decoded.Stride,
+            OriginX = minX,
+            OriginY = minY,
+            Timestamp = DateTime.UtcNow,
+            Backend = "subprocess",
+            EncodedPng = png
+        };
+    }
+
+    private static ICaptureBackend? CreateBackend()
+    {
+        var choice = (Environment.GetEnvironmentVariable("OC_CAPTURE_BACKEND") ?? "auto").Trim().ToLowerInvariant();
+        return choice switch
+        {
+            "subprocess" => null,
+            "x11-shm" => new X11ShmCaptureBackend(),
+            "wlr-screencopy" => new WlrScreencopyCaptureBackend(),
+            _ when X11ShmCaptureBackend.IsCandidate => new X11ShmCaptureBackend(),
+            _ when WlrScreencopyCaptureBackend.IsCandidate => new WlrScreencopyCaptureBackend(),
+            _ => null
+        };
+    }
+
     private async Task<byte[]> CaptureUsingLinuxTools(ScreenRegion? region = null, bool fullScreen = true)
     {
         var tempFile = Path.GetTempFileName() + ".png";
@@ -84,8 +310,10 @@ public class ScreenCaptureService : IScreenCaptureService
             var tools = fullScreen || region == null
                 ? GetFullScreenTools(tempFile)
                 : GetRegionTools(tempFile, region);
+            // Tools the capability probe found working, fastest first
+            var ordered = _capabilities?.Order(CapabilityProbeService.Capture, tools, t => t.tool) ?? tools;
 
-            foreach (var (tool, args) in tools)
+            foreach (var (tool, args) in ordered)
             {
                 try
                 {
@@ -114,8 +342,8 @@ public class ScreenCaptureService : IScreenCaptureService
                 catch
                 {
                     // Try next tool
-                    continue;
                 }
+                _capabilities?.ReportFailure(CapabilityProbeService.Capture, tool);
             }
 
             throw new InvalidOperationException("No suitable screen capture tool found. Please install grim, gnome-screenshot, spectacle, scrot, or ImageMagick.");
@@ -146,11 +374,12 @@ public class ScreenCaptureService : IScreenCaptureService
     private static (string tool, string args)[] GetRegionTools(string outputFile, ScreenRegion region)
     {
         var geom = $"{region.X},{region.Y} {region.Width}x{region.Height}";
+        // Used when no in-process or kept frame covers the region.
+        // gnome-screenshot -a and spectacle -r are left out: both
+        // open an interactive selector and would block until a user drags
         return new[]
         {
             ("grim", $"-g \"{geom}\" {outputFile}"), // Non-interactive on Wayland
-            ("gnome-screenshot", $"-a -f {outputFile}"), // Interactive region selection (Wayland-supported)
-            ("spectacle", $"-r -b -n -o {outputFile}"), // KDE region (Wayland-supported)
             ("maim", $"-g {region.Width}x{region.Height}+{region.X}+{region.Y} {outputFile}"), // X11
             ("scrot", $"-a {region.X},{region.Y},{region.Width},{region.Height} {outputFile}"), // X11
             ("import", $"-window root -crop {region.Width}x{region.Height}+{region.X}+{region.Y} {outputFile}") // ImageMagick (X11)
@@ -158,11 +387,17 @@ public class ScreenCaptureService : IScreenCaptureService
     }
 
     public async Task<(int width, int height)> GetScreenResolutionAsync()
+    {
+        var topology = await GetTopologyAsync();
+        return (topology.Width, topology.Height);
+    }
+
+    private async Task<(int width, int height)> QueryScreenResolutionAsync()
     {
         // Try Wayland compositors first
         try
         {
-            var swayJson = await RunCommandAsync("swaymsg", "-t get_outputs -r");
+            var swayJson = IsUsable("swaymsg") ? await RunCommandAsync("swaymsg", "-t get_outputs -r") : string.Empty;
             if (!string.IsNullOrWhiteSpace(swayJson))
             {
                 using var doc = JsonDocument.Parse(swayJson);
@@ -184,7 +419,7 @@ public class ScreenCaptureService : IScreenCaptureService
 
         try
         {
-            var hyprJson = await RunCommandAsync("hyprctl", "monitors -j");
+            var hyprJson = IsUsable("hyprctl") ? await RunCommandAsync("hyprctl", "monitors -j") : string.Empty;
             if (!string.IsNullOrWhiteSpace(hyprJson))
             {
                 using var doc = JsonDocument.Parse(hyprJson);
@@ -201,37 +436,40 @@ public class ScreenCaptureService : IScreenCaptureService
 
         try
         {
-            // Try to get screen resolution using xrandr (X11)
-            var process = new Process
+            if (IsUsable("xrandr"))
             {
-                StartInfo = new ProcessStartInfo
+                // Try to get screen resolution using xrandr (X11)
+                var process = new Process
                 {
-                    FileName = "xrandr",
-                    Arguments = "--current",
-                    UseShellExecute = false,
-                    RedirectStandardOutput = true,
-                    CreateNoWindow = true
-                }
-            };
+                    StartInfo = new ProcessStartInfo
+                    {
+                        FileName = "xrandr",
+                        Arguments = "--current",
+                        UseShellExecute = false,
+                        RedirectStandardOutput = true,
+                        CreateNoWindow = true
+                    }
+                };
 
-            process.Start();
-            var output = await process.StandardOutput.ReadToEndAsync();
-            await process.WaitForExitAsync();
+                process.Start();
+                var output = await process.StandardOutput.ReadToEndAsync();
+                await process.WaitForExitAsync();
 
-            if (process.ExitCode == 0)
-            {
-                // Parse xrandr output to find current resolution
-                var lines = output.Split('\n');
-                foreach (var line in lines)
+                if (process.ExitCode == 0)
                 {
-                    if (line.Contains("*") && line.Contains("x"))
+                    // Parse xrandr output to find current resolution
+                    var lines = output.Split('\n');
+                    foreach (var line in lines)
                     {
-                        var parts = line.Trim().Split(' ')[0].Split('x');
-                        if (parts.Length == 2 &&
-                            int.TryParse(parts[0], out var width) &&
-                            int.TryParse(parts[1], out var height))
+                        if (line.Contains("*") && line.Contains("x"))
                         {
-                            return (width, height);
+                            var parts = line.Trim().Split(' ')[0].Split('x');
+                            if (parts.Length == 2 &&
+                                int.TryParse(parts[0], out var width) &&
+                                int.TryParse(parts[1], out var height))
+                            {
+                                return (width, height);
+                            }
                         }
                     }
                 }
@@ -247,6 +485,11 @@ public class ScreenCaptureService : IScreenCaptureService
     }
 
     private async Task<double> GetDisplayScaleAsync()
+    {
+        return (await GetTopologyAsync()).Scale;
+    }
+
+    private async Task<double> QueryDisplayScaleAsync()
     {
         try
         {
@@ -282,59 +525,50 @@ public class ScreenCaptureService : IScreenCaptureService
 
     public async Task<List<MonitorInfo>> GetMonitorsAsync()
     {
-        var monitors = new List<MonitorInfo>();
-
-        // Wayland-first: try compositor-specific queries
-        try
+        // Copies, so callers cannot edit the cached layout
+        var topology = await GetTopologyAsync();
+        return topology.Monitors.Select(m => new MonitorInfo
         {
-            var swayJson = await RunCommandAsync("swaymsg", "-t get_outputs -r");
-            if (!string.IsNullOrWhiteSpace(swayJson))
-            {
-                monitors = ParseSwaymsgMonitors(swayJson);
-                if (monitors.Any()) return monitors;
-            }
-        }
-        catch { }
+            Index = m.Index,
+            Name = m.Name,
+            Width = m.Width,
+            Height = m.Height,
+            X = m.X,
+            Y = m.Y,
+            IsPrimary = m.IsPrimary,
+            Scale = m.Scale,
+            RefreshRate = m.RefreshRate
+        }).ToList();
+    }
 
-        try
-        {
-            var hyprJson = await RunCommandAsync("hyprctl", "monitors -j");
-            if (!string.IsNullOrWhiteSpace(hyprJson))
-            {
-                monitors = ParseHyprctlMonitors(hyprJson);
-                if (monitors.Any()) return monitors;
-            }
-        }
-        catch { }
+    private async Task<List<MonitorInfo>> QueryMonitorsAsync()
+    {
+        var monitors = new List<MonitorInfo>();
 
-        try
+        // Wayland-first: compositor-specific queries, then X11; reordered to
+        // the fastest working query once the capability probe has run
+        var queries = _capabilities?.Order(CapabilityProbeService.Monitors, MonitorQueries, q => q.tool) ?? MonitorQueries;
+        foreach (var (tool, args) in queries)
         {
-            // Try xrandr first (most common on Linux/X11)
-            var xrandrResult = await RunCommandAsync("xrandr", "--query");
-            if (!string.IsNullOrEmpty(xrandrResult))
+            try
             {
-                monitors = ParseXrandrMonitors(xrandrResult);
-                if (monitors.Any())
-                    return monitors;
-            }
-        }
-        catch { }
+                var output = await RunCommandAsync(tool, args);
+                if (string.IsNullOrWhiteSpace(output)) continue;
 
-        try
-        {
-            // Fallback to xdpyinfo (X11)
-            var xdpyinfoResult = await RunCommandAsync("xdpyinfo", "");
-            if (!string.IsNullOrEmpty(xdpyinfoResult))
-            {
-                monitors = ParseXdpyinfoMonitors(xdpyinfoResult);
-                if (monitors.Any())
-                    return monitors;
+                monitors = tool switch
+                {
+                    "swaymsg" => ParseSwaymsgMonitors(output),
+                    "hyprctl" => ParseHyprctlMonitors(output),
+                    "xrandr" => ParseXrandrMonitors(output),
+                    _ => ParseXdpyinfoMonitors(output)
+                };
+                if (monitors.Any()) return monitors;
             }
+            catch { }
         }
-        catch { }
 
         // Final fallback - single monitor with current resolution
-        var (width, height) = await GetScreenResolutionAsync();
+        var (width, height) = await QueryScreenResolutionAsync();
         monitors.Add(new MonitorInfo
         {
             Index = 0,
@@ -349,6 +583,16 @@ public class ScreenCaptureService : IScreenCaptureService
         return monitors;
     }
 
+    private static readonly (string tool, string args)[] MonitorQueries =
+    {
+        ("swaymsg", "-t get_outputs -r"),
+        ("hyprctl", "monitors -j"),
+        ("xrandr", "--query"),
+        ("xdpyinfo", "")
+    };
+
+    private bool IsUsable(string tool) => _capabilities?.IsUsable(CapabilityProbeService.Monitors, tool) ?? true;
+
     public async Task<MonitorInfo?> GetMonitorInfoAsync(int monitorIndex)
     {
         var monitors = await GetMonitorsAsync();
@@ -360,7 +604,7 @@ public class ScreenCaptureService : IScreenCaptureService
         if (region == null)
             return 0; // Default to primary monitor
 
-        var monitors = await GetMonitorsAsync();
+        var monitors = (await GetTopologyAsync()).Monitors;
 
         // Find which monitor contains the center of the region
         var centerX = region.X + region.Width / 2;
@@ -544,4 +788,12 @@ public class ScreenCaptureService : IScreenCaptureService
             return string.Empty;
         }
     }
+
+    public void Dispose()
+    {
+        if (_backend.IsValueCreated) _backend.Value?.Dispose();
+        _displayChanges.Changed -= OnDisplayChanged;
+        _displayChanges.Dispose();
+        if (_kasmVnc != null) _kasmVnc.DisplayChanged -= OnKasmDisplayChanged;
+    }
 }
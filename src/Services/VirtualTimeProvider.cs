@@ -0,0 +1,167 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Manually advanced clock for deterministic overlay timing in tests.
+/// Enabled with OC_VIRTUAL_TIME=1: time stands still until Advance is called
+/// (over HTTP: POST /debug/time/advance?ms=N), and timers that fall due
+/// fire in due order on the advancing thread, so an expiry test can draw a
+/// temporary overlay, advance past temporary_ms and check it is gone without
+/// sleeping in real time. HTTP transport only; stdio keeps the system clock.
+/// </summary>
+public sealed class VirtualTimeProvider : TimeProvider
+{
+    private readonly object _lock = new();
+    private readonly List<VirtualTimer> _timers = new();
+    private DateTimeOffset _now;
+    private long _elapsedTicks;
+    private long _sequence;
+
+    public VirtualTimeProvider(DateTimeOffset? start = null)
+    {
+        _now = start ?? DateTimeOffset.UtcNow;
+    }
+
+    public static bool IsRequested =>
+        Environment.GetEnvironmentVariable("OC_VIRTUAL_TIME") is "1" or "true";
+
+    public override DateTimeOffset GetUtcNow()
+    {
+        lock (_lock) return _now;
+    }
+
+    public override long TimestampFrequency => TimeSpan.TicksPerSecond;
+
+    public override long GetTimestamp()
+    {
+        lock (_lock) return _elapsedTicks;
+    }
+
+    public int PendingTimers
+    {
+        get { lock (_lock) return _timers.Count; }
+    }
+
+    public override ITimer CreateTimer(TimerCallback callback, object? state, TimeSpan dueTime, TimeSpan period)
+    {
+        var timer = new VirtualTimer(this, callback, state);
+        timer.Change(dueTime, period);
+        return timer;
+    }
+
+    /// <summary>
+    /// Move the clock forward, firing every timer due on the way (including
+    /// ones scheduled by callbacks that fire during this call).
+    /// Returns the number of callbacks invoked.
+    /// </summary>
+    public int Advance(TimeSpan delta)
+    {
+        if (delta < TimeSpan.Zero) throw new ArgumentOutOfRangeException(nameof(delta), "Virtual time cannot go backwards");
+
+        DateTimeOffset target;
+        lock (_lock) target = _now + delta;
+
+        int fired = 0;
+        while (true)
+        {
+            VirtualTimer? next;
+            lock (_lock)
+            {
+                next = _timers
+                    .Where(t => t.DueAt <= target)
+                    .OrderBy(t => t.DueAt)
+                    .ThenBy(t => t.Sequence)
+                    .FirstOrDefault();
+                var until = next?.DueAt ?? target;
+                if (until > _now)
+                {
+                    _elapsedTicks += (until - _now).Ticks;
+                    _now = until;
+                }
+                if (next == null) break;
+                Rearm(next);
+            }
+            next.Fire();
+            fired++;
+        }
+        return fired;
+    }
+
+    private void Schedule(VirtualTimer timer, TimeSpan dueTime, TimeSpan period)
+    {
+        lock (_lock)
+        {
+            _timers.Remove(timer);
+            timer.Period = period;
+            if (dueTime == Timeout.InfiniteTimeSpan) return;
+            timer.DueAt = _now + (dueTime < TimeSpan.Zero ? TimeSpan.Zero : dueTime);
+            timer.Sequence = ++_sequence;
+            _timers.Add(timer);
+        }
+    }
+
+    private void Rearm(VirtualTimer timer)
+    {
+        // Caller holds _lock
+        _timers.Remove(timer);
+        if (timer.Period > TimeSpan.Zero && timer.Period != Timeout.InfiniteTimeSpan)
+        {
+            timer.DueAt += timer.Period;
+            timer.Sequence = ++_sequence;
+            _timers.Add(timer);
+        }
+    }
+
+    private void Cancel(VirtualTimer timer)
+    {
+        lock (_lock) _timers.Remove(timer);
+    }
+
+    private sealed class VirtualTimer : ITimer
+    {
+        private readonly VirtualTimeProvider _owner;
+        private readonly TimerCallback _callback;
+        private readonly object? _state;
+        private bool _disposed;
+
+        public DateTimeOffset DueAt { get; set; }
+        public TimeSpan Period { get; set; }
+        public long Sequence { get; set; }
+
+        public VirtualTimer(VirtualTimeProvider owner, TimerCallback callback, object? state)
+        {
+            _owner = owner;
+            _callback = callback;
+            _state = state;
+        }
+
+        public bool Change(TimeSpan dueTime, TimeSpan period)
+        {
+            if (_disposed) return false;
+            _owner.Schedule(this, dueTime, period);
+            return true;
+        }
+
+        public void Fire()
+        {
+            if (!_disposed) _callback(_state);
+        }
+
+        public void Dispose()
+        {
+            _disposed = true;
+            _owner.Cancel(this);
+        }
+
+        public ValueTask DisposeAsync()
+        {
+            Dispose();
+            return ValueTask.CompletedTask;
+        }
+    }
+}
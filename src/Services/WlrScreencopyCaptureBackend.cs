@@ -0,0 +1,357 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using System.Text.Json;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// Wayland capture through persistent wlr-screencopy sessions on wlroots
+/// compositors (sway, Hyprland, river, ...). One wf-recorder per output
+/// streams raw BGR0 frames over a pipe for as long as captures keep
+/// coming; a reader thread keeps the latest frame of each output in memory
+/// and a capture composes them into the desktop layout. Sessions stop after
+/// IdleTimeout without captures and restart on the next request, so an
+/// idle server does not keep copying frames.
+///
+/// Only unscaled outputs are supported (screencopy buffers are physical
+/// pixels while layout positions are logical); other setups, GNOME/KDE
+/// (which expose screen capture only through the PipeWire portal) and
+/// missing wf-recorder disable the backend, leaving the grim/tool chain.
+/// </summary>
+public sealed class WlrScreencopyCaptureBackend : ICaptureBackend
+{
+    private static readonly TimeSpan FirstFrameTimeout = TimeSpan.FromSeconds(2);
+    private static readonly TimeSpan IdleTimeout = TimeSpan.FromSeconds(30);
+
+    private readonly object _lock = new();
+    private readonly List<OutputStream> _streams = new();
+    private DateTime _lastRequest = DateTime.MinValue;
+    private Timer? _idleTimer;
+    private bool _failed;
+
+    public string Name => "wlr-screencopy";
+
+    public static bool IsCandidate =>
+        !string.IsNullOrEmpty(Environment.GetEnvironmentVariable("WAYLAND_DISPLAY")) &&
+        (!string.IsNullOrEmpty(Environment.GetEnvironmentVariable("SWAYSOCK")) ||
+         !string.IsNullOrEmpty(Environment.GetEnvironmentVariable("HYPRLAND_INSTANCE_SIGNATURE")));
+
+    public async Task<CapturedFrame?> CaptureAsync()
+    {
+        List<OutputStream> streams;
+        lock (_lock)
+        {
+            if (_failed) return null;
+            _lastRequest = DateTime.UtcNow;
+            streams = _streams.ToList();
+        }
+
+        if (streams.Count == 0 || streams.Any(s => s.HasExited))
+        {
+            streams = await StartAsync();
+            if (streams.Count == 0) return null;
+        }
+
+        var deadline = DateTime.UtcNow + FirstFrameTimeout;
+        foreach (var s in streams)
+        {
+            if (!await s.WaitForFirstFrameAsync(deadline - DateTime.UtcNow))
+            {
+                Disable("no frame from wf-recorder within " + FirstFrameTimeout.TotalSeconds + "s");
+                return null;
+            }
+        }
+        return Compose(streams);
+    }
+
+    private static CapturedFrame Compose(List<OutputStream> streams)
+    {
+        if (streams.Count == 1) return streams[0].Snapshot();
+
+        int minX = streams.Min(s => s.Output.X), minY = streams.Min(s => s.Output.Y);
+        int maxX = streams.Max(s => s.Output.X + s.Output.Width), maxY = streams.Max(s => s.Output.Y + s.Output.Height);
+        int width = maxX - minX, height = maxY - minY, stride = width * 4;
+        var pixels = new byte[stride * height];
+        // The composed frame is only as current as its stalest output
+        var timestamp = DateTime.MaxValue;
+        foreach (var s in streams)
+        {
+            var frame = s.Snapshot();
+            if (frame.Timestamp < timestamp) timestamp = frame.Timestamp;
+            for (int row = 0; row < frame.Height; row++)
+            {
+                Buffer.BlockCopy(frame.Pixels, row * frame.Stride, pixels,
+                    (s.Output.Y - minY + row) * stride + (s.Output.X - minX) * 4, frame.Width * 4);
+            }
+        }
+        return new CapturedFrame
+        {
+            Pixels = pixels,
+            Width = width,
+            Height = height,
+            Stride = stride,
+            OriginX = minX,
+            OriginY = minY,
+            Timestamp = timestamp,
+            Backend = "wlr-screencopy"
+        };
+    }
+
+    private async Task<List<OutputStream>> StartAsync()
+    {
+        var outputs = await QueryOutputsAsync();
+        lock (_lock)
+        {
+            if (_failed) return new List<OutputStream>();
+            StopLocked();
+            if (outputs.Count == 0)
+            {
+                DisableLocked("no wlroots outputs found");
+                return new List<OutputStream>();
+            }
+            if (outputs.Any(o => Math.Abs(o.Scale - 1.0) > 0.001))
+            {
+                DisableLocked("scaled outputs are not supported");
+                return new List<OutputStream>();
+            }
+            try
+            {
+                foreach (var o in outputs) _streams.Add(OutputStream.Start(o));
+            }
+            catch (Exception ex)
+            {
+                DisableLocked($"cannot start wf-recorder: {ex.Message}");
+                return new List<OutputStream>();
+            }
+            _idleTimer ??= new Timer(_ => StopIfIdle(), null, IdleTimeout, IdleTimeout);
+            return _streams.ToList();
+        }
+    }
+
+    private void StopIfIdle()
+    {
+        lock (_lock)
+        {
+            if (_streams.Count > 0 && DateTime.UtcNow - _lastRequest > IdleTimeout) StopLocked();
+        }
+    }
+
+    private void StopLocked()
+    {
+        foreach (var s in _streams) s.Dispose();
+        _streams.Clear();
+    }
+
+    private void Disable(string reason)
+    {
+        lock (_lock) DisableLocked(reason);
+    }
+
+    private void DisableLocked(string reason)
+    {
+        if (_failed) return;
+        Console.Error.WriteLine($"[capture] wlr-screencopy disabled: {reason}");
+        _failed = true;
+        StopLocked();
+    }
+
+    private sealed record Output(string Name, int X, int Y, int Width, int Height, double Scale);
+
+    private static async Task<List<Output>> QueryOutputsAsync()
+    {
+        var outputs = new List<Output>();
+        try
+        {
+            var sway = await RunAsync("swaymsg", "-t get_outputs -r");
+            if (!string.IsNullOrWhiteSpace(sway))
+            {
+                using var doc = JsonDocument.Parse(sway);
+                foreach (var el in doc.RootElement.EnumerateArray())
+                {
+                    if (el.TryGetProperty("active", out var active) && !active.GetBoolean()) continue;
+                    var rect = el.GetProperty("rect");
+                    outputs.Add(new Output(
+                        el.GetProperty("name").GetString() ?? "",
+                        rect.GetProperty("x").GetInt32(), rect.GetProperty("y").GetInt32(),
+                        rect.GetProperty("width").GetInt32(), rect.GetProperty("height").GetInt32(),
+                        el.TryGetProperty("scale", out var sc) ? sc.GetDouble() : 1.0));
+                }
+                return outputs;
+            }
+            var hypr = await RunAsync("hyprctl", "monitors -j");
+            if (!string.IsNullOrWhiteSpace(hypr))
+            {
+                using var doc = JsonDocument.Parse(hypr);
+                foreach (var el in doc.RootElement.EnumerateArray())
+                {
+                    outputs.Add(new Output(
+                        el.GetProperty("name").GetString() ?? "",
+                        el.GetProperty("x").GetInt32(), el.GetProperty("y").GetInt32(),
+                        el.GetProperty("width").GetInt32(), el.GetProperty("height").GetInt32(),
+                        el.TryGetProperty("scale", out var sc) ? sc.GetDouble() : 1.0));
+                }
+            }
+        }
+        catch { }
+        return outputs;
+    }
+
+    private static async Task<string> RunAsync(string command, string arguments)
+    {
+        try
+        {
+            using var process = Process.Start(new ProcessStartInfo
+            {
+                FileName = command,
+                Arguments = arguments,
+                UseShellExecute = false,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                CreateNoWindow = true
+            });
+            if (process == null) return string.Empty;
+            var output = await process.StandardOutput.ReadToEndAsync();
+            await process.WaitForExitAsync();
+            return process.ExitCode == 0 ? output : string.Empty;
+        }
+        catch
+        {
+            return string.Empty;
+        }
+    }
+
+    /// <summary>
+    /// One wf-recorder writing rawvideo BGR0 frames for one output to stdout
+    /// </summary>
+    private sealed class OutputStream : IDisposable
+    {
+        private readonly Process _process;
+        private readonly Thread _reader;
+        private readonly object _frameLock = new();
+        private readonly TaskCompletionSource<bool> _firstFrame = new(TaskCreationOptions.RunContinuationsAsynchronously);
+        private byte[] _latest;
+        private DateTime _latestAt; // last damage, not last confirmation
+        private volatile bool _streaming;
+
+        public Output Output { get; }
+        public bool HasExited => _process.HasExited;
+
+        private OutputStream(Output output, Process process)
+        {
+            Output = output;
+            _process = process;
+            _latest = new byte[output.Width * output.Height * 4];
+            _reader = new Thread(ReadLoop) { IsBackground = true, Name = $"wlr-screencopy-{output.Name}" };
+            _reader.Start();
+        }
+
+        public static OutputStream Start(Output output)
+        {
+            var psi = new ProcessStartInfo
+            {
+                FileName = "wf-recorder",
+                UseShellExecute = false,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                CreateNoWindow = true
+            };
+            foreach (var arg in new[] { "-y", "-o", output.Name, "-c", "rawvideo", "-m", "rawvideo", "-x", "bgr0", "-f", "pipe:1" })
+                psi.ArgumentList.Add(arg);
+            var process = Process.Start(psi) ?? throw new InvalidOperationException("wf-recorder did not start");
+            // Drain diagnostics so a full stderr pipe never stalls the stream
+            process.ErrorDataReceived += (_, _) => { };
+            process.BeginErrorReadLine();
+            return new OutputStream(output, process);
+        }
+
+        private void ReadLoop()
+        {
+            var stream = _process.StandardOutput.BaseStream;
+            var back = new byte[_latest.Length];
+            _streaming = true;
+            try
+            {
+                while (true)
+                {
+                    int read = 0;
+                    while (read < back.Length)
+                    {
+                        int n = stream.Read(back, read, back.Length - read);
+                        if (n == 0) return;
+                        read += n;
+                    }
+                    lock (_frameLock)
+                    {
+                        (back, _latest) = (_latest, back);
+                        _latestAt = DateTime.UtcNow;
+                    }
+                    _firstFrame.TrySetResult(true);
+                }
+            }
+            catch (IOException) { }
+            catch (ObjectDisposedException) { }
+            finally
+            {
+                _streaming = false;
+                _firstFrame.TrySetResult(false);
+            }
+        }
+
+        public async Task<bool> WaitForFirstFrameAsync(TimeSpan timeout)
+        {
+            if (timeout < TimeSpan.Zero) timeout = TimeSpan.Zero;
+            var done = await Task.WhenAny(_firstFrame.Task, Task.Delay(timeout));
+            return done == _firstFrame.Task && _firstFrame.Task.Result;
+        }
+
+        public CapturedFrame Snapshot()
+        {
+            lock (_frameLock)
+            {
+                // wf-recorder only writes a frame when the output is damaged,
+                // so while the stream is alive the last frame is still what is
+                // on screen: stamp it now, not when it arrived, or a static
+                // screen would look stale to max_age_ms and the scheduler
+                return new CapturedFrame
+                {
+                    Pixels = (byte[])_latest.Clone(),
+                    Width = Output.Width,
+                    Height = Output.Height,
+                    Stride = Output.Width * 4,
+                    OriginX = Output.X,
+                    OriginY = Output.Y,
+                    Timestamp = _streaming ? DateTime.UtcNow : _latestAt,
+                    Backend = "wlr-screencopy"
+                };
+            }
+        }
+
+        public void Dispose()
+        {
+            try
+            {
+                // Raw frames need no trailer, so there is nothing to finalize
+                _process.Kill();
+                _process.WaitForExit(500);
+            }
+            catch { }
+            _process.Dispose();
+        }
+    }
+
+    public void Dispose()
+    {
+        lock (_lock)
+        {
+            _failed = true;
+            StopLocked();
+            _idleTimer?.Dispose();
+            _idleTimer = null;
+        }
+    }
+}
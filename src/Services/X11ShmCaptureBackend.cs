@@ -0,0 +1,267 @@
+using System;
+using System.Runtime.InteropServices;
+using System.Threading.Tasks;
+
+namespace OverlayCompanion.Services;
+
+/// <summary>
+/// X11 capture over one long-lived display connection using the MIT-SHM
+/// extension: the root window is copied by the X server straight into a
+/// shared memory segment, so a frame costs one XShmGetImage round trip and
+/// a memcpy instead of a process spawn, a PNG encode/decode and a temp file.
+/// The segment is reallocated when the root window changes size (RandR).
+/// Initialization failures (no DISPLAY, no libXext, remote display without
+/// SHM, unexpected pixel format) disable the backend for the process.
+/// </summary>
+public sealed class X11ShmCaptureBackend : ICaptureBackend
+{
+    private const string LibX11 = "libX11.so.6";
+    private const string LibXext = "libXext.so.6";
+    private const string LibC = "libc";
+
+    private const int ZPixmap = 2;
+    private const int IPC_PRIVATE = 0;
+    private const int IPC_CREAT = 0x200;
+    private const int IPC_RMID = 0;
+    private static readonly nuint AllPlanes = nuint.MaxValue;
+
+    [StructLayout(LayoutKind.Sequential)]
+    private struct XShmSegmentInfo
+    {
+        public nuint shmseg;
+        public int shmid;
+        public IntPtr shmaddr;
+        public int readOnly;
+    }
+
+    // Leading fields of Xlib's XImage; the function table that follows is not needed
+    [StructLayout(LayoutKind.Sequential)]
+    private struct XImageHeader
+    {
+        public int width;
+        public int height;
+        public int xoffset;
+        public int format;
+        public IntPtr data;
+        public int byte_order;
+        public int bitmap_unit;
+        public int bitmap_bit_order;
+        public int bitmap_pad;
+        public int depth;
+        public int bytes_per_line;
+        public int bits_per_pixel;
+    }
+
+    private delegate int XErrorHandler(IntPtr display, IntPtr errorEvent);
+
+    [DllImport(LibX11)] private static extern int XInitThreads();
+    [DllImport(LibX11)] private static extern IntPtr XOpenDisplay(string? name);
+    [DllImport(LibX11)] private static extern int XCloseDisplay(IntPtr display);
+    [DllImport(LibX11)] private static extern int XDefaultScreen(IntPtr display);
+    [DllImport(LibX11)] private static extern nuint XRootWindow(IntPtr display, int screen);
+    [DllImport(LibX11)] private static extern IntPtr XDefaultVisual(IntPtr display, int screen);
+    [DllImport(LibX11)] private static extern int XDefaultDepth(IntPtr display, int screen);
+    [DllImport(LibX11)] private static extern int XSync(IntPtr display, int discard);
+    [DllImport(LibX11)] private static extern int XFree(IntPtr data);
+    [DllImport(LibX11)] private static extern IntPtr XSetErrorHandler(XErrorHandler? handler);
+    [DllImport(LibX11)]
+    private static extern int XGetGeometry(IntPtr display, nuint drawable, out nuint root, out int x, out int y,
+        out uint width, out uint height, out uint border, out uint depth);
+
+    [DllImport(LibXext)] private static extern int XShmQueryExtension(IntPtr display);
+    [DllImport(LibXext)]
+    private static extern IntPtr XShmCreateImage(IntPtr display, IntPtr visual, uint depth, int format,
+        IntPtr data, IntPtr shminfo, uint width, uint height);
+    [DllImport(LibXext)] private static extern int XShmAttach(IntPtr display, IntPtr shminfo);
+    [DllImport(LibXext)] private static extern int XShmDetach(IntPtr display, IntPtr shminfo);
+    [DllImport(LibXext)] private static extern int XShmGetImage(IntPtr display, nuint drawable, IntPtr image, int x, int y, nuint planeMask);
+
+    [DllImport(LibC, SetLastError = true)] private static extern int shmget(int key, nuint size, int flags);
+    [DllImport(LibC, SetLastError = true)] private static extern IntPtr shmat(int shmid, IntPtr addr, int flags);
+    [DllImport(LibC)] private static extern int shmdt(IntPtr addr);
+    [DllImport(LibC)] private static extern int shmctl(int shmid, int cmd, IntPtr buf);
+
+    // Xlib's default error handler exits the process; record errors instead.
+    // Kept in a static so the delegate outlives every native callback.
+    private static readonly XErrorHandler ErrorHandler = OnXError;
+    private static volatile int _lastError;
+
+    private readonly object _lock = new();
+    private IntPtr _display;
+    private nuint _root;
+    private IntPtr _visual;
+    private int _depth;
+    private IntPtr _image;
+    private IntPtr _shmInfo;
+    private int _width;
+    private int _height;
+    private bool _failed;
+
+    public string Name => "x11-shm";
+
+    public static bool IsCandidate =>
+        !string.IsNullOrEmpty(Environment.GetEnvironmentVariable("DISPLAY")) &&
+        string.IsNullOrEmpty(Environment.GetEnvironmentVariable("WAYLAND_DISPLAY"));
+
+    public Task<CapturedFrame?> CaptureAsync()
+    {
+        lock (_lock)
+        {
+            if (_failed) return Task.FromResult<CapturedFrame?>(null);
+            try
+            {
+                return Task.FromResult(CaptureLocked());
+            }
+            catch (Exception ex) when (ex is DllNotFoundException or EntryPointNotFoundException or InvalidOperationException)
+            {
+                Console.Error.WriteLine($"[capture] x11-shm disabled: {ex.Message}");
+                _failed = true;
+                ReleaseLocked();
+                return Task.FromResult<CapturedFrame?>(null);
+            }
+        }
+    }
+
+    private CapturedFrame? CaptureLocked()
+    {
+        if (_display == IntPtr.Zero) Open();
+
+        if (XGetGeometry(_display, _root, out _, out _, out _, out var w, out var h, out _, out _) == 0)
+            throw new InvalidOperationException("XGetGeometry failed on the root window");
+        if (_image == IntPtr.Zero || w != _width || h != _height)
+            Allocate((int)w, (int)h);
+
+        _lastError = 0;
+        if (XShmGetImage(_display, _root, _image, 0, 0, AllPlanes) == 0 || _lastError != 0)
+        {
+            // Transient (e.g. mid-RandR change); drop the segment and retry next frame
+            FreeImage();
+            return null;
+        }
+
+        var header = Marshal.PtrToStructure<XImageHeader>(_image);
+        if (header.bits_per_pixel != 32)
+            throw new InvalidOperationException($"unsupported pixel format ({header.bits_per_pixel} bpp)");
+
+        var stride = header.bytes_per_line;
+        var pixels = new byte[stride * header.height];
+        Marshal.Copy(header.data, pixels, 0, pixels.Length);
+        return new CapturedFrame
+        {
+            Pixels = pixels,
+            Width = header.width,
+            Height = header.height,
+            Stride = stride,
+            Timestamp = DateTime.UtcNow,
+            Backend = Name
+        };
+    }
+
+    private void Open()
+    {
+        XInitThreads();
+        XSetErrorHandler(ErrorHandler);
+        _display = XOpenDisplay(null);
+        if (_display == IntPtr.Zero)
+            throw new InvalidOperationException("cannot open X display");
+        if (XShmQueryExtension(_display) == 0)
+            throw new InvalidOperationException("MIT-SHM extension not available");
+        var screen = XDefaultScreen(_display);
+        _root = XRootWindow(_display, screen);
+        _visual = XDefaultVisual(_display, screen);
+        _depth = XDefaultDepth(_display, screen);
+        // XShmCreateImage keeps a pointer to the segment info, so it lives in native memory
+        _shmInfo = Marshal.AllocHGlobal(Marshal.SizeOf<XShmSegmentInfo>());
+    }
+
+    private void Allocate(int width, int height)
+    {
+        FreeImage();
+        var info = new XShmSegmentInfo { shmid = -1 };
+        Marshal.StructureToPtr(info, _shmInfo, false);
+
+        _image = XShmCreateImage(_display, _visual, (uint)_depth, ZPixmap, IntPtr.Zero, _shmInfo, (uint)width, (uint)height);
+        if (_image == IntPtr.Zero)
+            throw new InvalidOperationException("XShmCreateImage failed");
+
+        var header = Marshal.PtrToStructure<XImageHeader>(_image);
+        var size = (nuint)(header.bytes_per_line * header.height);
+        info.shmid = shmget(IPC_PRIVATE, size, IPC_CREAT | 0x180);
+        if (info.shmid < 0)
+            throw new InvalidOperationException($"shmget failed (errno {Marshal.GetLastWin32Error()})");
+        info.shmaddr = shmat(info.shmid, IntPtr.Zero, 0);
+        if (info.shmaddr == new IntPtr(-1))
+        {
+            shmctl(info.shmid, IPC_RMID, IntPtr.Zero);
+            throw new InvalidOperationException($"shmat failed (errno {Marshal.GetLastWin32Error()})");
+        }
+        info.readOnly = 0;
+        Marshal.StructureToPtr(info, _shmInfo, false);
+        Marshal.WriteIntPtr(_image, Marshal.OffsetOf<XImageHeader>(nameof(XImageHeader.data)).ToInt32(), info.shmaddr);
+
+        _lastError = 0;
+        var attached = XShmAttach(_display, _shmInfo) != 0;
+        XSync(_display, 0);
+        // Marked for removal now; the kernel frees it once both sides detach,
+        // so a crash cannot leak the segment
+        shmctl(info.shmid, IPC_RMID, IntPtr.Zero);
+        if (!attached || _lastError != 0)
+        {
+            shmdt(info.shmaddr);
+            XFree(_image);
+            _image = IntPtr.Zero;
+            throw new InvalidOperationException("XShmAttach failed (remote or sandboxed X server?)");
+        }
+        _width = width;
+        _height = height;
+    }
+
+    private void FreeImage()
+    {
+        if (_image == IntPtr.Zero) return;
+        var info = Marshal.PtrToStructure<XShmSegmentInfo>(_shmInfo);
+        XShmDetach(_display, _shmInfo);
+        XSync(_display, 0);
+        if (info.shmaddr != IntPtr.Zero) shmdt(info.shmaddr);
+        // data points into the segment, so free only the XImage struct
+        XFree(_image);
+        _image = IntPtr.Zero;
+        _width = _height = 0;
+    }
+
+    private void ReleaseLocked()
+    {
+        try
+        {
+            if (_display != IntPtr.Zero)
+            {
+                FreeImage();
+                XCloseDisplay(_display);
+            }
+        }
+        catch { }
+        _display = IntPtr.Zero;
+        if (_shmInfo != IntPtr.Zero)
+        {
+            Marshal.FreeHGlobal(_shmInfo);
+            _shmInfo = IntPtr.Zero;
+        }
+    }
+
+    private static int OnXError(IntPtr display, IntPtr errorEvent)
+    {
+        // XErrorEvent: int type; Display*; XID resourceid; unsigned long serial; unsigned char error_code
+        _lastError = Marshal.ReadByte(errorEvent, 4 + 4 + IntPtr.Size * 3);
+        if (_lastError == 0) _lastError = -1;
+        return 0;
+    }
+
+    public void Dispose()
+    {
+        lock (_lock)
+        {
+            ReleaseLocked();
+            _failed = true;
+        }
+    }
+}
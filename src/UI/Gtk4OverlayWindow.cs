@@ -18,6 +18,7 @@ namespace OverlayCompanion.UI;
 public class Gtk4OverlayWindow : IOverlayWindow
 {
     private readonly OverlayElement _overlay;
+    private readonly TimeProvider _time;
     private ApplicationWindow? _window;
     private DrawingArea? _drawingArea;
     private bool _disposed = false;
@@ -28,9 +29,10 @@ public class Gtk4OverlayWindow : IOverlayWindow
 
     public OverlayElement Overlay => _overlay;
 
-    public Gtk4OverlayWindow(OverlayElement overlay)
+    public Gtk4OverlayWindow(OverlayElement overlay, TimeProvider? timeProvider = null)
     {
         _overlay = overlay;
+        _time = timeProvider ?? TimeProvider.System;
         InitializeWindow();
     }
 
@@ -350,7 +352,7 @@ public class Gtk4OverlayWindow : IOverlayWindow
             // Handle temporary overlays
             if (_overlay.TemporaryMs > 0)
             {
-                _ = Task.Delay(_overlay.TemporaryMs).ContinueWith(_ => HideAsync());
+                _ = Task.Delay(TimeSpan.FromMilliseconds(_overlay.TemporaryMs), _time).ContinueWith(_ => HideAsync());
             }
         }
         return Task.CompletedTask;
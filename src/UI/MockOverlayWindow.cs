@@ -11,14 +11,16 @@ namespace OverlayCompanion.UI;
 public class MockOverlayWindow : IOverlayWindow
 {
     private readonly OverlayElement _overlay;
+    private readonly TimeProvider _time;
     private bool _disposed = false;
     private bool _visible = false;
 
     public OverlayElement Overlay => _overlay;
 
-    public MockOverlayWindow(OverlayElement overlay)
+    public MockOverlayWindow(OverlayElement overlay, TimeProvider? timeProvider = null)
     {
         _overlay = overlay;
+        _time = timeProvider ?? TimeProvider.System;
         Console.WriteLine($"MockOverlayWindow created: {overlay.Id} at ({overlay.Bounds.X}, {overlay.Bounds.Y}) size {overlay.Bounds.Width}x{overlay.Bounds.Height}");
     }
 
@@ -32,7 +34,7 @@ public class MockOverlayWindow : IOverlayWindow
             // Handle temporary overlays
             if (_overlay.TemporaryMs > 0)
             {
-                _ = Task.Delay(_overlay.TemporaryMs).ContinueWith(_ => HideAsync());
+                _ = Task.Delay(TimeSpan.FromMilliseconds(_overlay.TemporaryMs), _time).ContinueWith(_ => HideAsync());
             }
         }
         return Task.CompletedTask;
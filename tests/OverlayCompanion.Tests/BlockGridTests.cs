@@ -0,0 +1,67 @@
+using OverlayCompanion.Models;
+using OverlayCompanion.Services;
+using Xunit;
+
+namespace OverlayCompanion.Tests;
+
+public class BlockGridTests
+{
+    [Fact]
+    public void IdenticalFramesHaveNoDirtyRegions()
+    {
+        var a = BlockGrid.Compute(TestFrames.Solid(256, 128));
+        var b = BlockGrid.Compute(TestFrames.Solid(256, 128));
+
+        Assert.Empty(a.ChangedSince(b));
+        Assert.Empty(a.DirtyRegionsSince(b)!);
+    }
+
+    [Fact]
+    public void PaddingByteIsIgnored()
+    {
+        var frame = TestFrames.Solid(128, 64);
+        var padded = TestFrames.Paint(frame, 0xFF, new[] { 3 }, new ScreenRegion(0, 0, 128, 64));
+
+        Assert.Empty(BlockGrid.Compute(padded).DirtyRegionsSince(BlockGrid.Compute(frame))!);
+    }
+
+    [Fact]
+    public void AdjacentDirtyBlocksInARowAreMerged()
+    {
+        var frame = TestFrames.Solid(256, 128);
+        // Blocks 0 and 1 of the first row touch; block 3 of it and block 1 of the second row do not
+        var changed = TestFrames.Paint(frame, 0xFF,
+            new ScreenRegion(10, 10, 1, 1), new ScreenRegion(70, 5, 2, 2),
+            new ScreenRegion(200, 0, 1, 1), new ScreenRegion(100, 100, 1, 1));
+
+        var regions = BlockGrid.Compute(changed).DirtyRegionsSince(BlockGrid.Compute(frame));
+
+        Assert.Equal(new[]
+        {
+            new ScreenRegion(0, 0, 128, 64),
+            new ScreenRegion(192, 0, 64, 64),
+            new ScreenRegion(64, 64, 64, 64)
+        }, regions);
+    }
+
+    [Fact]
+    public void EdgeBlocksAreClippedToTheFrame()
+    {
+        var frame = TestFrames.Solid(100, 70);
+        var changed = TestFrames.Paint(frame, 0xFF, new ScreenRegion(99, 69, 1, 1));
+
+        var regions = BlockGrid.Compute(changed).DirtyRegionsSince(BlockGrid.Compute(frame));
+
+        Assert.Equal(new[] { new ScreenRegion(64, 64, 36, 6) }, regions);
+    }
+
+    [Fact]
+    public void SizeChangeHasNoDirtyRegionsAndChangesEveryBlock()
+    {
+        var before = BlockGrid.Compute(TestFrames.Solid(256, 128));
+        var after = BlockGrid.Compute(TestFrames.Solid(320, 128));
+
+        Assert.Null(after.DirtyRegionsSince(before));
+        Assert.Equal(after.Hashes.Length, after.ChangedSince(before).Count);
+    }
+}
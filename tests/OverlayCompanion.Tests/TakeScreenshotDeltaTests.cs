@@ -0,0 +1,159 @@
+using System.Text.Json;
+using OverlayCompanion.MCP.Tools;
+using OverlayCompanion.Models;
+using OverlayCompanion.Services;
+using Xunit;
+
+namespace OverlayCompanion.Tests;
+
+/// <summary>
+/// take_screenshot with since_frame_id against scripted frames
+/// </summary>
+public class TakeScreenshotDeltaTests
+{
+    private readonly FakeScreenCapture _capture = new();
+    private readonly CaptureSchedulerService _scheduler;
+
+    public TakeScreenshotDeltaTests()
+    {
+        _scheduler = new CaptureSchedulerService(_capture);
+    }
+
+    private async Task<JsonElement> DeltaAsync(CapturedFrame frame, long sinceFrameId)
+    {
+        _capture.Frame = frame;
+        var json = await TakeScreenshotTool.TakeScreenshot(_capture, new ModeManager(), _scheduler, since_frame_id: sinceFrameId);
+        return JsonDocument.Parse(json).RootElement;
+    }
+
+    [Fact]
+    public async Task SmallChangeReturnsOnlyChangedTiles()
+    {
+        var frame = TestFrames.Solid(256, 256);
+        var first = await DeltaAsync(frame, 0);
+        var baseId = first.GetProperty("frame_id").GetInt64();
+
+        var changed = TestFrames.Paint(frame, 0xFF, new ScreenRegion(130, 70, 4, 4));
+        var delta = await DeltaAsync(changed, baseId);
+
+        Assert.False(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal(baseId + 1, delta.GetProperty("frame_id").GetInt64());
+        Assert.Equal(64 * 64, delta.GetProperty("changed_pixels").GetInt64());
+        var tile = Assert.Single(delta.GetProperty("tiles").EnumerateArray());
+        Assert.Equal(128, tile.GetProperty("x").GetInt32());
+        Assert.Equal(64, tile.GetProperty("y").GetInt32());
+
+        var pixels = PngDecoder.DecodeToBgrx(Convert.FromBase64String(tile.GetProperty("image_base64").GetString()!));
+        Assert.NotNull(pixels);
+        Assert.Equal(64, pixels!.Width);
+        Assert.Equal(0xFF, pixels.Pixels[(6 * 64 + 2) * 4]);
+    }
+
+    [Fact]
+    public async Task UnchangedCaptureKeepsTheFrameId()
+    {
+        var frame = TestFrames.Solid(256, 256);
+        var baseId = (await DeltaAsync(frame, 0)).GetProperty("frame_id").GetInt64();
+
+        var delta = await DeltaAsync(TestFrames.Solid(256, 256), baseId);
+
+        Assert.False(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal(baseId, delta.GetProperty("frame_id").GetInt64());
+        Assert.Empty(delta.GetProperty("tiles").EnumerateArray());
+    }
+
+    [Fact]
+    public async Task ZeroStartsWithAKeyframe()
+    {
+        var delta = await DeltaAsync(TestFrames.Solid(256, 256), 0);
+
+        Assert.True(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal("base frame not available", delta.GetProperty("keyframe_reason").GetString());
+        Assert.NotNull(delta.GetProperty("image_base64").GetString());
+    }
+
+    [Fact]
+    public async Task HalfTheScreenChangedIsStillADelta()
+    {
+        var frame = TestFrames.Solid(256, 256);
+        var baseId = (await DeltaAsync(frame, 0)).GetProperty("frame_id").GetInt64();
+
+        // 8 of 16 blocks: exactly half is not more than MaxDeltaFraction
+        var delta = await DeltaAsync(TestFrames.Paint(frame, 0xFF, new ScreenRegion(0, 0, 256, 128)), baseId);
+
+        Assert.False(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal(2, delta.GetProperty("tiles").GetArrayLength());
+    }
+
+    [Fact]
+    public async Task MostOfTheScreenChangedFallsBackToAKeyframe()
+    {
+        var frame = TestFrames.Solid(256, 256);
+        var baseId = (await DeltaAsync(frame, 0)).GetProperty("frame_id").GetInt64();
+
+        // 9 of 16 blocks
+        var changed = TestFrames.Paint(frame, 0xFF, new ScreenRegion(0, 0, 256, 128), TestFrames.Block(0, 2));
+        var delta = await DeltaAsync(changed, baseId);
+
+        Assert.True(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal("most of the screen changed", delta.GetProperty("keyframe_reason").GetString());
+        Assert.Empty(delta.GetProperty("tiles").EnumerateArray());
+        Assert.Equal(256L * 256, delta.GetProperty("changed_pixels").GetInt64());
+    }
+
+    [Fact]
+    public async Task SizeChangeFallsBackToAKeyframe()
+    {
+        var baseId = (await DeltaAsync(TestFrames.Solid(256, 256), 0)).GetProperty("frame_id").GetInt64();
+
+        var delta = await DeltaAsync(TestFrames.Solid(320, 256), baseId);
+
+        Assert.True(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal("frame size changed", delta.GetProperty("keyframe_reason").GetString());
+        Assert.Equal(320, delta.GetProperty("width").GetInt32());
+    }
+
+    [Fact]
+    public async Task EvictedBaseFrameFallsBackToAKeyframe()
+    {
+        var frame = TestFrames.Solid(256, 256);
+        var baseId = (await DeltaAsync(frame, 0)).GetProperty("frame_id").GetInt64();
+
+        // The current frame is stored before the base is looked up, so the
+        // base survives Capacity - 1 newer frames including that one ...
+        for (byte i = 1; i < _scheduler.Capacity - 1; i++)
+            _scheduler.Register(TestFrames.Paint(frame, i, TestFrames.Block(0, 0)));
+        var delta = await DeltaAsync(TestFrames.Paint(frame, 0xFF, TestFrames.Block(1, 1)), baseId);
+        Assert.False(delta.GetProperty("keyframe").GetBoolean());
+
+        // ... and the next one takes its slot
+        delta = await DeltaAsync(TestFrames.Paint(frame, 0xFE, TestFrames.Block(1, 1)), baseId);
+        Assert.Null(_scheduler.GetFrame(baseId));
+        Assert.True(delta.GetProperty("keyframe").GetBoolean());
+        Assert.Equal("base frame not available", delta.GetProperty("keyframe_reason").GetString());
+    }
+
+    private sealed class FakeScreenCapture : IScreenCaptureService
+    {
+        public CapturedFrame? Frame { get; set; }
+
+        public bool CanCaptureFrames => Frame != null;
+
+        public Task<CapturedFrame?> CaptureFrameAsync(int? maxAgeMs = null) => Task.FromResult(Frame);
+
+        public Task<Screenshot> CaptureScreenAsync(ScreenRegion? region = null, bool fullScreen = true, int? maxAgeMs = null) =>
+            throw new NotSupportedException();
+
+        public Task<Screenshot> CaptureMonitorAsync(int monitorIndex, int? maxAgeMs = null) => throw new NotSupportedException();
+
+        public Task<(int width, int height)> GetScreenResolutionAsync() => throw new NotSupportedException();
+
+        public Task<List<MonitorInfo>> GetMonitorsAsync() => throw new NotSupportedException();
+
+        public Task<MonitorInfo?> GetMonitorInfoAsync(int monitorIndex) => throw new NotSupportedException();
+
+        public void InvalidateDisplayCache(string reason) { }
+
+        public event EventHandler<Screenshot>? ScreenCaptured { add { } remove { } }
+    }
+}
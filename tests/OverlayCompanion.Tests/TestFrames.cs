@@ -0,0 +1,54 @@
+using OverlayCompanion.Models;
+using OverlayCompanion.Services;
+
+namespace OverlayCompanion.Tests;
+
+/// <summary>
+/// Synthetic BGRX frames for the capture tests
+/// </summary>
+internal static class TestFrames
+{
+    public static CapturedFrame Solid(int width, int height, byte gray = 0x40)
+    {
+        var pixels = new byte[width * height * 4];
+        Array.Fill(pixels, gray);
+        return new CapturedFrame { Pixels = pixels, Width = width, Height = height, Stride = width * 4 };
+    }
+
+    /// <summary>
+    /// Copy of frame with the given regions (frame coordinates) filled with
+    /// one color; channel 3 is the X padding byte
+    /// </summary>
+    public static CapturedFrame Paint(CapturedFrame frame, byte value, params ScreenRegion[] regions) =>
+        Paint(frame, value, channels: new[] { 0, 1, 2 }, regions);
+
+    public static CapturedFrame Paint(CapturedFrame frame, byte value, int[] channels, params ScreenRegion[] regions)
+    {
+        var pixels = (byte[])frame.Pixels.Clone();
+        foreach (var r in regions)
+        {
+            for (int y = r.Y; y < r.Y + r.Height; y++)
+            {
+                for (int x = r.X; x < r.X + r.Width; x++)
+                {
+                    foreach (var c in channels) pixels[y * frame.Stride + x * 4 + c] = value;
+                }
+            }
+        }
+        return new CapturedFrame
+        {
+            Pixels = pixels,
+            Width = frame.Width,
+            Height = frame.Height,
+            Stride = frame.Stride,
+            OriginX = frame.OriginX,
+            OriginY = frame.OriginY
+        };
+    }
+
+    /// <summary>
+    /// Region of one 64x64 block of the grid
+    /// </summary>
+    public static ScreenRegion Block(int column, int row) =>
+        new(column * BlockGrid.BlockSize, row * BlockGrid.BlockSize, BlockGrid.BlockSize, BlockGrid.BlockSize);
+}
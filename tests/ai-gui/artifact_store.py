@@ -0,0 +1,224 @@
+"""
+Content-addressed artifact store for harness evidence.
+
+Evidence dicts collected by harness.py carry whole tool responses,
+including base64 screenshots. Serialising those inline makes summary.json
+huge and slow to write, and every screenshot ends up on disk twice (once
+in the JSON, once as a PNG). The store pulls binary payloads out of
+evidence, writes each distinct payload once under
+
+    <root>/sha256/<2 hex>/<digest>[.gz]
+
+and leaves a small reference in its place:
+
+    {"$artifact": "sha256:<digest>", "size": 12345,
+     "media_type": "image/png", "path": "store/sha256/ab/abcd..."}
+
+Payloads that are already compressed (PNG, JPEG, ...) are stored as-is;
+others are gzip-compressed when compress=True. JSON documents are encoded
+and written incrementally to a temp file and renamed into place, so a
+large summary is never built as one string and readers never see a
+partial file.
+
+    store = ArtifactStore(ARTIFACTS / "store")
+    store.write_json(ARTIFACTS / "summary.json", summary)
+    data = store.read(ref)
+"""
+
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+REF_KEY = "$artifact"
+
+# Strings at least this long that are not recognised as base64 are still
+# moved out of the JSON as text/plain
+INLINE_LIMIT = 64 * 1024
+
+# Base64 strings shorter than this stay inline (ids, small icons)
+MIN_BINARY = 1024
+
+_PRECOMPRESSED = {"image/png", "image/jpeg", "image/webp", "application/gzip"}
+
+_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"RIFF", "image/webp"),
+    (b"\x1f\x8b", "application/gzip"),
+]
+
+
+def sniff_media_type(data: bytes) -> str:
+    for magic, media_type in _MAGIC:
+        if data.startswith(magic):
+            return media_type
+    return "application/octet-stream"
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and REF_KEY in value
+
+
+def _decode_b64(value: str) -> Optional[bytes]:
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+class ArtifactStore:
+    def __init__(self, root: Path, compress: bool = True):
+        self.root = Path(root)
+        self.compress = compress
+        self.stats = {"stored": 0, "deduplicated": 0, "bytes_stored": 0}
+
+    def _object_path(self, digest: str, gz: bool) -> Path:
+        name = digest + (".gz" if gz else "")
+        return self.root / "sha256" / digest[:2] / name
+
+    def put(self, data: bytes, media_type: Optional[str] = None) -> Dict[str, Any]:
+        """Store bytes once by content hash and return a reference"""
+        media_type = media_type or sniff_media_type(data)
+        digest = hashlib.sha256(data).hexdigest()
+        gz = self.compress and media_type not in _PRECOMPRESSED
+        path = self._object_path(digest, gz)
+        other = self._object_path(digest, not gz)
+        if other.exists():
+            path, gz = other, not gz
+        if path.exists():
+            self.stats["deduplicated"] += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    if gz:
+                        # mtime=0 keeps the object bytes reproducible
+                        with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as zf:
+                            zf.write(data)
+                    else:
+                        f.write(data)
+                os.chmod(tmp, 0o444)  # mkstemp creates 0600
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self.stats["stored"] += 1
+            self.stats["bytes_stored"] += path.stat().st_size
+        ref = {
+            REF_KEY: f"sha256:{digest}",
+            "size": len(data),
+            "media_type": media_type,
+            "path": os.path.relpath(path, self.root.parent),
+        }
+        if gz:
+            ref["encoding"] = "gzip"
+        return ref
+
+    def link(self, ref: Dict[str, Any], dest: Path) -> Path:
+        """
+        Make dest a hard link to a stored (uncompressed) object, or a copy
+        across filesystems. Objects are read-only; writers must replace
+        dest rather than rewrite it in place.
+        """
+        dest = Path(dest)
+        obj = self.root.parent / ref["path"]
+        tmp = dest.with_name(f".{dest.name}.link")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(obj, tmp)
+        except OSError:
+            shutil.copyfile(obj, tmp)
+        os.replace(tmp, dest)
+        return dest
+
+    def put_file(self, src: Path, media_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store an existing file and swap it for a link to the stored object,
+        so the named file stays browsable without taking space twice.
+        """
+        src = Path(src)
+        ref = self.put(src.read_bytes(), media_type)
+        if ref.get("encoding"):
+            return ref
+        return dict(ref, file=str(self.link(ref, src)))
+
+    def put_as(
+        self, data: bytes, dest: Path, media_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """put() plus a named link at dest"""
+        ref = self.put(data, media_type)
+        if ref.get("encoding"):
+            Path(dest).unlink(missing_ok=True)
+            Path(dest).write_bytes(data)
+            return dict(ref, file=str(dest))
+        return dict(ref, file=str(self.link(ref, dest)))
+
+    def read(self, ref: Dict[str, Any]) -> bytes:
+        data = (self.root.parent / ref["path"]).read_bytes()
+        if ref.get("encoding") == "gzip":
+            data = gzip.decompress(data)
+        return data
+
+    def extract(self, value: Any, key: Optional[str] = None) -> Any:
+        """
+        Copy of value with binary payloads replaced by references: bytes,
+        base64 strings under *base64 keys or under "data" next to a
+        mimeType (MCP image/resource blocks), and any string longer than
+        INLINE_LIMIT.
+        """
+        if isinstance(value, dict):
+            mime = value.get("mimeType") or value.get("mime_type")
+            out = {}
+            for k, v in value.items():
+                if k == "data" and mime and isinstance(v, str):
+                    out[k] = self._extract_b64(v, mime) or v
+                else:
+                    out[k] = self.extract(v, k)
+            return out
+        if isinstance(value, (list, tuple)):
+            return [self.extract(v) for v in value]
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return self.put(bytes(value))
+        if isinstance(value, str):
+            if key and key.lower().endswith("base64"):
+                ref = self._extract_b64(value)
+                if ref:
+                    return ref
+            if len(value) >= INLINE_LIMIT:
+                return self.put(value.encode("utf-8"), "text/plain")
+        return value
+
+    def _extract_b64(
+        self, value: str, media_type: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        if len(value) < MIN_BINARY:
+            return None
+        data = _decode_b64(value)
+        if data is None:
+            return None
+        return dict(self.put(data, media_type), transfer="base64")
+
+    def write_json(self, path: Path, data: Any, indent: Optional[int] = 2) -> Path:
+        """Extract payloads from data and stream it to path atomically"""
+        doc = self.extract(data)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", buffering=1 << 16) as f:
+                for chunk in json.JSONEncoder(indent=indent).iterencode(doc):
+                    f.write(chunk)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
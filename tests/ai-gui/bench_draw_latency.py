@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Draw-to-pixel latency benchmark
+
+Measures how long an agent waits before an overlay change is actually on
+screen, not just how long the tool call takes. For each iteration:
+
+- draw_overlay: time from call start until the target rectangle differs
+  from the clean background
+- re_anchor_element: until the new rectangle has changed and the old one
+  is back to background
+- remove_overlay: until the rectangle is back to background
+
+The display is a private Xvfb whose framebuffer is memory mapped
+(framebuffer.py), so only the target rectangle is compared on each sample
+and polling runs at sub-millisecond intervals. The tool call runs on a
+worker thread so pixels that land before the HTTP response are caught.
+
+Two rendering paths are compared:
+
+- mock: the server's MockOverlayWindow backend (HEADLESS=1); pixels come
+  from the web overlay viewer (wwwroot/index.html) opened full screen in a
+  browser on the same display
+- gtk: a build with the GTK4 layer-shell window backend (--gtk-bin). Layer
+  shell needs a wlroots compositor, which is started nested on the Xvfb
+  display (--compositor, e.g. "sway -c /dev/null" with WLR_BACKENDS=x11)
+
+A calibration draw first locates where a requested rectangle lands on the
+framebuffer (browser chrome, nested compositor window offsets and scaling),
+so both paths are measured in the same coordinates.
+
+Example:
+    python3 bench_draw_latency.py --paths mock --iterations 50
+    python3 bench_draw_latency.py --paths mock,gtk --gtk-bin ./gtk-build/app \\
+        --compositor "sway -c /dev/null" --json artifacts/draw_latency.json
+"""
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from drivers.mcp_http import McpHttpClient, tool_result, wait_until_ready
+from framebuffer import XvfbDisplay, XwdFramebuffer
+from timing import summarize
+from verifier.frame_diff import changed_regions, diff_mask
+
+HERE = Path(__file__).parent.resolve()
+ROOT = Path(os.environ.get("AI_GUI_ROOT", HERE / "../.."))
+APP_BIN = Path(
+    os.environ.get("AI_GUI_APP_BIN", ROOT / "build/publish/overlay-companion-mcp")
+)
+ARTIFACTS = Path(os.environ.get("AI_GUI_ARTIFACTS", HERE / "artifacts")).resolve()
+
+VIEWERS = ("chromium", "chromium-browser", "google-chrome", "firefox")
+COLOR = "#FF00FF"
+Rect = Tuple[int, int, int, int]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def viewer_command(url: str, width: int, height: int) -> Optional[list]:
+    for name in VIEWERS:
+        exe = shutil.which(name)
+        if not exe:
+            continue
+        if "firefox" in name:
+            return [exe, "--kiosk", "--new-instance", url]
+        profile = tempfile.mkdtemp(prefix="ai-gui-viewer-")
+        return [
+            exe,
+            f"--app={url}",
+            "--kiosk",
+            "--no-first-run",
+            "--disable-gpu-vsync",
+            f"--user-data-dir={profile}",
+            "--window-position=0,0",
+            f"--window-size={width},{height}",
+        ]
+    return None
+
+
+class Mapping:
+    """Requested overlay coordinates -> framebuffer pixels"""
+
+    def __init__(self, dx: float = 0.0, dy: float = 0.0, scale: float = 1.0):
+        self.dx, self.dy, self.scale = dx, dy, scale
+
+    def rect(self, x: int, y: int, w: int, h: int, fb: XwdFramebuffer) -> Rect:
+        x0 = int(round(self.dx + x * self.scale))
+        y0 = int(round(self.dy + y * self.scale))
+        x1 = min(fb.width, int(round(self.dx + (x + w) * self.scale)))
+        y1 = min(fb.height, int(round(self.dy + (y + h) * self.scale)))
+        return (max(x0, 0), max(y0, 0), max(x1, 0), max(y1, 0))
+
+
+def changed_pixels(fb: XwdFramebuffer, box: Rect, clean: np.ndarray, thr: int) -> int:
+    x0, y0, x1, y1 = box
+    live = fb.rgb()[y0:y1, x0:x1]
+    delta = np.maximum(live, clean)
+    delta -= np.minimum(live, clean)
+    peak = np.maximum(np.maximum(delta[..., 0], delta[..., 1]), delta[..., 2])
+    return int(np.count_nonzero(peak > thr))
+
+
+def crop(frame: np.ndarray, box: Rect) -> np.ndarray:
+    x0, y0, x1, y1 = box
+    return frame[y0:y1, x0:x1].copy()
+
+
+class TimedCall(threading.Thread):
+    """Runs one tool call off the sampling thread and records its latency"""
+
+    def __init__(self, client: McpHttpClient, name: str, args: Dict[str, Any]):
+        super().__init__(daemon=True)
+        self.client, self.name, self.args = client, name, args
+        self.t_start = 0.0
+        self.api_ms: Optional[float] = None
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def run(self):
+        try:
+            resp = self.client.call_tool(self.name, self.args)
+            self.api_ms = (time.perf_counter() - self.t_start) * 1000.0
+            self.result = tool_result(resp)
+            if (resp.get("result") or {}).get("isError") or resp.get("error"):
+                self.error = json.dumps(resp.get("error") or resp.get("result"))
+        except Exception as e:
+            self.error = str(e)
+
+    def go(self) -> "TimedCall":
+        self.t_start = time.perf_counter()
+        self.start()
+        return self
+
+
+def wait_pixels(
+    cond, t_start: float, timeout_s: float, poll_s: float
+) -> Optional[float]:
+    """Poll cond() until true; ms since t_start, or None on timeout"""
+    deadline = t_start + timeout_s
+    while True:
+        if cond():
+            return (time.perf_counter() - t_start) * 1000.0
+        if time.perf_counter() > deadline:
+            return None
+        time.sleep(poll_s)
+
+
+def calibrate(client, fb, screen: Tuple[int, int], timeout_s: float) -> Mapping:
+    """Draw one large overlay and find where it lands on the framebuffer"""
+    w, h = screen
+    req = (w // 4, h // 4, w // 3, h // 3)
+    before = fb.snapshot()
+    client.call_tool(
+        "draw_overlay",
+        {
+            "id": "calibration",
+            "x": req[0],
+            "y": req[1],
+            "width": req[2],
+            "height": req[3],
+            "color": COLOR,
+            "opacity": 1.0,
+        },
+    )
+    deadline = time.monotonic() + timeout_s
+    regions = []
+    while time.monotonic() < deadline:
+        regions = changed_regions(diff_mask(before, fb.snapshot()), cell=4)
+        big = [r for r in regions if r["width"] > req[2] // 2]
+        if big:
+            r = max(big, key=lambda r: r["pixels"])
+            scale = r["width"] / float(req[2])
+            mapping = Mapping(r["x"] - req[0] * scale, r["y"] - req[1] * scale, scale)
+            break
+        time.sleep(0.05)
+    else:
+        raise RuntimeError("calibration overlay never became visible")
+    client.call_tool(
+        "remove_overlay", {"overlayId": "calibration", "overlay_id": "calibration"}
+    )
+    time.sleep(0.5)
+    return mapping
+
+
+def run_path(args, name: str) -> Dict[str, Any]:
+    screen = tuple(int(v) for v in args.screen.lower().split("x"))
+    result: Dict[str, Any] = {"path": name, "screen": args.screen}
+    procs = []
+    xvfb = XvfbDisplay(screens=[screen]).start()
+    try:
+        env = {**os.environ, **xvfb.env()}
+        env.pop("WAYLAND_DISPLAY", None)
+        binary = args.bin
+        if name == "mock":
+            env["HEADLESS"] = "1"
+        else:
+            # The default publish excludes UI/Gtk4*.cs, so it only has the mock
+            if not args.gtk_bin:
+                raise RuntimeError("gtk path needs --gtk-bin (a GTK4-enabled build)")
+            binary = args.gtk_bin
+            env.pop("HEADLESS", None)
+            if args.compositor:
+                runtime = tempfile.mkdtemp(prefix="ai-gui-wl-")
+                env.update({"XDG_RUNTIME_DIR": runtime, "WLR_BACKENDS": "x11"})
+                procs.append(
+                    subprocess.Popen(
+                        shlex.split(args.compositor),
+                        env=env,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                    )
+                )
+                sock = wait_for_wayland(Path(runtime), timeout=20)
+                env["WAYLAND_DISPLAY"] = sock
+                env["GDK_BACKEND"] = "wayland"
+
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/mcp"
+        env["PORT"] = str(port)
+        procs.append(
+            subprocess.Popen(
+                [str(binary), "--http"],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        )
+        wait_until_ready(url, timeout=60)
+        client = McpHttpClient(url, client_name=f"draw-latency-{name}")
+        client.initialize()
+
+        if name == "mock":
+            cmd = viewer_command(f"http://127.0.0.1:{port}/", *screen)
+            if not cmd:
+                raise RuntimeError(
+                    "mock path needs a browser viewer: " + "/".join(VIEWERS)
+                )
+            procs.append(
+                subprocess.Popen(
+                    cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            )
+            wait_for_viewer(client, timeout=30)
+            time.sleep(args.settle)
+
+        fb = xvfb.framebuffer()
+        mapping = calibrate(client, fb, screen, args.timeout_ms / 1000.0 * 5)
+        result["mapping"] = {"dx": mapping.dx, "dy": mapping.dy, "scale": mapping.scale}
+        result.update(measure(args, client, fb, mapping, screen))
+        client.close()
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+            try:
+                p.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        xvfb.stop()
+    return result
+
+
+def wait_for_wayland(runtime: Path, timeout: float) -> str:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        socks = sorted(p.name for p in runtime.glob("wayland-*") if p.suffix != ".lock")
+        if socks:
+            return socks[0]
+        time.sleep(0.1)
+    raise RuntimeError("compositor did not create a Wayland socket")
+
+
+def wait_for_viewer(client: McpHttpClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            health = client.get_json("/health")
+            if (health.get("services") or {}).get("websocket_clients", 0) > 0:
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("viewer never connected to /ws/overlays")
+
+
+def measure(args, client, fb, mapping: Mapping, screen) -> Dict[str, Any]:
+    timeout_s = args.timeout_ms / 1000.0
+    poll_s = args.poll_us / 1e6
+    thr = args.threshold
+    ops = {
+        k: {"visual_ms": [], "api_ms": [], "timeouts": 0, "errors": 0}
+        for k in ("draw_overlay", "re_anchor_element", "remove_overlay")
+    }
+    w, h = args.size
+    span_x, span_y = screen[0] - 2 * w, screen[1] - h
+
+    def record(op, call, visual):
+        call.join(timeout=timeout_s)
+        if call.error:
+            ops[op]["errors"] += 1
+        if call.api_ms is not None:
+            ops[op]["api_ms"].append(call.api_ms)
+        if visual is None:
+            ops[op]["timeouts"] += 1
+        else:
+            ops[op]["visual_ms"].append(visual)
+
+    for i in range(args.iterations):
+        x = 20 + (i * 97) % max(span_x - 40, 1)
+        y = 60 + (i * 61) % max(span_y - 80, 1)
+        oid = f"lat-{i}"
+        box = mapping.rect(x, y, w, h, fb)
+        moved = mapping.rect(x + w, y, w, h, fb)
+        clean = fb.snapshot()
+        clean_box, clean_moved = crop(clean, box), crop(clean, moved)
+        # Enough changed pixels for a 2px border at half opacity
+        need = max(16, ((box[2] - box[0]) + (box[3] - box[1])) // 2)
+
+        call = TimedCall(
+            client,
+            "draw_overlay",
+            {
+                "id": oid,
+                "x": x,
+                "y": y,
+                "width": w,
+                "height": h,
+                "color": COLOR,
+                "opacity": 1.0,
+            },
+        ).go()
+        visual = wait_pixels(
+            lambda: changed_pixels(fb, box, clean_box, thr) >= need,
+            call.t_start,
+            timeout_s,
+            poll_s,
+        )
+        record("draw_overlay", call, visual)
+
+        call = TimedCall(
+            client,
+            "re_anchor_element",
+            {"overlay_id": oid, "x": x + w, "y": y, "anchor_mode": "absolute"},
+        ).go()
+        visual = wait_pixels(
+            lambda: changed_pixels(fb, moved, clean_moved, thr) >= need
+            and changed_pixels(fb, box, clean_box, thr) <= need // 8,
+            call.t_start,
+            timeout_s,
+            poll_s,
+        )
+        record("re_anchor_element", call, visual)
+
+        call = TimedCall(
+            client, "remove_overlay", {"overlayId": oid, "overlay_id": oid}
+        ).go()
+        visual = wait_pixels(
+            lambda: changed_pixels(fb, moved, clean_moved, thr) <= need // 8,
+            call.t_start,
+            timeout_s,
+            poll_s,
+        )
+        record("remove_overlay", call, visual)
+        time.sleep(args.gap_ms / 1000.0)
+
+    out = {}
+    for op, d in ops.items():
+        out[op] = {
+            "visual_ms": summarize(d["visual_ms"]),
+            "api_ms": summarize(d["api_ms"]),
+            "timeouts": d["timeouts"],
+            "errors": d["errors"],
+        }
+    return {"ops": out}
+
+
+def print_report(results):
+    header = [
+        "path",
+        "op",
+        "n",
+        "api p50",
+        "vis p50",
+        "vis p90",
+        "vis p99",
+        "vis max",
+        "timeouts",
+    ]
+    rows = []
+    for r in results:
+        if "error" in r:
+            rows.append([r["path"], "error: " + r["error"]] + [""] * 7)
+            continue
+        for op, d in r["ops"].items():
+            v, a = d["visual_ms"], d["api_ms"]
+            rows.append(
+                [
+                    r["path"],
+                    op,
+                    v.get("count", 0),
+                    a.get("p50", ""),
+                    v.get("p50", ""),
+                    v.get("p90", ""),
+                    v.get("p99", ""),
+                    v.get("max", ""),
+                    d["timeouts"],
+                ]
+            )
+    cells = [header] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(header))]
+    for row in cells:
+        print("  ".join(c.ljust(widths[i]) for i, c in enumerate(row)).rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Draw-to-pixel latency benchmark")
+    parser.add_argument("--bin", type=Path, default=APP_BIN)
+    parser.add_argument("--gtk-bin", type=Path, help="build with the GTK4 backend")
+    parser.add_argument(
+        "--compositor", help="nested wlroots compositor for --paths gtk"
+    )
+    parser.add_argument("--paths", default="mock", help="comma list: mock,gtk")
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--size", type=int, nargs=2, default=(240, 120))
+    parser.add_argument("--threshold", type=int, default=24, help="per-channel delta")
+    parser.add_argument("--timeout-ms", type=float, default=2000.0)
+    parser.add_argument("--poll-us", type=float, default=250.0)
+    parser.add_argument("--gap-ms", type=float, default=50.0)
+    parser.add_argument("--settle", type=float, default=2.0, help="viewer load wait")
+    parser.add_argument("--json", help="write results here")
+    args = parser.parse_args()
+
+    if not shutil.which("Xvfb"):
+        sys.exit("Xvfb is required")
+    results = []
+    for name in [p.strip() for p in args.paths.split(",") if p.strip()]:
+        print(f"[draw-latency] path {name} ...")
+        results.append(run_path(args, name))
+    print_report(results)
+    out = Path(args.json) if args.json else ARTIFACTS / "draw_latency.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"[draw-latency] wrote {out}")
+    sys.exit(0 if all("error" not in r for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
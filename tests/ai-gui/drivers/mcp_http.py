@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Persistent Streamable HTTP MCP client for the ai-gui runners
+
+Builds on perf_common.McpHttpSession (one MCP session and one keep-alive
+connection for the lifetime of the client), so per-call timings measure
+the tool and not process start-up or TCP handshakes. Adds what the
+benchmarks and the scenario runner need on top: phase recording, the
+response headers and the wall time of the last call. Used where the HTTP
+server is needed for /ws/overlays viewers.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from timing import phase, rpc_phase
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from perf_common import McpHttpSession  # noqa: E402
+from perf_common import tool_json as tool_result  # noqa: E402,F401
+from perf_common import wait_for_http as wait_until_ready  # noqa: E402,F401
+
+
+class McpHttpClient(McpHttpSession):
+    """
+    McpHttpSession with phase recording and per-call timing.
+
+    After each request, last_headers holds the response headers (lower-case
+    names) and last_elapsed_ms the wall time of the HTTP exchange. Requests
+    are never resent, so a dropped connection cannot run a tool twice. Not
+    thread-safe; use one instance per thread.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, client_name: str = "ai-gui"):
+        super().__init__(url, timeout=timeout, client_name=client_name)
+        self.last_elapsed_ms: float = 0.0
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        t0 = time.perf_counter()
+        with phase(*rpc_phase(method, params)):
+            resp = super().request(method, params)
+        self.last_elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        return resp
+
+    def get_json(self, path: str) -> Dict[str, Any]:
+        """GET a JSON endpoint on the same server (e.g. /health)"""
+        parts = urlsplit(self.url)
+        url = urlunsplit((parts.scheme, parts.netloc, path, "", ""))
+        r = self._http.get(url, timeout=self.timeout)
+        return r.json() if r.content else {}
@@ -9,6 +9,8 @@ import subprocess
 import time
 from typing import Any, Dict, List, Optional
 
+from timing import PHASES, phase, rpc_phase
+
 
 class McpRawJsonClient:
     """
@@ -47,11 +49,12 @@ class McpRawJsonClient:
             params = {}
 
         # Create a fresh process for each request (this is what works)
-        process = self._start_process()
+        with phase("spawn", "startup", method=method):
+            process = self._start_process()
 
         try:
             # Wait a moment for server to start
-            time.sleep(0.5)
+            PHASES.sleep(0.5, "server start wait")
 
             # Send request
             request = {
@@ -61,38 +64,40 @@ class McpRawJsonClient:
                 "params": params,
             }
 
-            request_json = json.dumps(request) + "\n"
-            process.stdin.write(request_json)
-            process.stdin.flush()
-
-            # Read response with timeout
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if process.poll() is not None:
-                    # Process has exited
-                    break
-
-                # Try to read a line
-                try:
-                    response_line = process.stdout.readline()
-                    if response_line:
-                        response = json.loads(response_line.strip())
-                        return response
-                except json.JSONDecodeError:
-                    # Invalid JSON, try again
-                    continue
-
-                time.sleep(0.1)
+            with phase(*rpc_phase(method, params)):
+                request_json = json.dumps(request) + "\n"
+                process.stdin.write(request_json)
+                process.stdin.flush()
+
+                # Read response with timeout
+                start_time = time.time()
+                while time.time() - start_time < timeout:
+                    if process.poll() is not None:
+                        # Process has exited
+                        break
+
+                    # Try to read a line
+                    try:
+                        response_line = process.stdout.readline()
+                        if response_line:
+                            response = json.loads(response_line.strip())
+                            return response
+                    except json.JSONDecodeError:
+                        # Invalid JSON, try again
+                        continue
+
+                    time.sleep(0.1)
 
             raise Exception(f"No valid response received within {timeout} seconds")
 
         finally:
             # Cleanup
-            try:
-                process.terminate()
-                process.wait(timeout=2)
-            except Exception:
-                process.kill()
+            with phase("terminate", "startup"):
+                try:
+                    process.terminate()
+                    process.wait(timeout=2)
+                except Exception:
+                    process.kill()
 
     def initialize(
         self, client_name: str = "raw-json-client", client_version: str = "1.0.0"
@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from timing import phase, rpc_phase
+
 
 class McpStdioClient:
     """
@@ -55,10 +57,11 @@ class McpStdioClient:
             return
 
         # Use the official SDK to create and manage the process
-        self._client_context = stdio_client(self._server_params)
-        read_stream, write_stream = await self._client_context.__aenter__()
-        self._session_context = ClientSession(read_stream, write_stream)
-        self._session = await self._session_context.__aenter__()
+        with phase("spawn", "startup"):
+            self._client_context = stdio_client(self._server_params)
+            read_stream, write_stream = await self._client_context.__aenter__()
+            self._session_context = ClientSession(read_stream, write_stream)
+            self._session = await self._session_context.__aenter__()
 
     async def _cleanup(self):
         """Clean up MCP session and connections"""
@@ -108,7 +111,8 @@ class McpStdioClient:
                 }
             }
 
-        return self._run_async(_initialize())
+        with phase(*rpc_phase("initialize")):
+            return self._run_async(_initialize())
 
     def list_tools(self) -> Dict[str, Any]:
         """List available tools"""
@@ -119,7 +123,8 @@ class McpStdioClient:
             # Convert to dict format compatible with old client
             return {"result": {"tools": [tool.model_dump() for tool in result.tools]}}
 
-        return self._run_async(_list_tools())
+        with phase(*rpc_phase("tools/list")):
+            return self._run_async(_list_tools())
 
     def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call a tool with the given arguments"""
@@ -135,11 +140,13 @@ class McpStdioClient:
                 }
             }
 
-        return self._run_async(_call_tool())
+        with phase(*rpc_phase("tools/call", {"name": name})):
+            return self._run_async(_call_tool())
 
     def close(self):
         """Close the MCP connection"""
-        self._run_async(self._cleanup())
+        with phase("terminate", "startup"):
+            self._run_async(self._cleanup())
 
 
 # Alternative approach: Create a client that works with command only
@@ -164,10 +171,11 @@ class McpStdioClientSimple:
             return
 
         # Use the official SDK to create and manage the process
-        self._client_context = stdio_client(self._server_params)
-        read_stream, write_stream = await self._client_context.__aenter__()
-        self._session_context = ClientSession(read_stream, write_stream)
-        self._session = await self._session_context.__aenter__()
+        with phase("spawn", "startup"):
+            self._client_context = stdio_client(self._server_params)
+            read_stream, write_stream = await self._client_context.__aenter__()
+            self._session_context = ClientSession(read_stream, write_stream)
+            self._session = await self._session_context.__aenter__()
 
     async def _cleanup(self):
         """Clean up MCP session and connections"""
@@ -217,7 +225,8 @@ class McpStdioClientSimple:
                 }
             }
 
-        return self._run_async(_initialize())
+        with phase(*rpc_phase("initialize")):
+            return self._run_async(_initialize())
 
     def list_tools(self) -> Dict[str, Any]:
         """List available tools"""
@@ -228,7 +237,8 @@ class McpStdioClientSimple:
             # Convert to dict format compatible with old client
             return {"result": {"tools": [tool.model_dump() for tool in result.tools]}}
 
-        return self._run_async(_list_tools())
+        with phase(*rpc_phase("tools/list")):
+            return self._run_async(_list_tools())
 
     def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Call a tool with the given arguments"""
@@ -244,8 +254,10 @@ class McpStdioClientSimple:
                 }
             }
 
-        return self._run_async(_call_tool())
+        with phase(*rpc_phase("tools/call", {"name": name})):
+            return self._run_async(_call_tool())
 
     def close(self):
         """Close the MCP connection"""
-        self._run_async(self._cleanup())
+        with phase("terminate", "startup"):
+            self._run_async(self._cleanup())
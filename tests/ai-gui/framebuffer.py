@@ -0,0 +1,192 @@
+"""
+Zero-copy access to an Xvfb framebuffer.
+
+Xvfb started with `-fbdir DIR` keeps each screen's framebuffer in
+DIR/Xvfb_screen<N> as an XWD file that the server draws into directly.
+Mapping that file gives live frames as numpy views: no subprocess, no PNG
+encode and no disk write per capture, so tests can sample the display at
+a high rate.
+
+    with XvfbDisplay(screens=[(1920, 1080)]) as disp:
+        fb = disp.framebuffer()
+        rgb = fb.rgb()        # live (H, W, 3) view, changes as X draws
+        still = fb.snapshot() # contiguous copy
+
+run.sh starts Xvfb with -fbdir and exports AI_GUI_FBDIR; open_framebuffer()
+picks that up.
+"""
+
+import mmap
+import os
+import struct
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_XWD_FIELDS = (
+    "header_size file_version pixmap_format pixmap_depth pixmap_width "
+    "pixmap_height xoffset byte_order bitmap_unit bitmap_bit_order bitmap_pad "
+    "bits_per_pixel bytes_per_line visual_class red_mask green_mask blue_mask "
+    "bits_per_rgb colormap_entries ncolors window_width window_height "
+    "window_x window_y window_bdrwidth"
+).split()
+_XWD_HEADER = struct.Struct(">25I")
+_XWD_COLOR_SIZE = 12  # CARD32 pixel, 3x CARD16, CARD8 flags, CARD8 pad
+_LSB_FIRST = 0
+
+
+class XwdFramebuffer:
+    """Memory-mapped XWD file exposed as numpy views"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            self._mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self.header = dict(zip(_XWD_FIELDS, _XWD_HEADER.unpack_from(self._mm, 0)))
+        hdr = self.header
+        if hdr["file_version"] != 7:
+            raise ValueError(f"{self.path}: not an XWD v7 file")
+        if hdr["bits_per_pixel"] != 32:
+            raise ValueError(
+                f"{self.path}: {hdr['bits_per_pixel']} bpp is unsupported "
+                "(start Xvfb with a 24 or 32 bit depth screen)"
+            )
+        self.width = hdr["pixmap_width"]
+        self.height = hdr["pixmap_height"]
+        self.bytes_per_line = hdr["bytes_per_line"]
+        image_size = self.bytes_per_line * self.height
+        offset = hdr["header_size"] + hdr["ncolors"] * _XWD_COLOR_SIZE
+        if offset + image_size > len(self._mm):
+            # Defensive: trust the file size over the colormap count
+            offset = len(self._mm) - image_size
+        self.offset = offset
+        rows = np.frombuffer(
+            self._mm, dtype=np.uint8, count=image_size, offset=offset
+        ).reshape(self.height, self.bytes_per_line)
+        self._pixels = rows[:, : self.width * 4].reshape(self.height, self.width, 4)
+        # Channel order from the red mask and the image byte order
+        red_byte = (hdr["red_mask"].bit_length() - 1) // 8
+        if hdr["byte_order"] != _LSB_FIRST:
+            red_byte = 3 - red_byte
+        self._rgb_step = -1 if red_byte == 2 else 1
+        self._red = red_byte
+
+    def raw(self) -> np.ndarray:
+        """Live (H, W, 4) view of the framebuffer in server byte order"""
+        return self._pixels
+
+    def rgb(self) -> np.ndarray:
+        """Live (H, W, 3) RGB view (strided, no copy)"""
+        if self._rgb_step < 0:
+            return self._pixels[:, :, self._red :: -1][:, :, :3]
+        return self._pixels[:, :, self._red : self._red + 3]
+
+    def snapshot(self, rect: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """Contiguous RGB copy of the whole frame or an (x, y, w, h) region"""
+        view = self.rgb()
+        if rect is not None:
+            x, y, w, h = rect
+            view = view[max(y, 0) : y + h, max(x, 0) : x + w]
+        return np.ascontiguousarray(view)
+
+    def close(self):
+        # Views keep the buffer exported; only unmap once they are gone
+        self._pixels = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+
+class XvfbDisplay:
+    """
+    Xvfb on a free display number with its framebuffers in a directory.
+
+    The fbdir defaults to a fresh directory under /dev/shm (tmpfs) so the
+    mapped pages never touch a disk.
+    """
+
+    def __init__(
+        self,
+        screens: Sequence[Tuple[int, int]] = ((1920, 1080),),
+        depth: int = 24,
+        fbdir: Optional[Path] = None,
+        extra_args: Sequence[str] = (),
+    ):
+        self.screens = list(screens)
+        self.depth = depth
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        self.fbdir = Path(fbdir or tempfile.mkdtemp(prefix="xvfb-fb-", dir=base))
+        self.extra_args = list(extra_args)
+        self.proc: Optional[subprocess.Popen] = None
+        self.display: Optional[str] = None
+        self._fbs: List[XwdFramebuffer] = []
+
+    def start(self) -> "XvfbDisplay":
+        self.fbdir.mkdir(parents=True, exist_ok=True)
+        read_fd, write_fd = os.pipe()
+        cmd = ["Xvfb", "-displayfd", str(write_fd), "-nolisten", "tcp"]
+        cmd += ["-fbdir", str(self.fbdir)]
+        for i, (w, h) in enumerate(self.screens):
+            cmd += ["-screen", str(i), f"{w}x{h}x{self.depth}"]
+        cmd += self.extra_args
+        self.proc = subprocess.Popen(
+            cmd,
+            pass_fds=(write_fd,),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        os.close(write_fd)
+        with os.fdopen(read_fd) as r:
+            number = r.readline().strip()
+        if not number:
+            self.stop()
+            raise RuntimeError("Xvfb failed to start")
+        self.display = f":{number}"
+        return self
+
+    def env(self) -> dict:
+        return {"DISPLAY": self.display, "AI_GUI_FBDIR": str(self.fbdir)}
+
+    def framebuffer(self, screen: int = 0) -> XwdFramebuffer:
+        fb = XwdFramebuffer(self.fbdir / f"Xvfb_screen{screen}")
+        self._fbs.append(fb)
+        return fb
+
+    def stop(self):
+        for fb in self._fbs:
+            fb.close()
+        self._fbs = []
+        if self.proc:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            self.proc = None
+
+    def __enter__(self) -> "XvfbDisplay":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def open_framebuffer(screen: int = 0) -> Optional[XwdFramebuffer]:
+    """Framebuffer of the display run.sh started with -fbdir, if any"""
+    fbdir = os.environ.get("AI_GUI_FBDIR")
+    if not fbdir:
+        return None
+    path = Path(fbdir) / f"Xvfb_screen{screen}"
+    if not path.exists():
+        return None
+    try:
+        return XwdFramebuffer(path)
+    except (OSError, ValueError):
+        return None
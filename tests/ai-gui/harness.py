@@ -8,7 +8,14 @@ import time
 from pathlib import Path
 from typing import Any, Dict
 
-from verifier.image_checks import avg_color_in_rect, likely_not_black
+import numpy as np
+from PIL import Image
+
+from artifact_store import ArtifactStore
+from drivers.mcp_http import tool_result
+from framebuffer import open_framebuffer
+from timing import PHASES, append_history, budget_table, phase
+from verifier.image_checks import avg_color_in_rect, likely_not_black, load_frame
 
 HERE = Path(__file__).parent.resolve()
 ARTIFACTS = Path(os.environ.get("AI_GUI_ARTIFACTS", HERE / "artifacts")).resolve()
@@ -19,6 +26,20 @@ APP_BIN = Path(
 
 ARTIFACTS.mkdir(parents=True, exist_ok=True)
 
+# Rolling per-category budget of recent runs; point this at a cached path
+# in CI to compare across jobs
+BUDGET_HISTORY = Path(
+    os.environ.get("AI_GUI_BUDGET_HISTORY", ARTIFACTS / "budget_history.jsonl")
+)
+# Phases run.sh timed before Python started (setup, build)
+RUN_MARKS = Path(os.environ.get("AI_GUI_PHASES_FILE", ARTIFACTS / "run_phases.jsonl"))
+
+# Screenshots and other binary payloads are stored once by hash; evidence
+# JSON only carries references (set AI_GUI_STORE_COMPRESS=0 to disable gzip)
+STORE = ArtifactStore(
+    ARTIFACTS / "store", compress=os.environ.get("AI_GUI_STORE_COMPRESS") != "0"
+)
+
 # Simple helpers
 
 
@@ -37,7 +58,41 @@ def run(
     )
 
 
+_FRAMEBUFFER = None
+
+
+def grab_frame() -> np.ndarray | None:
+    """
+    Current screen as an RGB array.
+
+    Reads the Xvfb framebuffer directly when run.sh started Xvfb with -fbdir
+    (no subprocess, no encode); otherwise falls back to ImageMagick import.
+    """
+    global _FRAMEBUFFER
+    if _FRAMEBUFFER is None:
+        _FRAMEBUFFER = open_framebuffer()
+    if _FRAMEBUFFER is not None:
+        return _FRAMEBUFFER.snapshot()
+    if subprocess.call("command -v import >/dev/null", shell=True) == 0:
+        out = subprocess.run(
+            ["import", "-window", "root", "png:-"], capture_output=True, timeout=60
+        )
+        if out.stdout:
+            return load_frame(out.stdout)
+    return None
+
+
 def capture_screenshot(path: Path) -> bool:
+    with phase("capture_screenshot", "screenshot"):
+        return _capture_screenshot(path)
+
+
+def _capture_screenshot(path: Path) -> bool:
+    # Framebuffer mapping avoids the ImageMagick round trip entirely
+    fb_frame = grab_frame() if os.environ.get("AI_GUI_FBDIR") else None
+    if fb_frame is not None:
+        Image.fromarray(fb_frame).save(path)
+        return path.exists() and path.stat().st_size > 0
     # Prefer ImageMagick import if available (works with Xvfb)
     if subprocess.call("command -v import >/dev/null", shell=True) == 0:
         _ = run("import -window root " + shlex.quote(str(path)))
@@ -51,63 +106,111 @@ def start_app() -> subprocess.Popen:
     # Ensure GUI is allowed; don't set HEADLESS here
     args = [str(APP_BIN)]
     # Use binary mode pipes for stdio framing compatibility
-    return subprocess.Popen(
-        args,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        stdin=subprocess.PIPE,
-        text=False,
-        bufsize=0,
-    )
+    with phase("start_app", "startup"):
+        return subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            text=False,
+            bufsize=0,
+        )
 
 
 def stop_app(p: subprocess.Popen):
-    try:
-        p.terminate()
+    with phase("stop_app", "startup"):
         try:
-            p.wait(timeout=10)
-        except subprocess.TimeoutExpired:
-            p.kill()
-    except Exception:
-        pass
+            p.terminate()
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        except Exception:
+            pass
 
 
 def write_json(path: Path, data: Any):
-    path.write_text(json.dumps(data, indent=2))
+    with phase("write_json", "io", path=Path(path).name):
+        STORE.write_json(path, data)
+
+
+def timed_step(name: str, fn, *args) -> dict:
+    """Run one harness step as a phase and record its start/end in the evidence"""
+    with phase(name, "step") as p:
+        evidence = fn(*args)
+    if p.event is not None:
+        evidence["timing"] = {
+            "category": p.event["cat"],
+            "start": round(p.event["start"], 6),
+            "end": round(p.event["end"], 6),
+            "elapsed_ms": round((p.event["end"] - p.event["start"]) * 1000.0, 3),
+        }
+    return evidence
+
+
+def report_timing(summary: Dict[str, Any], ok: bool):
+    """Budget table, Chrome trace and rolling history for this run"""
+    budget = PHASES.budget()
+    summary["timing"] = budget
+    trace = ARTIFACTS / "trace.json"
+    trace.write_text(json.dumps(PHASES.chrome_trace()))
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "ok": ok,
+        "budget": budget,
+    }
+    deltas = append_history(BUDGET_HISTORY, record)
+    # stdout stays the JSON summary; the table goes to stderr
+    print(budget_table(budget), file=sys.stderr)
+    if deltas:
+        print("\nvs median of recent runs:", file=sys.stderr)
+        for cat, base, ms, delta in deltas:
+            print(
+                f"  {cat:<12} {base / 1000.0:8.2f}s -> {ms / 1000.0:8.2f}s "
+                f"({delta:+.1f}%)",
+                file=sys.stderr,
+            )
+    print(f"\nChrome trace: {trace}", file=sys.stderr)
 
 
 def smoke_test() -> dict:
     evidence = {"phase": "smoke"}
-    time.sleep(1.0)
+    PHASES.sleep(1.0, "settle")
     snap = ARTIFACTS / "smoke_1.png"
+    snap.unlink(missing_ok=True)  # may be a link into the store
     if capture_screenshot(snap):
-        evidence["screenshot"] = str(snap)
+        evidence["screenshot"] = STORE.put_file(snap)
         evidence["ok"] = True
     else:
         evidence["ok"] = False
         evidence["error"] = "screenshot_failed"
+    return evidence
 
 
 # Simple verification helper
 def verify_overlay(img_path: Path, rect: dict) -> dict:
     res = {"phase": "verify", "rect": rect}
-    try:
-        color = avg_color_in_rect(
-            str(img_path), (rect["x"], rect["y"], rect["width"], rect["height"])
-        )
-        res["avg_color"] = color
-        res["ok"] = likely_not_black(color)
-    except Exception as e:
-        res["ok"] = False
-        res["error"] = str(e)
+    with phase("verify_overlay", "verify"):
+        try:
+            color = avg_color_in_rect(
+                str(img_path), (rect["x"], rect["y"], rect["width"], rect["height"])
+            )
+            res["avg_color"] = color
+            res["ok"] = likely_not_black(color)
+        except Exception as e:
+            res["ok"] = False
+            res["error"] = str(e)
     return res
 
 
 def main():
     summary: Dict[str, Any] = {"ok": False, "steps": []}
+    PHASES.enable()
+    PHASES.load_marks(RUN_MARKS)
     try:
         # Try raw JSON MCP roundtrip first (most reliable with current server)
-        mcp_step = mcp_roundtrip(None)  # Raw JSON client manages its own processes
+        # Raw JSON client manages its own processes
+        mcp_step = timed_step("mcp_raw_json", mcp_roundtrip, None)
         summary["steps"].append(mcp_step)
 
         if not mcp_step.get("ok"):
@@ -115,8 +218,8 @@ def main():
             app: subprocess.Popen | None = None
             try:
                 app = start_app()
-                time.sleep(2.0)
-                summary["steps"].append(smoke_test())
+                PHASES.sleep(2.0, "app start wait")
+                summary["steps"].append(timed_step("smoke", smoke_test))
             finally:
                 if app:
                     stop_app(app)
@@ -139,8 +242,9 @@ def main():
         summary["error"] = str(e)
         summary["ok"] = False
 
+    report_timing(summary, bool(summary.get("ok")))
     write_json(ARTIFACTS / "summary.json", summary)
-    print(json.dumps(summary, indent=2))
+    print(json.dumps(STORE.extract(summary), indent=2))
     sys.exit(0 if summary.get("ok") else 1)
 
 
@@ -200,26 +304,25 @@ def mcp_roundtrip_with_sdk() -> dict:
         }
         dr = client.call_tool(draw_name, rect)
         evidence["draw_overlay"] = dr
-        overlay_id = None
-        try:
-            overlay_id = (dr.get("result") or {}).get("overlay_id")
-        except Exception:
-            pass
+        overlay_id = tool_result(dr).get("overlay_id")
 
         # Call take_screenshot
         ts = client.call_tool(take_name, {})
-        evidence["take_screenshot"] = ts
-        img_b64 = None
-        try:
-            img_b64 = (ts.get("result") or {}).get("image_base64")
-        except Exception:
-            pass
+        # The image travels as JSON inside the text block; keep it decoded so
+        # the store can pull image_base64 out instead of one opaque string
+        shot = tool_result(ts)
+        evidence["take_screenshot"] = {
+            "isError": (ts.get("result") or {}).get("isError", False),
+            "data": shot,
+        }
+        img_b64 = shot.get("image_base64")
 
         if img_b64:
             img_path = ARTIFACTS / "mcp_roundtrip.png"
             try:
-                img_path.write_bytes(base64.b64decode(img_b64))
-                evidence["screenshot_file"] = str(img_path)
+                evidence["screenshot_file"] = STORE.put_as(
+                    base64.b64decode(img_b64), img_path, "image/png"
+                )
                 # Verify overlay presence roughly
                 evidence["verify"] = verify_overlay(img_path, rect)
             except Exception as e:
@@ -242,6 +345,7 @@ def mcp_roundtrip_with_sdk() -> dict:
                 client.close()
             except Exception:
                 pass
+    return evidence
 
 
 def mcp_roundtrip(app_proc: subprocess.Popen) -> dict:
@@ -315,6 +419,7 @@ def mcp_roundtrip(app_proc: subprocess.Popen) -> dict:
         import traceback
 
         evidence["traceback"] = traceback.format_exc()
+    return evidence
 
 
 if __name__ == "__main__":
@@ -1,23 +1,129 @@
+import bisect
+import math
 import random
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Agent traffic is dominated by a few highlight colors; later entries are rarer
+PALETTE = [
+    "#FFFF00",
+    "#FF0000",
+    "#00FF00",
+    "#00FFFF",
+    "#FF00FF",
+    "#0080FF",
+    "#FF8000",
+    "#FFFFFF",
+]
+
+# (aspect w/h, weight): buttons and text rows dominate, then icons and panels
+ASPECTS = [(3.0, 0.35), (1.0, 0.25), (5.0, 0.2), (1.6, 0.15), (0.5, 0.05)]
+
+# (temporary_ms, weight); 0 = persistent until removed
+LIFETIMES = [(0, 0.55), (500, 0.15), (2000, 0.2), (10000, 0.1)]
+
+
+def _cumulative(weights: Iterable[float]) -> List[float]:
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+def _pick(rnd: random.Random, cum: List[float]) -> int:
+    # Same draw as rnd.choices(..., cum_weights=cum) but returns the index
+    return bisect.bisect_right(cum, rnd.random() * cum[-1], 0, len(cum) - 1)
+
+
+def zipf_weights(n: int, s: float) -> List[float]:
+    return [1.0 / (k**s) for k in range(1, n + 1)]
+
+
+def parse_monitors(spec: str) -> List[Dict[str, int]]:
+    """
+    "1920x1080,2560x1440" -> monitors laid out left to right. An explicit
+    origin may be given as WxH+X+Y (e.g. "1920x1080+0+0,1280x1024+1920+56").
+    """
+    monitors, next_x = [], 0
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        size, _, origin = part.partition("+")
+        w, h = (int(v) for v in size.split("x"))
+        if origin:
+            x, y = (int(v) for v in origin.split("+"))
+        else:
+            x, y = next_x, 0
+        monitors.append({"x": x, "y": y, "width": w, "height": h})
+        next_x = max(next_x, x + w)
+    return monitors
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial hash for axis-aligned rects. Cell size should be
+    around the typical rect size; queries then touch a handful of cells, so
+    packing thousands of overlays stays roughly linear.
+    """
+
+    def __init__(self, cell: int = 128):
+        self.cell = max(1, int(cell))
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.rects: List[Tuple[int, int, int, int]] = []
+
+    def _span(self, x: int, y: int, w: int, h: int):
+        c = self.cell
+        for cy in range(y // c, (y + h - 1) // c + 1):
+            for cx in range(x // c, (x + w - 1) // c + 1):
+                yield cx, cy
+
+    def intersects(self, x: int, y: int, w: int, h: int, gap: int = 0) -> bool:
+        gx, gy, gw, gh = x - gap, y - gap, w + 2 * gap, h + 2 * gap
+        for key in self._span(gx, gy, gw, gh):
+            for i in self.cells.get(key, ()):
+                rx, ry, rw, rh = self.rects[i]
+                if gx < rx + rw and rx < gx + gw and gy < ry + rh and ry < gy + gh:
+                    return True
+        return False
+
+    def insert(self, x: int, y: int, w: int, h: int) -> int:
+        idx = len(self.rects)
+        self.rects.append((x, y, w, h))
+        for key in self._span(x, y, w, h):
+            self.cells.setdefault(key, []).append(idx)
+        return idx
 
 
 class Planner:
-    def __init__(self, width: int = 1920, height: int = 1080):
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        monitors: Optional[Sequence[Dict[str, int]]] = None,
+    ):
         self.width = width
         self.height = height
+        self.monitors = (
+            list(monitors)
+            if monitors
+            else [{"x": 0, "y": 0, "width": width, "height": height}]
+        )
 
-    def propose_overlays(self, n: int = 3) -> List[Dict[str, Any]]:
+    def propose_overlays(
+        self, n: int = 3, rng: Optional[random.Random] = None
+    ) -> List[Dict[str, Any]]:
+        rnd = rng or random
         overlays = []
         for _ in range(n):
-            w, h = random.randint(80, 260), random.randint(40, 160)
-            x, y = random.randint(0, max(0, self.width - w)), random.randint(
+            w, h = rnd.randint(80, 260), rnd.randint(40, 160)
+            x, y = rnd.randint(0, max(0, self.width - w)), rnd.randint(
                 0, max(0, self.height - h)
             )
-            color = random.choice(
+            color = rnd.choice(
                 ["red", "green", "blue", "yellow", "magenta", "cyan", "lime", "orange"]
             )
-            label = random.choice(["A", "B", "C", "Click", "Look", "Test"])
+            label = rnd.choice(["A", "B", "C", "Click", "Look", "Test"])
             overlays.append(
                 {
                     "x": x,
@@ -29,3 +135,106 @@ class Planner:
                 }
             )
         return overlays
+
+    def to_global(self, ov: Dict[str, Any]) -> Dict[str, Any]:
+        """Monitor-relative overlay -> copy with desktop coordinates"""
+        mon = self.monitors[ov.get("monitor_index", 0)]
+        return dict(ov, x=ov["x"] + mon["x"], y=ov["y"] + mon["y"])
+
+    def workload(
+        self,
+        n: int,
+        seed: Any = 0,
+        zipf_s: float = 1.1,
+        min_side: int = 16,
+        max_side: int = 640,
+        size_classes: int = 12,
+        hotspots: int = 5,
+        hotspot_share: float = 0.8,
+        spread: float = 0.06,
+        lifetimes: Sequence[Tuple[int, float]] = LIFETIMES,
+        palette: Sequence[str] = PALETTE,
+        pack: bool = True,
+        gap: int = 2,
+        attempts: int = 24,
+    ) -> List[Dict[str, Any]]:
+        """
+        Seeded, production-like overlay workload.
+
+        Sizes follow a Zipf law over geometric size classes (rank 1 = the
+        smallest, so most overlays are button/icon sized with a long tail
+        of panels). Each monitor has `hotspots` cluster centers, themselves
+        Zipf-weighted; `hotspot_share` of overlays are placed with a
+        Gaussian around one (sigma = spread * monitor size), the rest
+        uniformly. With `pack`, placements that would overlap an earlier
+        overlay (plus `gap` px) are retried up to `attempts` times and then
+        dropped, so the result may hold fewer than n overlays on a crowded
+        desktop. Lifetimes are drawn from the (temporary_ms, weight) mix.
+
+        Coordinates are monitor-relative with monitor_index, matching the
+        draw_overlay/batch_overlay contract; use to_global() for desktop
+        pixels. The same seed always yields the same list.
+        """
+        rnd = random.Random(seed)
+        ratio = (max_side / min_side) ** (1.0 / max(1, size_classes - 1))
+        sides = [min_side * ratio**i for i in range(size_classes)]
+        size_cum = _cumulative(zipf_weights(size_classes, zipf_s))
+        aspect_cum = _cumulative(w for _, w in ASPECTS)
+        life_cum = _cumulative(w for _, w in lifetimes)
+        color_cum = _cumulative(zipf_weights(len(palette), 1.0))
+        mon_cum = _cumulative(m["width"] * m["height"] for m in self.monitors)
+
+        centers = []
+        for mon in self.monitors:
+            pts = [
+                (rnd.uniform(0.05, 0.95), rnd.uniform(0.05, 0.95))
+                for _ in range(max(1, hotspots))
+            ]
+            centers.append((pts, _cumulative(zipf_weights(len(pts), 1.0))))
+
+        index = GridIndex(cell=int(sides[size_classes // 2] * 2))
+        overlays: List[Dict[str, Any]] = []
+        for _ in range(n):
+            side = sides[_pick(rnd, size_cum)] * rnd.uniform(0.85, 1.15)
+            aspect = ASPECTS[_pick(rnd, aspect_cum)][0]
+            w = max(4, int(side * math.sqrt(aspect)))
+            h = max(4, int(side / math.sqrt(aspect)))
+            mi = _pick(rnd, mon_cum)
+            mon = self.monitors[mi]
+            w, h = min(w, mon["width"]), min(h, mon["height"])
+            color = palette[_pick(rnd, color_cum)]
+            temporary_ms = lifetimes[_pick(rnd, life_cum)][0]
+            pts, pts_cum = centers[mi]
+            placed = None
+            for _ in range(attempts if pack else 1):
+                if rnd.random() < hotspot_share:
+                    cx, cy = pts[_pick(rnd, pts_cum)]
+                    x = rnd.gauss(cx, spread) * mon["width"] - w / 2
+                    y = rnd.gauss(cy, spread) * mon["height"] - h / 2
+                else:
+                    x = rnd.uniform(0, mon["width"] - w)
+                    y = rnd.uniform(0, mon["height"] - h)
+                x = int(min(max(x, 0), mon["width"] - w))
+                y = int(min(max(y, 0), mon["height"] - h))
+                gx, gy = x + mon["x"], y + mon["y"]
+                if not pack or not index.intersects(gx, gy, w, h, gap):
+                    placed = (x, y, gx, gy)
+                    break
+            if placed is None:
+                continue
+            x, y, gx, gy = placed
+            if pack:
+                index.insert(gx, gy, w, h)
+            ov = {
+                "x": x,
+                "y": y,
+                "width": w,
+                "height": h,
+                "color": color,
+                "label": f"w{len(overlays)}",
+                "monitor_index": mi,
+            }
+            if temporary_ms:
+                ov["temporary_ms"] = temporary_ms
+            overlays.append(ov)
+        return overlays
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Run scenarios in parallel across a pool of isolated environments
+
+Each environment gets its own Xvfb display (with a mapped -fbdir
+framebuffer), its own server instance on its own port, its own HOME (so
+settings files do not collide) and its own artifact directory under
+artifacts/pool/env-<n>/. Scenarios are sharded across the pool by
+estimated cost (step count, longest first onto the least loaded
+environment) and each shard runs through scenario_runner.py. The per-
+environment timelines are merged into artifacts/summary.json.
+
+Example:
+    python3 pool.py                       # one environment per CPU
+    python3 pool.py --workers 4 --repeat 3 scenarios/*.yaml
+"""
+
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+from drivers.mcp_http import wait_until_ready
+from framebuffer import XvfbDisplay
+from scenario_runner import (
+    APP_BIN,
+    ARTIFACTS,
+    HERE,
+    free_port,
+    load_scenarios,
+    print_step_summary,
+    step_summary,
+)
+
+
+def shard(paths: List[Path], workers: int, repeat: int) -> List[List[Path]]:
+    """Longest-processing-time-first assignment by step count"""
+    jobs = []
+    for path in paths:
+        spec = yaml.safe_load(path.read_text()) or {}
+        jobs.append((len(spec.get("steps") or []) * repeat, str(path), path))
+    jobs.sort(reverse=True)
+    heap = [(0, i) for i in range(workers)]
+    shards: List[List[Path]] = [[] for _ in range(workers)]
+    for cost, _, path in jobs:
+        load, i = heapq.heappop(heap)
+        shards[i].append(path)
+        heapq.heappush(heap, (load + cost, i))
+    return [s for s in shards if s]
+
+
+def run_env(index: int, paths: List[Path], args) -> Dict[str, Any]:
+    env_dir = (args.artifacts / "pool" / f"env-{index}").resolve()
+    home = env_dir / "home"
+    home.mkdir(parents=True, exist_ok=True)
+    info: Dict[str, Any] = {
+        "env": index,
+        "scenarios": [str(p) for p in paths],
+        "artifacts": str(env_dir),
+    }
+    t0 = time.perf_counter()
+    screen = tuple(int(v) for v in args.screen.lower().split("x"))
+    xvfb = XvfbDisplay(screens=[screen]).start()
+    server = None
+    try:
+        port = free_port()
+        env = {
+            **os.environ,
+            **xvfb.env(),
+            "PORT": str(port),
+            "HOME": str(home),
+            "AI_GUI_ARTIFACTS": str(env_dir),
+            # Share the single-file extraction cache instead of re-extracting
+            "DOTNET_BUNDLE_EXTRACT_BASE_DIR": os.environ.get(
+                "DOTNET_BUNDLE_EXTRACT_BASE_DIR", str(Path.home() / ".net")
+            ),
+        }
+        env.pop("WAYLAND_DISPLAY", None)
+        info.update({"display": xvfb.display, "port": port})
+        with open(env_dir / "server.log", "wb") as log:
+            server = subprocess.Popen(
+                [str(args.bin), "--http"],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        url = f"http://127.0.0.1:{port}/mcp"
+        info["startup_s"] = round(wait_until_ready(url, timeout=60), 3)
+        timeline_path = env_dir / "timeline.json"
+        cmd = [
+            sys.executable,
+            str(HERE / "scenario_runner.py"),
+            "--url",
+            url,
+            "--parallel",
+            str(args.per_env),
+            "--repeat",
+            str(args.repeat),
+            "--out",
+            str(timeline_path),
+            *[str(p) for p in paths],
+        ]
+        with open(env_dir / "runner.log", "wb") as log:
+            rc = subprocess.call(
+                cmd, env=env, cwd=str(HERE), stdout=log, stderr=subprocess.STDOUT
+            )
+        info["exit_code"] = rc
+        if timeline_path.exists():
+            info["timeline"] = json.loads(timeline_path.read_text())
+        else:
+            info["error"] = "runner produced no timeline (see runner.log)"
+    except Exception as e:
+        info["error"] = str(e)
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        xvfb.stop()
+    info["wall_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    return info
+
+
+def merge(envs: List[Dict[str, Any]], wall_ms: float) -> Dict[str, Any]:
+    scenarios = []
+    for env in envs:
+        for res in (env.get("timeline") or {}).get("scenarios", []):
+            scenarios.append(dict(res, env=env["env"]))
+    return {
+        "ok": bool(envs)
+        and all("error" not in e for e in envs)
+        and all(s["ok"] for s in scenarios),
+        "wall_ms": round(wall_ms, 3),
+        "environments": [
+            {k: v for k, v in e.items() if k != "timeline"}
+            | {"ok": (e.get("timeline") or {}).get("ok", False)}
+            for e in envs
+        ],
+        "scenario_count": len(scenarios),
+        "failed": [s["tag"] for s in scenarios if not s["ok"]],
+        "step_summary": step_summary(scenarios),
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel scenario pool")
+    parser.add_argument(
+        "scenarios", nargs="*", default=[str(HERE / "scenarios/*.yaml")]
+    )
+    parser.add_argument("--bin", type=Path, default=APP_BIN)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--per-env", type=int, default=1, help="concurrent scenarios per environment"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--screen", default="1920x1080")
+    parser.add_argument("--artifacts", type=Path, default=ARTIFACTS)
+    args = parser.parse_args()
+
+    paths = load_scenarios(args.scenarios)
+    if not paths:
+        sys.exit("no scenarios matched")
+    shards = shard(paths, max(1, min(args.workers, len(paths))), args.repeat)
+    print(f"[pool] {len(paths)} scenarios over {len(shards)} environments")
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(shards)) as ex:
+        envs = list(
+            ex.map(lambda item: run_env(item[0], item[1], args), enumerate(shards))
+        )
+    summary = merge(envs, (time.perf_counter() - t0) * 1000.0)
+
+    args.artifacts.mkdir(parents=True, exist_ok=True)
+    out = args.artifacts / "summary.json"
+    out.write_text(json.dumps(summary, indent=2))
+    for env in summary["environments"]:
+        status = "ok" if env["ok"] else f"FAIL {env.get('error', '')}".strip()
+        print(
+            f"[pool] env-{env['env']} {env.get('display')} :{env.get('port')} "
+            f"{len(env['scenarios'])} scenarios {env['wall_ms']:.0f} ms {status}"
+        )
+    print_step_summary(summary["step_summary"])
+    print(f"[pool] summary written to {out}")
+    sys.exit(0 if summary["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,22 @@ ROOT="$(cd "$HERE/../.." && pwd)"
 ARTIFACTS="$HERE/artifacts"
 mkdir -p "$ARTIFACTS"
 
+# Phases timed here (epoch seconds, JSON lines) are merged into the
+# harness budget report and Chrome trace
+export AI_GUI_PHASES_FILE="$ARTIFACTS/run_phases.jsonl"
+: > "$AI_GUI_PHASES_FILE"
+mark_phase() { # name category start
+  printf '{"name":"%s","cat":"%s","start":%s,"end":%s}\n' \
+    "$1" "$2" "$3" "$(date +%s.%N)" >> "$AI_GUI_PHASES_FILE"
+}
+
 # 1) Minimal deps
+T_PHASE=$(date +%s.%N)
 "$HERE/setup.sh"
+mark_phase setup.sh setup "$T_PHASE"
 
 # 2) Build app if not already published
+T_PHASE=$(date +%s.%N)
 if [ ! -f "$ROOT/build/publish/overlay-companion-mcp" ]; then
   echo "[AI-GUI] Building app (dotnet publish)..."
   bash "$ROOT/scripts/build-appimage.sh" || true
@@ -19,6 +31,7 @@ if [ ! -f "$ROOT/build/publish/overlay-companion-mcp" ]; then
     if command -v dotnet >/dev/null 2>&1; then DOTNET=dotnet; elif [ -x "$HOME/.dotnet/dotnet" ]; then DOTNET="$HOME/.dotnet/dotnet"; fi
     "$DOTNET" publish "$ROOT/src/OverlayCompanion.csproj" -c Release -r linux-x64 --self-contained true -o "$ROOT/build/publish" /p:PublishSingleFile=true
   fi
+  mark_phase build build "$T_PHASE"
 fi
 
 APP_BIN="$ROOT/build/publish/overlay-companion-mcp"
@@ -27,25 +40,52 @@ if [ ! -x "$APP_BIN" ]; then
   exit 1
 fi
 
+export AI_GUI_APP_BIN="$APP_BIN"
+export AI_GUI_ROOT="$ROOT"
+export AI_GUI_ARTIFACTS="$ARTIFACTS"
+
+# Pool mode: AI_GUI_POOL=N runs the scenarios across N isolated Xvfb
+# displays/servers (0 = one per CPU) instead of the single harness run
+if [ -n "${AI_GUI_POOL:-}" ]; then
+  POOL_ARGS=()
+  [ "$AI_GUI_POOL" != "0" ] && POOL_ARGS+=(--workers "$AI_GUI_POOL")
+  source "$HERE/.venv/bin/activate"
+  python "$HERE/pool.py" ${POOL_ARGS[@]+"${POOL_ARGS[@]}"} --bin "$APP_BIN" | tee "$ARTIFACTS/pool.log"
+  exit "${PIPESTATUS[0]}"
+fi
+
+# Soak mode: AI_GUI_SOAK=<seconds> runs soak.py (churn + /proc leak trend)
+# under the same virtual display instead of the one-shot harness
+HARNESS_CMD="python '$HERE/harness.py' | tee '$ARTIFACTS/harness.log'"
+if [ -n "${AI_GUI_SOAK:-}" ]; then
+  HARNESS_CMD="python '$HERE/soak.py' --duration '$AI_GUI_SOAK' | tee '$ARTIFACTS/soak.log'"
+fi
+
 # 3) Launch under virtual display and run harness
 VSCREEN=${VSCREEN:-"1920x1080x24"}
+# Xvfb keeps its framebuffer in an XWD file here; harness.py maps it directly
+FBDIR_BASE=/tmp
+[ -d /dev/shm ] && FBDIR_BASE=/dev/shm
+if [ -z "${AI_GUI_FBDIR:-}" ]; then
+  AI_GUI_FBDIR="$(mktemp -d "$FBDIR_BASE/ai-gui-fb.XXXXXX")"
+  trap 'rm -rf "$AI_GUI_FBDIR"' EXIT
+fi
 XVFB_ARGS=${XVFB_ARGS:-"-screen 0 ${VSCREEN}"}
+XVFB_ARGS="$XVFB_ARGS -fbdir $AI_GUI_FBDIR"
 
-export AI_GUI_APP_BIN="$APP_BIN"
-export AI_GUI_ROOT="$ROOT"
-export AI_GUI_ARTIFACTS="$ARTIFACTS"
+export AI_GUI_FBDIR
 
 if command -v xvfb-run >/dev/null 2>&1; then
   xvfb-run -s "$XVFB_ARGS" bash -lc "\
     set -euo pipefail; \
     source '$HERE/.venv/bin/activate'; \
-    python '$HERE/harness.py' | tee '$ARTIFACTS/harness.log' \
+    $HARNESS_CMD \
   "
 else
   echo "[AI-GUI] WARNING: xvfb-run not found; falling back to HEADLESS API-only smoke test"
   HEADLESS=1 bash -lc "\
     set -euo pipefail; \
     source '$HERE/.venv/bin/activate'; \
-    python '$HERE/harness.py' | tee '$ARTIFACTS/harness.log' \
+    $HARNESS_CMD \
   "
 fi
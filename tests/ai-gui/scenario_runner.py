@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Scenario runner for tests/ai-gui/scenarios/*.yaml
+
+Each scenario runs its steps in order over one persistent MCP session
+(Streamable HTTP), and every step is timed twice: wall time on the client
+and server time from the Server-Timing header of each tool call. Several
+scenarios can run at once (--parallel), each with its own session. The
+result is a machine-readable timeline in artifacts/timeline.json.
+
+Step kinds:
+
+  overlays          count, batch (use batch_overlay), temporary_ms, color,
+                    workload: {seed, zipf_s, hotspots, ...} to draw from
+                    Planner.workload instead of uniform random boxes
+  screenshot        optional region: {x, y, width, height}
+  re_anchor         target (overlay index/id, default last), x, y,
+                    mode (absolute|relative)
+  clipboard         text: set_clipboard then get_clipboard, checks round trip
+  wait_for_pixels   target (overlay index/id) or rect, optional color,
+                    timeout_ms, min_score; polls frames until the region
+                    matches (color) or differs from the scenario's first
+                    frame (no color)
+  diff_overlays     optional target (default: every overlay drawn so far),
+                    timeout_ms, threshold, min_iou; polls frames until each
+                    overlay shows up as a changed region against the
+                    scenario's first frame (verifier/frame_diff.py)
+  golden            name (default: scenario name), optional target or rect
+                    to crop to, min_ssim, min_psnr, tile, regions; compares
+                    the frame with golden/<name>.png (verifier/golden.py).
+                    A missing golden fails; AI_GUI_UPDATE_GOLDEN=1 records
+                    it and the scenario reports "recorded" instead of ok
+  remove_all        remove every overlay the scenario drew
+  sleep             ms
+
+A scenario may set monitors: "1920x1080,2560x1440" (see
+planner.parse_monitors) to spread workload overlays across monitors.
+
+Any step may set optional: true; its failure is recorded in the timeline
+but does not stop or fail the scenario.
+
+Frames for wait_for_pixels, diff_overlays and golden come from the mapped Xvfb
+framebuffer when AI_GUI_FBDIR is set (see framebuffer.py), otherwise from
+take_screenshot.
+
+Example:
+    python3 scenario_runner.py --url http://127.0.0.1:3000/mcp scenarios/*.yaml
+    python3 scenario_runner.py --parallel 4 --repeat 2   # launches the server
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from drivers.mcp_http import McpHttpClient, tool_result, wait_until_ready
+from framebuffer import open_framebuffer
+from planner import Planner, parse_monitors
+from timing import summarize
+from verifier.frame_diff import diff_overlays
+from verifier.golden import check_golden
+from verifier.image_checks import FrameStats, load_frame
+
+HERE = Path(__file__).parent.resolve()
+ROOT = Path(os.environ.get("AI_GUI_ROOT", HERE / "../.."))
+ARTIFACTS = Path(os.environ.get("AI_GUI_ARTIFACTS", HERE / "artifacts")).resolve()
+APP_BIN = Path(
+    os.environ.get("AI_GUI_APP_BIN", ROOT / "build/publish/overlay-companion-mcp")
+)
+
+
+def server_timing_ms(headers: Dict[str, str]) -> Optional[float]:
+    """Sum of dur= entries in a Server-Timing header, if present"""
+    value = headers.get("server-timing")
+    if not value:
+        return None
+    total = 0.0
+    for entry in value.split(","):
+        for part in entry.split(";")[1:]:
+            key, _, dur = part.strip().partition("=")
+            if key == "dur":
+                try:
+                    total += float(dur)
+                except ValueError:
+                    pass
+    return total
+
+
+class StepFailed(Exception):
+    pass
+
+
+class ScenarioRun:
+    """Executes one scenario over its own MCP session and records a timeline"""
+
+    def __init__(self, url: str, path: Path, spec: dict, t0: float, tag: str):
+        self.url = url
+        self.path = path
+        self.spec = spec
+        self.t0 = t0
+        self.tag = tag
+        self.name = spec.get("name") or path.stem
+        self.width = int(spec.get("width", 1920))
+        self.height = int(spec.get("height", 1080))
+        seed = spec.get("seed")
+        self.rng = random.Random(seed if seed is not None else tag)
+        monitors = parse_monitors(spec["monitors"]) if spec.get("monitors") else None
+        self.planner = Planner(self.width, self.height, monitors)
+        self.client: Optional[McpHttpClient] = None
+        self.overlays: List[Dict[str, Any]] = []  # {id, x, y, width, height, color}
+        self.calls: List[Dict[str, Any]] = []
+        self.baseline: Optional[np.ndarray] = None
+        self.recorded: List[str] = []  # goldens written by this run
+        self._fb = open_framebuffer()
+        self._seq = 0
+
+    # Tool calls
+
+    def call(self, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        t_start = time.perf_counter()
+        resp = self.client.call_tool(tool, args)
+        wall = (time.perf_counter() - t_start) * 1000.0
+        is_error = bool(resp.get("error")) or bool(
+            (resp.get("result") or {}).get("isError")
+        )
+        self.calls.append(
+            {
+                "tool": tool,
+                "t_ms": round((t_start - self.t0) * 1000.0, 3),
+                "wall_ms": round(wall, 3),
+                "server_ms": server_timing_ms(self.client.last_headers),
+                "ok": not is_error,
+            }
+        )
+        if is_error:
+            raise StepFailed(f"{tool} failed: {json.dumps(resp)[:300]}")
+        return tool_result(resp)
+
+    def frame(self) -> np.ndarray:
+        if self._fb is not None:
+            return self._fb.snapshot()
+        data = self.call("take_screenshot", {})
+        b64 = data.get("image_base64")
+        if not b64:
+            raise StepFailed("take_screenshot returned no image")
+        return load_frame(base64.b64decode(b64))
+
+    def resolve(self, target) -> Dict[str, Any]:
+        if not self.overlays:
+            raise StepFailed("no overlays to target")
+        if target is None or target == "last":
+            return self.overlays[-1]
+        if isinstance(target, int):
+            return self.overlays[target]
+        for ov in self.overlays:
+            if ov["id"] == target:
+                return ov
+        raise StepFailed(f"unknown overlay target {target!r}")
+
+    # Step kinds
+
+    def step_overlays(self, step):
+        count = int(step.get("count", 1))
+        if "workload" in step:
+            opts = dict(step.get("workload") or {})
+            seed = opts.pop("seed", self.rng.randrange(2**32))
+            planned = self.planner.workload(count, seed=seed, **opts)
+        else:
+            planned = self.planner.propose_overlays(count, rng=self.rng)
+        for ov in planned:
+            if "color" in step:
+                ov["color"] = step["color"]
+            ov.setdefault("opacity", float(step.get("opacity", 0.8)))
+            if step.get("temporary_ms"):
+                ov["temporary_ms"] = int(step["temporary_ms"])
+        if step.get("batch", False):
+            data = self.call("batch_overlay", {"overlays": json.dumps(planned)})
+            drawn = list(zip(data.get("overlay_ids") or [], planned))
+        else:
+            # draw_overlay has no lifetime argument, so temporary overlays
+            # go through one batch_overlay call to keep their temporary_ms
+            temporary = [ov for ov in planned if ov.get("temporary_ms")]
+            drawn = []
+            if temporary:
+                data = self.call("batch_overlay", {"overlays": json.dumps(temporary)})
+                drawn.extend(zip(data.get("overlay_ids") or [], temporary))
+            for ov in planned:
+                if ov.get("temporary_ms"):
+                    continue
+                self._seq += 1
+                args = dict(ov, id=f"{self.tag}-{self._seq}")
+                args.pop("label", None)
+                drawn.append((self.call("draw_overlay", args).get("overlay_id"), ov))
+        for oid, ov in drawn:
+            if oid and not ov.get("temporary_ms"):
+                self.overlays.append(dict(self.planner.to_global(ov), id=oid))
+        return {"drawn": len(drawn)}
+
+    def step_screenshot(self, step):
+        args = dict(step.get("region") or {})
+        data = self.call("take_screenshot", args)
+        size = len(data.get("image_base64") or "")
+        return {"width": data.get("width"), "height": data.get("height"), "b64": size}
+
+    def step_re_anchor(self, step):
+        ov = self.resolve(step.get("target"))
+        mode = step.get("mode", "relative")
+        x, y = int(step.get("x", 0)), int(step.get("y", 0))
+        self.call(
+            "re_anchor_element",
+            {"overlay_id": ov["id"], "x": x, "y": y, "anchor_mode": mode},
+        )
+        if mode == "relative":
+            ov["x"] += x
+            ov["y"] += y
+        else:
+            ov["x"], ov["y"] = x, y
+        return {"overlay_id": ov["id"], "x": ov["x"], "y": ov["y"]}
+
+    def step_clipboard(self, step):
+        text = step.get("text") or f"ai-gui-{self.tag}-{self.rng.random():.6f}"
+        self.call("set_clipboard", {"text": text})
+        got = self.call("get_clipboard", {}).get("text")
+        if step.get("verify", True) and got != text:
+            raise StepFailed(f"clipboard round trip mismatch: {got!r}")
+        return {"chars": len(text)}
+
+    def step_wait_for_pixels(self, step):
+        if "rect" in step:
+            r = step["rect"]
+            rect = (r["x"], r["y"], r["width"], r["height"])
+            color = step.get("color")
+        else:
+            ov = self.resolve(step.get("target"))
+            rect = (ov["x"], ov["y"], ov["width"], ov["height"])
+            color = step.get("color", ov.get("color"))
+        timeout = float(step.get("timeout_ms", 2000)) / 1000.0
+        min_score = float(step.get("min_score", 0.5))
+        deadline = time.perf_counter() + timeout
+        polls = 0
+        while True:
+            polls += 1
+            stats = FrameStats(self.frame())
+            if color and not step.get("changed_only"):
+                score = float(stats.match_scores([rect], color)["score"][0])
+                met = score >= min_score
+            else:
+                base = FrameStats(self.baseline).rect_stats([rect], variance=False)
+                now = stats.rect_stats([rect], variance=False)
+                score = float(np.abs(now["mean"] - base["mean"]).max())
+                met = score >= float(step.get("min_delta", 8.0))
+            if met:
+                return {"polls": polls, "score": round(score, 4)}
+            if time.perf_counter() > deadline:
+                raise StepFailed(f"pixels not matched after {polls} polls")
+            time.sleep(float(step.get("poll_ms", 20)) / 1000.0)
+
+    def step_diff_overlays(self, step):
+        targets = [self.resolve(step["target"])] if "target" in step else self.overlays
+        if not targets:
+            raise StepFailed("no overlays to diff")
+        expected = [(ov["x"], ov["y"], ov["width"], ov["height"]) for ov in targets]
+        timeout = float(step.get("timeout_ms", 2000)) / 1000.0
+        deadline = time.perf_counter() + timeout
+        polls = 0
+        while True:
+            polls += 1
+            report = diff_overlays(
+                self.baseline,
+                self.frame(),
+                expected,
+                threshold=int(step.get("threshold", 24)),
+                min_iou=float(step.get("min_iou", 0.5)),
+            )
+            # Changes nobody drew here (cursor, other scenarios sharing the
+            # display) are reported but do not fail the step
+            if not report["missing"]:
+                return {
+                    "polls": polls,
+                    "matched": len(report["matches"]),
+                    "unexpected": len(report["unexpected"]),
+                    "changed_pixels": report["changed_pixels"],
+                }
+            if time.perf_counter() > deadline:
+                raise StepFailed(
+                    f"{len(report['missing'])} of {len(expected)} overlays not "
+                    f"found after {polls} polls: {report['missing'][:5]}"
+                )
+            time.sleep(float(step.get("poll_ms", 20)) / 1000.0)
+
+    def step_golden(self, step):
+        name = step.get("name") or self.name
+        frame = self.frame()
+        if "rect" in step or "target" in step:
+            r = step["rect"] if "rect" in step else self.resolve(step["target"])
+            x, y = max(0, int(r["x"])), max(0, int(r["y"]))
+            frame = frame[y : y + int(r["height"]), x : x + int(r["width"])]
+        opts = {
+            k: step[k] for k in ("min_ssim", "min_psnr", "tile", "regions") if k in step
+        }
+        result = check_golden(name, frame, ARTIFACTS / "golden", **opts)
+        if result["status"] == "recorded":
+            self.recorded.append(name)
+        elif not result["ok"]:
+            raise StepFailed(
+                result.get("error")
+                or f"{len(result['failing_tiles'])} tiles differ from golden "
+                f"{name} (heatmap: {result.get('heatmap')})"
+            )
+        return {k: v for k, v in result.items() if k != "failing_tiles"}
+
+    def step_remove_all(self, step):
+        removed = 0
+        for ov in self.overlays:
+            self.call("remove_overlay", {"overlayId": ov["id"], "overlay_id": ov["id"]})
+            removed += 1
+        self.overlays = []
+        return {"removed": removed}
+
+    def step_sleep(self, step):
+        time.sleep(float(step.get("ms", 100)) / 1000.0)
+        return {}
+
+    # Driver
+
+    def run(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "scenario": self.name,
+            "file": str(self.path),
+            "tag": self.tag,
+            "steps": [],
+        }
+        self.client = McpHttpClient(self.url, client_name=f"scenario-{self.name}")
+        try:
+            self.client.initialize()
+            needs_baseline = any(
+                s.get("kind") in ("wait_for_pixels", "diff_overlays")
+                for s in self.spec.get("steps", [])
+            )
+            if needs_baseline:
+                self.baseline = self.frame()
+            for index, step in enumerate(self.spec.get("steps") or []):
+                entry = self.run_step(index, step)
+                result["steps"].append(entry)
+                if not entry["ok"] and not entry["optional"]:
+                    break
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            self.client.close()
+        result["ok"] = "error" not in result and all(
+            s["ok"] or s["optional"] for s in result["steps"]
+        )
+        if self.recorded:
+            result["recorded"] = self.recorded
+        return result
+
+    def run_step(self, index: int, step: Dict[str, Any]) -> Dict[str, Any]:
+        kind = step.get("kind", "")
+        handler = getattr(self, f"step_{kind}", None)
+        first_call = len(self.calls)
+        t_start = time.perf_counter()
+        entry: Dict[str, Any] = {
+            "index": index,
+            "kind": kind,
+            "t_ms": round((t_start - self.t0) * 1000.0, 3),
+            "optional": bool(step.get("optional", False)),
+        }
+        try:
+            if handler is None:
+                raise StepFailed(f"unknown step kind {kind!r}")
+            entry["detail"] = handler(step)
+            entry["ok"] = True
+        except Exception as e:
+            entry["ok"] = False
+            entry["error"] = str(e)
+        entry["wall_ms"] = round((time.perf_counter() - t_start) * 1000.0, 3)
+        calls = self.calls[first_call:]
+        server = [c["server_ms"] for c in calls if c["server_ms"] is not None]
+        entry["server_ms"] = round(sum(server), 3) if server else None
+        entry["calls"] = calls
+        return entry
+
+
+def load_scenarios(patterns: List[str]) -> List[Path]:
+    paths: List[Path] = []
+    for pat in patterns:
+        paths.extend(Path(p) for p in sorted(glob.glob(pat)))
+    return paths
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(binary: Path) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    proc = subprocess.Popen(
+        [str(binary), "--http"],
+        env={**os.environ, "PORT": str(port)},
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/mcp"
+    wait_until_ready(url, timeout=60)
+    return proc, url
+
+
+def run_all(url: str, paths: List[Path], parallel: int, repeat: int) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    jobs = []
+    for r in range(repeat):
+        for path in paths:
+            spec = yaml.safe_load(path.read_text()) or {}
+            jobs.append((path, spec, f"{path.stem}-{r}"))
+    lock = threading.Lock()
+    results: List[Dict[str, Any]] = []
+
+    def one(job):
+        path, spec, tag = job
+        res = ScenarioRun(url, path, spec, t0, tag).run()
+        status = "ok" if res["ok"] else "FAIL"
+        if res["ok"] and res.get("recorded"):
+            status = f"recorded {len(res['recorded'])} golden(s)"
+        with lock:
+            print(
+                f"[scenario] {tag}: {status} ({len(res['steps'])} steps)",
+                flush=True,
+            )
+        return res
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        results = list(pool.map(one, jobs))
+
+    return {
+        "url": url,
+        "parallel": parallel,
+        "repeat": repeat,
+        "wall_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        "ok": all(r["ok"] for r in results),
+        "step_summary": step_summary(results),
+        "scenarios": results,
+    }
+
+
+def step_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Wall and server time percentiles per step kind across scenario results"""
+    per_kind: Dict[str, Dict[str, List[float]]] = {}
+    for res in results:
+        for step in res["steps"]:
+            d = per_kind.setdefault(step["kind"], {"wall": [], "server": []})
+            d["wall"].append(step["wall_ms"])
+            if step["server_ms"] is not None:
+                d["server"].append(step["server_ms"])
+    return {
+        kind: {"wall_ms": summarize(d["wall"]), "server_ms": summarize(d["server"])}
+        for kind, d in per_kind.items()
+    }
+
+
+def print_step_summary(summary: Dict[str, Any]):
+    for kind, d in summary.items():
+        w, s = d["wall_ms"], d["server_ms"]
+        print(
+            f"  {kind:16s} n={w.get('count', 0):<4} wall p50={w.get('p50')} "
+            f"p95={w.get('p95')}  server p50={s.get('p50')}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ai-gui YAML scenarios")
+    parser.add_argument(
+        "scenarios", nargs="*", default=[str(HERE / "scenarios/*.yaml")]
+    )
+    parser.add_argument("--url", help="MCP endpoint; launches --bin when omitted")
+    parser.add_argument("--bin", type=Path, default=APP_BIN)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=ARTIFACTS / "timeline.json")
+    args = parser.parse_args()
+
+    paths = load_scenarios(args.scenarios)
+    if not paths:
+        sys.exit("no scenarios matched")
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = start_server(args.bin)
+    try:
+        timeline = run_all(url, paths, args.parallel, args.repeat)
+    finally:
+        if proc:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(timeline, indent=2))
+    print_step_summary(timeline["step_summary"])
+    print(f"[scenario] timeline written to {args.out}")
+    sys.exit(0 if timeline["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
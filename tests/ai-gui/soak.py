@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Soak test: long-running overlay/screenshot churn with leak detection
+
+Drives the server with a steady mix of draw_overlay, batch_overlay (mixed
+temporary_ms lifetimes), re_anchor_element, remove_overlay and
+take_screenshot calls, recycles MCP sessions and /ws/overlays viewers, and
+samples the server process from /proc at a fixed interval:
+
+    rss_kb, threads, fds, children (whole process tree)
+
+Samples are appended to artifacts/soak_samples.jsonl as they are taken, so
+a crashed or interrupted run still leaves its time series. At the end a
+robust trend (Theil-Sen slope) is fitted per metric over the post-warmup
+window. A metric is flagged as unbounded growth when its slope, projected
+per hour, exceeds the limit AND the last third of the run is still higher
+than the middle third (a plateau after warm-up is not a leak). The verdict
+goes to artifacts/soak.json; exit status is 1 on any flagged metric.
+
+Example:
+    python3 soak.py --duration 14400 --interval 10 --rate 20
+    python3 soak.py --url http://127.0.0.1:3000/mcp --pid $(pgrep -f overlay-companion)
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from drivers.mcp_http import McpHttpClient, tool_result
+from planner import Planner
+from scenario_runner import APP_BIN, ARTIFACTS, start_server
+
+METRICS = ("rss_kb", "threads", "fds", "children")
+
+# Allowed growth per hour before a metric counts as unbounded
+DEFAULT_LIMITS = {"rss_kb": 32 * 1024, "threads": 4, "fds": 16, "children": 1}
+
+
+def _proc_children(pid: int) -> List[int]:
+    out: List[int] = []
+    task = Path("/proc") / str(pid) / "task"
+    try:
+        tids = os.listdir(task)
+    except OSError:
+        return out
+    for tid in tids:
+        try:
+            out.extend(int(c) for c in (task / tid / "children").read_text().split())
+        except OSError:
+            continue
+    return out
+
+
+def sample_tree(pid: int) -> Optional[Dict[str, int]]:
+    """rss/threads/fds of pid plus the number of live descendants"""
+    base = Path("/proc") / str(pid)
+    try:
+        status = (base / "status").read_text()
+    except OSError:
+        return None
+    st = {"rss_kb": 0, "threads": 0, "fds": 0, "children": 0}
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            st["rss_kb"] = int(line.split()[1])
+        elif line.startswith("Threads:"):
+            st["threads"] = int(line.split()[1])
+    try:
+        st["fds"] = len(os.listdir(base / "fd"))
+    except OSError:
+        pass
+    pending, seen = _proc_children(pid), 0
+    while pending:
+        child = pending.pop()
+        seen += 1
+        pending.extend(_proc_children(child))
+    st["children"] = seen
+    return st
+
+
+def theil_sen(ts: List[float], ys: List[float], max_points: int = 240) -> float:
+    """Median of pairwise slopes; robust to GC sawtooth and outliers"""
+    if len(ts) < 2:
+        return 0.0
+    step = max(1, len(ts) // max_points)
+    t, y = ts[::step], ys[::step]
+    slopes = sorted(
+        (y[j] - y[i]) / (t[j] - t[i])
+        for i in range(len(t))
+        for j in range(i + 1, len(t))
+        if t[j] > t[i]
+    )
+    if not slopes:
+        return 0.0
+    mid = len(slopes) // 2
+    return slopes[mid] if len(slopes) % 2 else (slopes[mid - 1] + slopes[mid]) / 2
+
+
+def analyze(
+    samples: List[Dict[str, Any]], warmup_s: float, limits: Dict[str, float]
+) -> Dict[str, Any]:
+    window = [s for s in samples if s["t"] >= warmup_s]
+    out: Dict[str, Any] = {"samples": len(samples), "analyzed": len(window)}
+    if len(window) < 6:
+        out["ok"] = False
+        out["error"] = "not enough post-warmup samples for a trend"
+        return out
+    ts = [s["t"] for s in window]
+    third = len(window) // 3
+    ok = True
+    for m in METRICS:
+        ys = [float(s[m]) for s in window]
+        per_hour = theil_sen(ts, ys) * 3600.0
+        mid = sum(ys[third : 2 * third]) / third
+        last = sum(ys[2 * third :]) / (len(ys) - 2 * third)
+        growing = per_hour > limits[m] and last > mid
+        ok = ok and not growing
+        out[m] = {
+            "start": ys[0],
+            "end": ys[-1],
+            "peak": max(ys),
+            "slope_per_hour": round(per_hour, 3),
+            "limit_per_hour": limits[m],
+            "middle_third_mean": round(mid, 3),
+            "last_third_mean": round(last, 3),
+            "unbounded": growing,
+        }
+    out["ok"] = ok
+    return out
+
+
+class Sampler(threading.Thread):
+    """Samples the server tree every interval and appends to a JSONL file"""
+
+    def __init__(self, pid: int, interval: float, path: Path, t0: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.path = path
+        self.t0 = t0
+        self.samples: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self.exited = False
+        self._halt = threading.Event()
+
+    def run(self):
+        with open(self.path, "w", buffering=1) as f:
+            while not self._halt.is_set():
+                st = sample_tree(self.pid)
+                if st is None:
+                    self.exited = True
+                    break
+                row = {"t": round(time.monotonic() - self.t0, 3), **st}
+                row.update(self.counters)
+                self.samples.append(row)
+                f.write(json.dumps(row) + "\n")
+                self._halt.wait(self.interval)
+
+    def stop(self):
+        self._halt.set()
+        self.join(timeout=self.interval + 5)
+
+
+def ws_cycle(url: str, timeout: float = 5.0) -> bool:
+    """Open /ws/overlays, read the handshake and drop the connection"""
+    parts = urlsplit(url)
+    key = base64.b64encode(os.urandom(16)).decode()
+    req = (
+        f"GET /ws/overlays HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    )
+    try:
+        with socket.create_connection(
+            (parts.hostname, parts.port or 80), timeout=timeout
+        ) as s:
+            s.sendall(req.encode())
+            return s.recv(4096).startswith(b"HTTP/1.1 101")
+    except OSError:
+        return False
+
+
+class Churn:
+    """Steady open-loop tool mix over one session, recycled periodically"""
+
+    def __init__(self, url: str, args, counters: Dict[str, int]):
+        self.url = url
+        self.args = args
+        self.counters = counters
+        self.rng = random.Random(args.seed)
+        self.planner = Planner(1920, 1080)
+        self.client: Optional[McpHttpClient] = None
+        self.live: List[str] = []
+        self.ops = 0
+
+    def _count(self, key: str):
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    def _session(self) -> McpHttpClient:
+        if self.client is None:
+            self.client = McpHttpClient(self.url, client_name="ai-gui-soak")
+            self.client.initialize()
+            self._count("sessions")
+        return self.client
+
+    def _call(self, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            resp = self._session().call_tool(tool, args)
+        except (OSError, RuntimeError, ValueError):
+            self._count("errors")
+            self.client = None
+            return {}
+        if resp.get("error") or (resp.get("result") or {}).get("isError"):
+            self._count("errors")
+        return tool_result(resp)
+
+    def step(self):
+        self.ops += 1
+        self._count("ops")
+        a = self.args
+        if self.ops % a.screenshot_every == 0:
+            self._call("take_screenshot", {})
+        elif self.ops % a.ws_every == 0:
+            self._count("ws_cycles" if ws_cycle(self.url) else "errors")
+        elif self.ops % a.batch_every == 0:
+            batch = self.planner.workload(a.batch_size, seed=self.rng.random())
+            data = self._call("batch_overlay", {"overlays": json.dumps(batch)})
+            for oid, ov in zip(data.get("overlay_ids") or [], batch):
+                if not ov.get("temporary_ms"):
+                    self.live.append(oid)
+        elif self.live and (len(self.live) > a.max_live or self.rng.random() < 0.4):
+            oid = self.live.pop(self.rng.randrange(len(self.live)))
+            self._call("remove_overlay", {"overlayId": oid})
+        elif self.live and self.rng.random() < 0.3:
+            oid = self.rng.choice(self.live)
+            self._call(
+                "re_anchor_element",
+                {
+                    "overlay_id": oid,
+                    "x": self.rng.randint(-20, 20),
+                    "y": self.rng.randint(-20, 20),
+                    "anchor_mode": "relative",
+                },
+            )
+        else:
+            (ov,) = self.planner.propose_overlays(1, rng=self.rng)
+            ov.pop("label", None)
+            oid = self._call("draw_overlay", ov).get("overlay_id")
+            if oid:
+                self.live.append(oid)
+        if self.ops % a.session_every == 0 and self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def drain(self):
+        while self.live:
+            self._call("remove_overlay", {"overlayId": self.live.pop()})
+        if self.client is not None:
+            self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay/screenshot soak test")
+    parser.add_argument("--url", help="attach to a running server (needs --pid)")
+    parser.add_argument("--pid", type=int, help="server pid when using --url")
+    parser.add_argument("--bin", type=Path, default=APP_BIN)
+    parser.add_argument("--duration", type=float, default=3600.0, help="seconds")
+    parser.add_argument("--interval", type=float, default=5.0, help="sample period")
+    parser.add_argument("--warmup", type=float, default=300.0, help="excluded s")
+    parser.add_argument("--rate", type=float, default=20.0, help="ops/s")
+    parser.add_argument("--screenshot-every", type=int, default=25)
+    parser.add_argument("--ws-every", type=int, default=40)
+    parser.add_argument("--batch-every", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--session-every", type=int, default=500)
+    parser.add_argument("--max-live", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--limit",
+        action="append",
+        default=[],
+        metavar="METRIC=PER_HOUR",
+        help="override growth limits, e.g. rss_kb=65536",
+    )
+    parser.add_argument("--out", type=Path, default=ARTIFACTS / "soak.json")
+    args = parser.parse_args()
+
+    limits = dict(DEFAULT_LIMITS)
+    for item in args.limit:
+        k, _, v = item.partition("=")
+        if k not in limits:
+            sys.exit(f"unknown metric {k!r}; one of {', '.join(METRICS)}")
+        limits[k] = float(v)
+    if args.warmup >= args.duration:
+        args.warmup = args.duration / 4
+
+    proc = None
+    if args.url:
+        if not args.pid:
+            sys.exit("--url needs --pid for /proc sampling")
+        url, pid = args.url, args.pid
+    else:
+        proc, url = start_server(args.bin)
+        pid = proc.pid
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    series_path = args.out.with_name(args.out.stem + "_samples.jsonl")
+    counters: Dict[str, int] = {}
+    t0 = time.monotonic()
+    sampler = Sampler(pid, args.interval, series_path, t0)
+    sampler.counters = counters
+    sampler.start()
+    churn = Churn(url, args, counters)
+    period = 1.0 / args.rate
+    next_at = t0
+    deadline = t0 + args.duration
+    last_report = t0
+    try:
+        while time.monotonic() < deadline and not sampler.exited:
+            churn.step()
+            next_at += period
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.monotonic()
+            if now - last_report >= 60 and sampler.samples:
+                last_report = now
+                s = sampler.samples[-1]
+                print(
+                    f"[soak] {s['t']:.0f}s rss={s['rss_kb'] / 1024:.1f}MB "
+                    f"threads={s['threads']} fds={s['fds']} "
+                    f"children={s['children']} ops={counters.get('ops', 0)} "
+                    f"errors={counters.get('errors', 0)}",
+                    flush=True,
+                )
+    except KeyboardInterrupt:
+        print("[soak] interrupted; analysing what was collected")
+    finally:
+        churn.drain()
+        sampler.stop()
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except Exception:
+                proc.kill()
+
+    result = analyze(sampler.samples, args.warmup, limits)
+    if sampler.exited:
+        result["ok"] = False
+        result["error"] = "server process exited during the soak"
+    result.update(
+        {
+            "duration_s": round(time.monotonic() - t0, 3),
+            "interval_s": args.interval,
+            "warmup_s": args.warmup,
+            "counters": counters,
+            "series": str(series_path),
+        }
+    )
+    args.out.write_text(json.dumps(result, indent=2))
+    for m in METRICS:
+        if m in result:
+            r = result[m]
+            flag = "UNBOUNDED" if r["unbounded"] else "ok"
+            print(
+                f"[soak] {m:<9} {r['start']:>10.0f} -> {r['end']:>10.0f} "
+                f"slope {r['slope_per_hour']:>10.1f}/h "
+                f"(limit {r['limit_per_hour']:.0f}) {flag}"
+            )
+    print(f"[soak] {'PASS' if result['ok'] else 'FAIL'}; written to {args.out}")
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
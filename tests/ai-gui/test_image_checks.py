@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the batched rectangle color checks in verifier.image_checks
+
+Pure NumPy; needs no server or display.
+"""
+
+import numpy as np
+from verifier.image_checks import verify_rects
+
+RECTS = [(0, 0, 10, 10), (10, 0, 10, 10), (20, 0, 10, 10)]
+
+
+def frame() -> np.ndarray:
+    img = np.zeros((10, 30, 3), dtype=np.uint8)
+    img[:, 0:10] = (255, 0, 0)
+    img[:, 10:20] = (0, 255, 0)
+    img[:, 20:30] = (0, 0, 255)
+    return img
+
+
+def test_single_color_for_all_rects():
+    """One hex string or RGB triple applies to every rectangle"""
+    for expected in ("#ff0000", (255, 0, 0), [255, 0, 0], np.array([255, 0, 0])):
+        ok = [r["ok"] for r in verify_rects(frame(), RECTS, expected)]
+        assert ok == [True, False, False], (expected, ok)
+
+
+def test_per_rect_colors():
+    """A list of colors is matched rectangle by rectangle"""
+    for expected in (
+        ["#ff0000", "#00ff00", "#0000ff"],
+        [(255, 0, 0), (0, 255, 0), (0, 0, 255)],
+    ):
+        results = verify_rects(frame(), RECTS, expected)
+        assert all(r["ok"] for r in results), (expected, results)
+
+
+def test_mixed_per_rect_colors():
+    """Hex strings, RGB triples and CSS names can be mixed in one list"""
+    results = verify_rects(frame(), RECTS, ["#ff0000", (0, 255, 0), "blue"])
+    assert [r["ok"] for r in results] == [True, True, True]
+    assert [r["score"] for r in results] == [1.0, 1.0, 1.0]
+
+    results = verify_rects(frame(), RECTS, ["#00ff00", (255, 0, 0), "blue"])
+    assert [r["ok"] for r in results] == [False, False, True]
+
+
+if __name__ == "__main__":
+    test_single_color_for_all_rects()
+    test_per_rect_colors()
+    test_mixed_per_rect_colors()
+    print("🎉 Image check tests passed")
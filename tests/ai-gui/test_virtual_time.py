@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test deterministic overlay expiry on the virtual overlay clock
+
+Starts the HTTP server with OC_VIRTUAL_TIME=1, draws a temporary overlay and
+moves the clock with POST /debug/time/advance: the overlay must survive
+temporary_ms - 1 ms and be gone after 1 ms more, with no real-time sleeps.
+"""
+
+import json
+import os
+import socket
+import subprocess
+from pathlib import Path
+
+import requests
+from drivers.mcp_http import McpHttpClient, tool_result, wait_until_ready
+
+HERE = Path(__file__).parent.resolve()
+ROOT = Path(os.environ.get("AI_GUI_ROOT", HERE / "../.."))
+APP_BIN = Path(
+    os.environ.get("AI_GUI_APP_BIN", ROOT / "build/publish/overlay-companion-mcp")
+)
+
+TEMPORARY_MS = 1500
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def active_overlays(client: McpHttpClient) -> int:
+    return client.get_json("/health")["services"]["active_overlays"]
+
+
+def advance(base: str, ms: int) -> dict:
+    r = requests.post(f"{base}/debug/time/advance", params={"ms": ms}, timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+
+def test_virtual_time_overlay_expiry():
+    """Temporary overlay expires exactly at temporary_ms of virtual time"""
+    print("⏱️ Testing virtual-time overlay expiry")
+    print("=" * 45)
+    assert APP_BIN.exists(), f"Server binary not found: {APP_BIN}"
+
+    port = free_port()
+    env = {**os.environ, "PORT": str(port), "HEADLESS": "1", "OC_VIRTUAL_TIME": "1"}
+    proc = subprocess.Popen(
+        [str(APP_BIN), "--http"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    url = f"{base}/mcp"
+    client = McpHttpClient(url, client_name="virtual-time-test")
+    try:
+        wait_until_ready(url, timeout=60)
+        client.initialize()
+        clock = client.get_json("/debug/time")
+        assert clock.get("virtual_time"), f"virtual time not enabled: {clock}"
+        print("✅ Virtual clock enabled")
+
+        resp = client.call_tool("set_mode", {"mode": "assist"})
+        assert not resp.get("result", {}).get("isError"), resp
+        before = active_overlays(client)
+
+        overlay = {
+            "x": 100,
+            "y": 100,
+            "width": 200,
+            "height": 120,
+            "color": "#00FF00",
+            "temporary_ms": TEMPORARY_MS,
+        }
+        resp = client.call_tool("batch_overlay", {"overlays": json.dumps([overlay])})
+        ids = tool_result(resp).get("overlay_ids") or []
+        assert len(ids) == 1, f"batch_overlay failed: {resp}"
+        assert active_overlays(client) == before + 1
+        print(f"✅ Drew overlay {ids[0]} with temporary_ms={TEMPORARY_MS}")
+
+        step = advance(base, TEMPORARY_MS - 1)
+        assert step["fired"] == 0, step
+        assert active_overlays(client) == before + 1, "overlay expired early"
+        print(f"✅ Still present after {TEMPORARY_MS - 1} ms")
+
+        step = advance(base, 1)
+        assert step["fired"] >= 1, step
+        assert active_overlays(client) == before, "overlay did not expire"
+        print(f"✅ Expired at {TEMPORARY_MS} ms")
+    finally:
+        client.close()
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    test_virtual_time_overlay_expiry()
+    print("\n🎉 Virtual-time expiry test passed")
@@ -0,0 +1,317 @@
+"""
+Timing helpers shared by the ai-gui benchmarks and runners: rounded
+percentile summaries (on top of tests/perf_common.py), and the phase
+recorder behind the harness budget report.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from perf_common import latency_summary  # noqa: E402
+
+
+def summarize(
+    samples_ms: Iterable[float], points: Sequence[float] = (50, 90, 95, 99)
+) -> Dict[str, float]:
+    """perf_common.latency_summary rounded to microseconds for JSON reports"""
+    return {k: round(v, 3) for k, v in latency_summary(samples_ms, points).items()}
+
+
+# Phase recording
+#
+# Code marks where wall-clock time goes with
+#
+#     with phase("tools/call:draw_overlay", "tool"):
+#         ...
+#
+# Recording is off until a runner calls PHASES.enable(), so drivers can be
+# instrumented unconditionally without the benchmarks and soak runs
+# accumulating events. Phases nest per thread; the budget charges each
+# phase only for time not covered by its children (self time), so the
+# category totals add up to the run's wall time.
+
+CATEGORIES = (
+    "build",
+    "setup",
+    "startup",
+    "sleep",
+    "rpc",
+    "tool",
+    "screenshot",
+    "verify",
+    "io",
+    "step",
+)
+
+
+class _NullPhase:
+    event = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, recorder: "PhaseRecorder", name: str, cat: str, args):
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.child_ms = 0.0
+        self.event: Optional[Dict[str, Any]] = None
+
+    def __enter__(self):
+        self.recorder._stack().append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter()
+        stack = self.recorder._stack()
+        stack.pop()
+        dur_ms = (t1 - self.t0) * 1000.0
+        if stack:
+            stack[-1].child_ms += dur_ms
+        event = {
+            "name": self.name,
+            "cat": self.cat,
+            "start": self.recorder.epoch(self.t0),
+            "end": self.recorder.epoch(t1),
+            "self_ms": round(dur_ms - self.child_ms, 3),
+            "tid": threading.get_ident(),
+            "depth": len(stack),
+        }
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        if self.args:
+            event["args"] = self.args
+        self.event = event
+        self.recorder._add(event)
+        return False
+
+
+class PhaseRecorder:
+    """Collects timed phases; start/end are Unix epoch seconds"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_perf = time.perf_counter()
+        self._origin_epoch = time.time()
+
+    def enable(self):
+        self.enabled = True
+        self._origin_perf = time.perf_counter()
+        self._origin_epoch = time.time()
+
+    def epoch(self, perf: float) -> float:
+        # perf_counter for durations, anchored once so runners' events and
+        # run.sh's `date +%s.%N` marks share a clock
+        return self._origin_epoch + (perf - self._origin_perf)
+
+    def _stack(self) -> List[_Phase]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, event: Dict[str, Any]):
+        with self._lock:
+            self.events.append(event)
+
+    def phase(self, name: str, cat: str, **args):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name, cat, args)
+
+    def sleep(self, seconds: float, name: str = "sleep"):
+        with self.phase(name, "sleep", seconds=seconds):
+            time.sleep(seconds)
+
+    def load_marks(self, path: Path):
+        """Add phases recorded outside Python (JSON lines: name/cat/start/end)"""
+        if not path.exists():
+            return
+        for line in path.read_text().splitlines():
+            try:
+                mark = json.loads(line)
+                start, end = float(mark["start"]), float(mark["end"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._add(
+                {
+                    "name": mark.get("name", "external"),
+                    "cat": mark.get("cat", "setup"),
+                    "start": start,
+                    "end": end,
+                    "self_ms": round((end - start) * 1000.0, 3),
+                    "tid": 0,
+                    "depth": 0,
+                    "external": True,
+                }
+            )
+
+    def budget(self) -> Dict[str, Any]:
+        """Self time per category, plus untracked wall time"""
+        with self._lock:
+            events = list(self.events)
+        if not events:
+            return {"wall_ms": 0.0, "categories": {}}
+        start = min(e["start"] for e in events)
+        end = max(e["end"] for e in events)
+        wall_ms = (end - start) * 1000.0
+        cats: Dict[str, Dict[str, float]] = {}
+        main_tid = threading.main_thread().ident
+        tracked = 0.0
+        for e in events:
+            c = cats.setdefault(e["cat"], {"ms": 0.0, "count": 0})
+            c["ms"] += e["self_ms"]
+            c["count"] += 1
+            # Worker threads overlap the main thread; only serial time
+            # counts against the wall
+            if e["tid"] in (main_tid, 0):
+                tracked += e["self_ms"]
+        for c in cats.values():
+            c["ms"] = round(c["ms"], 3)
+            c["share"] = round(c["ms"] / wall_ms, 4) if wall_ms else 0.0
+        return {
+            "wall_ms": round(wall_ms, 3),
+            "untracked_ms": round(max(0.0, wall_ms - tracked), 3),
+            "categories": dict(
+                sorted(cats.items(), key=lambda kv: kv[1]["ms"], reverse=True)
+            ),
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format, loadable in chrome://tracing or Perfetto"""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["start"])
+        pid = os.getpid()
+        t0 = events[0]["start"] if events else 0.0
+        tids: Dict[int, int] = {}
+        trace = []
+        for e in events:
+            tid = tids.setdefault(e["tid"], len(tids))
+            args = dict(e.get("args") or {}, self_ms=e["self_ms"])
+            if "error" in e:
+                args["error"] = e["error"]
+            trace.append(
+                {
+                    "name": e["name"],
+                    "cat": e["cat"],
+                    "ph": "X",
+                    "ts": round((e["start"] - t0) * 1e6, 1),
+                    "dur": round((e["end"] - e["start"]) * 1e6, 1),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+        for ident, tid in tids.items():
+            name = "run.sh" if ident == 0 else f"thread-{tid}"
+            if ident == threading.main_thread().ident:
+                name = "main"
+            trace.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+            )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+PHASES = PhaseRecorder()
+phase = PHASES.phase
+
+
+def rpc_phase(method: str, params: Dict[str, Any] = None) -> Tuple[str, str]:
+    """Phase name and category for a JSON-RPC request"""
+    if method == "tools/call":
+        tool = (params or {}).get("name", "")
+        return f"tools/call:{tool}", "screenshot" if "screenshot" in tool else "tool"
+    return method, "rpc"
+
+
+def budget_table(budget: Dict[str, Any]) -> str:
+    rows = [
+        (cat, f"{c['ms'] / 1000.0:.2f}", f"{c['share'] * 100.0:.1f}", str(c["count"]))
+        for cat, c in budget["categories"].items()
+    ]
+    wall_ms = budget["wall_ms"]
+    if wall_ms:
+        untracked = budget["untracked_ms"]
+        rows.append(
+            (
+                "(untracked)",
+                f"{untracked / 1000.0:.2f}",
+                f"{untracked / wall_ms * 100:.1f}",
+                "",
+            )
+        )
+    rows.append(("wall", f"{wall_ms / 1000.0:.2f}", "100.0", ""))
+    header = ("category", "seconds", "%", "phases")
+    widths = [max(len(r[i]) for r in rows + [header]) for i in range(4)]
+    lines = ["  ".join(h.ljust(w) for h, w in zip(header, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in rows]
+    return "\n".join(lines)
+
+
+def append_history(
+    path: Path, record: Dict[str, Any], keep: int = 200, window: int = 10
+) -> List[Tuple[str, float, float, float]]:
+    """
+    Append record (which carries a budget) to a JSONL history trimmed to the
+    last `keep` runs. Returns (category, baseline_ms, ms, delta %) against
+    the median of the previous `window` runs.
+    """
+    history: List[Dict[str, Any]] = []
+    if path.exists():
+        for line in path.read_text().splitlines():
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    deltas = []
+    cur = {"wall": record["budget"]["wall_ms"]}
+    cur.update({k: v["ms"] for k, v in record["budget"]["categories"].items()})
+    for key, ms in cur.items():
+        past = sorted(
+            v
+            for v in (
+                (
+                    h["budget"]["wall_ms"]
+                    if key == "wall"
+                    else h["budget"]["categories"].get(key, {}).get("ms")
+                )
+                for h in history[-window:]
+            )
+            if v is not None
+        )
+        if past:
+            base = past[len(past) // 2]
+            delta = (ms / base - 1.0) * 100.0 if base else 0.0
+            deltas.append((key, base, ms, round(delta, 1)))
+    history.append(record)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text("".join(json.dumps(h) + "\n" for h in history[-keep:]))
+    os.replace(tmp, path)
+    return deltas
@@ -0,0 +1,214 @@
+"""
+Tile-based golden-image comparison.
+
+Frames are split into `tile` x `tile` blocks and each block gets an SSIM
+score (on luma, using block statistics rather than a sliding window) and a
+PSNR (on RGB). All tiles are computed together with np.add.reduceat over
+float32 luma and squared error, so a comparison is a handful of full-frame
+passes: roughly 0.1 s at 1080p and 0.4 s at 4K, fine for checkpoints in a
+scenario but not for every captured frame.
+
+Per-region tolerances loosen or tighten the thresholds for tiles that
+overlap a region (e.g. a clock or a text caret), or skip them entirely.
+Failing tiles are drawn onto a heatmap PNG for the artifacts directory.
+
+Goldens live in tests/ai-gui/golden/<name>.png. A missing golden fails the
+check; set AI_GUI_UPDATE_GOLDEN=1 to (re)record them from the current run.
+Scenarios compare against goldens with the `golden` step kind.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from verifier.image_checks import FrameSource, load_frame
+
+HERE = Path(__file__).resolve().parent.parent
+GOLDEN_DIR = Path(os.environ.get("AI_GUI_GOLDEN_DIR", HERE / "golden"))
+
+# SSIM stabilising constants for 8-bit data (K1=0.01, K2=0.03)
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _tile_sums(arr: np.ndarray, tile: int) -> np.ndarray:
+    rows = np.arange(0, arr.shape[0], tile)
+    cols = np.arange(0, arr.shape[1], tile)
+    # Columns first: reducing along the contiguous axis is several times
+    # faster, and accumulating in float64 there needs no full-frame copy
+    summed = np.add.reduceat(arr, cols, axis=1, dtype=np.float64)
+    return np.add.reduceat(summed, rows, axis=0)
+
+
+def tile_metrics(golden: FrameSource, frame: FrameSource, tile: int = 64) -> dict:
+    """
+    Per-tile SSIM and PSNR between two same-sized frames.
+
+    Returns 'ssim' and 'psnr' arrays of shape (tiles_y, tiles_x); edge tiles
+    cover whatever is left over. Identical tiles have ssim 1.0 and psnr inf.
+    """
+    g = load_frame(golden)
+    f = load_frame(frame)
+    if g.shape != f.shape:
+        raise ValueError(f"frame size mismatch: {g.shape[:2]} vs {f.shape[:2]}")
+    h, w = g.shape[:2]
+    ys, xs = np.arange(0, h, tile), np.arange(0, w, tile)
+    count = np.outer(np.diff(np.append(ys, h)), np.diff(np.append(xs, w)))
+    count = count.astype(np.float64)
+
+    # Luma once as float32; the products share one float64 buffer so the
+    # tile sums of squares keep their precision
+    gy = g @ _LUMA
+    fy = f @ _LUMA
+    buf = np.empty((h, w), dtype=np.float64)
+    mu_g = _tile_sums(gy, tile) / count
+    mu_f = _tile_sums(fy, tile) / count
+    var_g = _tile_sums(np.multiply(gy, gy, out=buf), tile) / count - mu_g**2
+    var_f = _tile_sums(np.multiply(fy, fy, out=buf), tile) / count - mu_f**2
+    cov = _tile_sums(np.multiply(gy, fy, out=buf), tile) / count - mu_g * mu_f
+    ssim = ((2 * mu_g * mu_f + _C1) * (2 * cov + _C2)) / (
+        (mu_g**2 + mu_f**2 + _C1) * (var_g + var_f + _C2)
+    )
+
+    # Squared RGB error per pixel: |g - f| stays in uint8 and its square
+    # summed over channels (< 2**24) is exact in float32
+    err = np.maximum(g, f)
+    err -= np.minimum(g, f)
+    sq = err.astype(np.float32)
+    np.square(sq, out=sq)
+    px = np.add(sq[..., 0], sq[..., 1], out=gy)
+    px += sq[..., 2]
+    mse = _tile_sums(px, tile) / (count * 3)
+    with np.errstate(divide="ignore"):
+        psnr = np.where(mse > 0, 10.0 * np.log10(255.0**2 / mse), np.inf)
+    return {"ssim": np.clip(ssim, -1.0, 1.0), "psnr": psnr, "tile": tile}
+
+
+def _tolerance_grid(
+    shape, tile: int, min_ssim: float, min_psnr: float, regions: Sequence[dict]
+):
+    ty, tx = shape
+    ssim_t = np.full(shape, float(min_ssim))
+    psnr_t = np.full(shape, float(min_psnr))
+    skip = np.zeros(shape, dtype=bool)
+    # Later regions win where regions overlap
+    for reg in regions or []:
+        c0, r0 = reg["x"] // tile, reg["y"] // tile
+        c1 = min(tx, -(-(reg["x"] + reg["width"]) // tile))
+        r1 = min(ty, -(-(reg["y"] + reg["height"]) // tile))
+        sl = (slice(max(r0, 0), r1), slice(max(c0, 0), c1))
+        if reg.get("ignore"):
+            skip[sl] = True
+            continue
+        if "min_ssim" in reg:
+            ssim_t[sl] = reg["min_ssim"]
+        if "min_psnr" in reg:
+            psnr_t[sl] = reg["min_psnr"]
+    return ssim_t, psnr_t, skip
+
+
+def write_heatmap(
+    frame: FrameSource, ssim: np.ndarray, failing: np.ndarray, tile: int, path: Path
+) -> Path:
+    """Dim the frame and tint failing tiles red in proportion to 1 - SSIM"""
+    base = load_frame(frame).astype(np.float32) * 0.4
+    h, w = base.shape[:2]
+    severity = np.where(failing, np.clip(1.0 - ssim, 0.0, 1.0) * 4.0, 0.0)
+    severity = np.clip(severity, 0.0, 1.0)
+    sev_px = np.repeat(np.repeat(severity, tile, axis=0), tile, axis=1)[:h, :w]
+    alpha = np.where(sev_px > 0, 0.35 + 0.65 * sev_px, 0.0)[..., None]
+    red = np.array([255.0, 0.0, 0.0], dtype=np.float32)
+    out = base * (1.0 - alpha) + red * alpha
+    img = out.clip(0, 255).astype(np.uint8)
+    # Outline failing tiles so small ones stay visible
+    for r, c in zip(*np.nonzero(failing)):
+        y0, x0 = r * tile, c * tile
+        y1, x1 = min(y0 + tile, h) - 1, min(x0 + tile, w) - 1
+        img[y0, x0 : x1 + 1] = img[y1, x0 : x1 + 1] = (255, 255, 0)
+        img[y0 : y1 + 1, x0] = img[y0 : y1 + 1, x1] = (255, 255, 0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(img).save(path)
+    return path
+
+
+def compare_frames(
+    golden: FrameSource,
+    frame: FrameSource,
+    tile: int = 64,
+    min_ssim: float = 0.98,
+    min_psnr: float = 35.0,
+    regions: Optional[Sequence[dict]] = None,
+    heatmap_path: Optional[Path] = None,
+) -> dict:
+    """
+    Compare a frame against its golden image tile by tile.
+
+    A tile fails when its SSIM is below min_ssim or its PSNR below min_psnr
+    (after per-region overrides). regions are dicts with x, y, width, height
+    and any of min_ssim, min_psnr or ignore=True. A heatmap is written to
+    heatmap_path only when at least one tile fails.
+    """
+    m = tile_metrics(golden, frame, tile)
+    ssim, psnr = m["ssim"], m["psnr"]
+    ssim_t, psnr_t, skip = _tolerance_grid(
+        ssim.shape, tile, min_ssim, min_psnr, regions or []
+    )
+    failing = ~skip & ((ssim < ssim_t) | (psnr < psnr_t))
+    tiles: List[Dict] = []
+    for r, c in zip(*np.nonzero(failing)):
+        tiles.append(
+            {
+                "x": int(c * tile),
+                "y": int(r * tile),
+                "tile": tile,
+                "ssim": round(float(ssim[r, c]), 4),
+                "psnr": round(float(psnr[r, c]), 2),
+            }
+        )
+    checked = ~skip
+    result = {
+        "ok": not tiles,
+        "tiles": int(ssim.size),
+        "failing_tiles": tiles,
+        "min_ssim": round(float(ssim[checked].min()), 4) if checked.any() else None,
+        "mean_ssim": round(float(ssim[checked].mean()), 4) if checked.any() else None,
+    }
+    finite = psnr[checked & np.isfinite(psnr)]
+    result["min_psnr"] = round(float(finite.min()), 2) if finite.size else None
+    if tiles and heatmap_path is not None:
+        result["heatmap"] = str(write_heatmap(frame, ssim, failing, tile, heatmap_path))
+    return result
+
+
+def check_golden(
+    name: str, frame: FrameSource, artifacts: Optional[Path] = None, **kwargs
+) -> dict:
+    """
+    Compare frame against golden/<name>.png.
+
+    "status" is pass, fail, missing (no golden; the check fails) or
+    recorded. Goldens are only written when AI_GUI_UPDATE_GOLDEN=1, which
+    (re)records them instead of comparing. The heatmap goes to
+    <artifacts>/<name>.heatmap.png on failure.
+    """
+    path = GOLDEN_DIR / f"{name}.png"
+    if os.environ.get("AI_GUI_UPDATE_GOLDEN") == "1":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(load_frame(frame)).save(path)
+        return {"ok": True, "status": "recorded", "golden": str(path)}
+    if not path.exists():
+        return {
+            "ok": False,
+            "status": "missing",
+            "golden": str(path),
+            "error": "no golden image; record it with AI_GUI_UPDATE_GOLDEN=1",
+        }
+    heatmap = artifacts / f"{name}.heatmap.png" if artifacts else None
+    result = compare_frames(path, frame, heatmap_path=heatmap, **kwargs)
+    result["status"] = "pass" if result["ok"] else "fail"
+    result["golden"] = str(path)
+    return result
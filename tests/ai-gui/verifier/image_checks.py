@@ -1,7 +1,11 @@
-from typing import Tuple
+import io
+from typing import Sequence, Tuple, Union
 
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageColor
+
+FrameSource = Union[bytes, bytearray, memoryview, str, np.ndarray, Image.Image]
+Color = Union[str, Sequence[float]]
 
 
 def avg_color_in_rect(
@@ -22,3 +26,167 @@ def likely_not_black(
     color: Tuple[float, float, float], threshold: float = 10.0
 ) -> bool:
     return any(c > threshold for c in color)
+
+
+def load_frame(src: FrameSource) -> np.ndarray:
+    """
+    Decode a frame once into an (H, W, 3) uint8 RGB array.
+
+    Accepts encoded image bytes (e.g. a decoded image_base64 payload), a file
+    path, a PIL image, or an existing array (grayscale, RGB or RGBA).
+    """
+    if isinstance(src, np.ndarray):
+        arr = src
+    elif isinstance(src, Image.Image):
+        arr = np.asarray(src.convert("RGB"))
+    elif isinstance(src, (bytes, bytearray, memoryview)):
+        with Image.open(io.BytesIO(bytes(src))) as im:
+            arr = np.asarray(im.convert("RGB"))
+    else:
+        with Image.open(src) as im:
+            arr = np.asarray(im.convert("RGB"))
+    if arr.ndim == 2:
+        arr = np.repeat(arr[:, :, None], 3, axis=2)
+    elif arr.shape[2] == 4:
+        arr = arr[:, :, :3]
+    return np.ascontiguousarray(arr, dtype=np.uint8)
+
+
+def parse_color(color: Color) -> Tuple[float, float, float]:
+    """'#RRGGBB', 'RRGGBB', '#RGB', a CSS name or an (r, g, b) sequence -> floats"""
+    if isinstance(color, str):
+        s = color.strip().lstrip("#")
+        if len(s) == 3 and all(c in "0123456789abcdefABCDEF" for c in s):
+            s = "".join(c * 2 for c in s)
+        try:
+            if len(s) in (6, 8):
+                return tuple(float(int(s[i : i + 2], 16)) for i in (0, 2, 4))
+        except ValueError:
+            pass
+        try:
+            r, g, b = ImageColor.getrgb(color.strip())[:3]
+        except ValueError:
+            raise ValueError(f"unsupported color: {color!r}") from None
+        return (float(r), float(g), float(b))
+    r, g, b = list(color)[:3]
+    return (float(r), float(g), float(b))
+
+
+def _is_color(value) -> bool:
+    """One color (a string or 3 numbers) rather than a list of colors"""
+    if isinstance(value, str):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.shape == (3,)
+    return (
+        isinstance(value, (tuple, list))
+        and len(value) == 3
+        and all(isinstance(v, (int, float, np.number)) for v in value)
+    )
+
+
+class FrameStats:
+    """
+    Summed-area tables over one decoded frame.
+
+    Building the tables is a single O(H*W) pass; after that the mean and
+    variance of any rectangle cost four lookups per channel, so thousands of
+    overlay rectangles can be checked in one vectorized call.
+    """
+
+    def __init__(self, frame: FrameSource):
+        self.frame = load_frame(frame)
+        self.height, self.width = self.frame.shape[:2]
+        self._sum = self._integral(self.frame)
+        self._sq = None  # built on first variance request
+
+    def _integral(self, px: np.ndarray) -> np.ndarray:
+        # One leading row/column of zeros so rect sums need no edge cases
+        table = np.zeros((self.height + 1, self.width + 1, 3), dtype=np.int64)
+        np.cumsum(px, axis=0, dtype=np.int64, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    def _squares(self) -> np.ndarray:
+        if self._sq is None:
+            sq = self.frame.astype(np.uint16)
+            sq *= sq
+            self._sq = self._integral(sq)
+        return self._sq
+
+    def _clip(self, rects) -> Tuple[np.ndarray, ...]:
+        r = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        x0 = np.clip(r[:, 0], 0, self.width)
+        y0 = np.clip(r[:, 1], 0, self.height)
+        x1 = np.clip(r[:, 0] + r[:, 2], 0, self.width)
+        y1 = np.clip(r[:, 1] + r[:, 3], 0, self.height)
+        x1 = np.maximum(x0, x1)
+        y1 = np.maximum(y0, y1)
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _box(table, x0, y0, x1, y1) -> np.ndarray:
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+    def rect_stats(self, rects, variance: bool = True) -> dict:
+        """
+        Per-rectangle statistics for an (N, 4) array of (x, y, width, height).
+
+        Rectangles are clipped to the frame. Returns arrays: 'mean' and 'var'
+        of shape (N, 3) in RGB order, and 'area' of shape (N,) with the clipped
+        pixel count (rectangles entirely off-frame have area 0 and mean 0).
+        With variance=False the squared-sum table is not built and 'var' is
+        omitted.
+        """
+        x0, y0, x1, y1 = self._clip(rects)
+        area = (x1 - x0) * (y1 - y0)
+        denom = np.maximum(area, 1)[:, None].astype(np.float64)
+        mean = self._box(self._sum, x0, y0, x1, y1) / denom
+        stats = {"mean": mean, "area": area}
+        if variance:
+            var = self._box(self._squares(), x0, y0, x1, y1) / denom - mean * mean
+            stats["var"] = np.maximum(var, 0.0)
+        return stats
+
+    def match_scores(self, rects, expected, tolerance: float = 60.0) -> dict:
+        """
+        Score how well each rectangle matches its expected color.
+
+        expected is one color for all rectangles or one per rectangle (hex
+        strings or RGB triples). The score is 1.0 for an exact mean match and
+        falls linearly to 0.0 at `tolerance` Euclidean RGB distance; 'matched'
+        is score > 0 on a non-empty rectangle.
+        """
+        stats = self.rect_stats(rects)
+        n = stats["area"].shape[0]
+        if _is_color(expected):
+            exp = np.tile(np.asarray(parse_color(expected)), (n, 1))
+        else:
+            exp = np.asarray([parse_color(c) for c in expected], dtype=np.float64)
+        dist = np.linalg.norm(stats["mean"] - exp, axis=1)
+        score = np.clip(1.0 - dist / float(tolerance), 0.0, 1.0)
+        stats.update(
+            {
+                "distance": dist,
+                "score": score,
+                "matched": (score > 0) & (stats["area"] > 0),
+            }
+        )
+        return stats
+
+
+def verify_rects(frame: FrameSource, rects, expected, tolerance: float = 60.0) -> list:
+    """Batch check over one decoded frame; one JSON-friendly dict per rect"""
+    stats = FrameStats(frame).match_scores(rects, expected, tolerance)
+    out = []
+    for i, rect in enumerate(np.asarray(rects).reshape(-1, 4).tolist()):
+        out.append(
+            {
+                "rect": rect,
+                "avg_color": [round(float(v), 2) for v in stats["mean"][i]],
+                "variance": [round(float(v), 2) for v in stats["var"][i]],
+                "score": round(float(stats["score"][i]), 4),
+                "ok": bool(stats["matched"][i]),
+            }
+        )
+    return out
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the published overlay-companion-mcp binary
+
+Launches the binary N times in each mode and measures, from the moment
+the process is spawned:
+
+- time to the first successful initialize response
+- time to the first tools/list response
+- peak RSS during startup (VmHWM read right after tools/list, so nothing
+  between samples can be missed)
+
+Modes:
+    stdio     --stdio, JSON-RPC over the child's stdin/stdout
+    http      --http on a free PORT, polled until initialize succeeds
+    headless  --http with HEADLESS=1
+    smoke     --smoke-test --http; also records the OC_WINDOW_READY_FILE
+              time and when the process exits on its own
+
+Each invocation appends one record (timestamp, git revision, binary size
+and mtime, per-mode summaries) to a JSONL history file and compares the
+new p50s with the median of the previous runs, so startup regressions
+show up instead of hiding behind the 8 s sleeps in the test scripts.
+
+Example:
+    python3 cold_start_bench.py --runs 20 --modes stdio,http,headless,smoke
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from perf_common import (
+    McpHttpSession,
+    McpStdioSession,
+    fmt_num,
+    format_table,
+    free_port,
+    latency_summary,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BIN = ROOT / "build" / "publish" / "overlay-companion-mcp"
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "perf-history" / "cold_start.jsonl"
+MODES = ("stdio", "http", "headless", "smoke")
+METRICS = ("initialize_ms", "tools_list_ms", "peak_rss_mb")
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    try:
+        for line in (Path("/proc") / str(pid) / "status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def _stop(proc: subprocess.Popen):
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def run_stdio(binary: Path, env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    session = McpStdioSession(
+        [str(binary), "--stdio"], env=env, timeout=timeout, client_name="cold-start"
+    )
+    try:
+        session.initialize()
+        t_init = time.perf_counter()
+        session.list_tools()
+        t_tools = time.perf_counter()
+        rss = peak_rss_mb(session.proc.pid)
+    finally:
+        session.close()
+    return {
+        "initialize_ms": (t_init - t0) * 1000.0,
+        "tools_list_ms": (t_tools - t0) * 1000.0,
+        "peak_rss_mb": rss,
+    }
+
+
+def run_http(
+    binary: Path, env: Dict[str, str], timeout: float, smoke: bool = False
+) -> Dict[str, Any]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    env = dict(env, PORT=str(port))
+    args = [str(binary), "--http"]
+    ready_file = None
+    if smoke:
+        ready_file = Path(tempfile.mkdtemp(prefix="oc-cold-")) / "ready"
+        env["OC_WINDOW_READY_FILE"] = str(ready_file)
+        args.append("--smoke-test")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        args,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    out: Dict[str, Any] = {}
+    try:
+        deadline = t0 + timeout
+        while True:
+            session = McpHttpSession(url, timeout=2.0, client_name="cold-start")
+            try:
+                session.initialize()
+                break
+            except (requests.RequestException, RuntimeError, ValueError):
+                session.close()
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with code {proc.returncode}")
+                if time.perf_counter() > deadline:
+                    raise TimeoutError(f"{url} not ready after {timeout}s")
+                time.sleep(0.005)
+        t_init = time.perf_counter()
+        session.list_tools()
+        t_tools = time.perf_counter()
+        session.close()
+        out = {
+            "initialize_ms": (t_init - t0) * 1000.0,
+            "tools_list_ms": (t_tools - t0) * 1000.0,
+            "peak_rss_mb": peak_rss_mb(proc.pid),
+        }
+        if smoke:
+            while not ready_file.exists() and proc.poll() is None:
+                if time.perf_counter() > deadline:
+                    break
+                time.sleep(0.01)
+            if ready_file.exists():
+                out["ready_file_ms"] = (time.perf_counter() - t0) * 1000.0
+            try:
+                proc.wait(timeout=max(1.0, deadline - time.perf_counter()))
+                out["exit_ms"] = (time.perf_counter() - t0) * 1000.0
+                out["exit_code"] = proc.returncode
+            except subprocess.TimeoutExpired:
+                out["exit_ms"] = None
+    finally:
+        _stop(proc)
+        if ready_file is not None:
+            ready_file.unlink(missing_ok=True)
+            ready_file.parent.rmdir()
+    return out
+
+
+def run_mode(mode: str, binary: Path, timeout: float) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.pop("HEADLESS", None)
+    if mode == "stdio":
+        return run_stdio(binary, env, timeout)
+    if mode == "headless":
+        env["HEADLESS"] = "1"
+    return run_http(binary, env, timeout, smoke=(mode == "smoke"))
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [s for s in samples if "error" not in s]
+    out: Dict[str, Any] = {"runs": len(samples), "failures": len(samples) - len(ok)}
+    keys = sorted({k for s in ok for k, v in s.items() if isinstance(v, float)})
+    for key in keys:
+        vals = [s[key] for s in ok if s.get(key) is not None]
+        out[key] = {k: round(v, 3) for k, v in latency_summary(vals).items()}
+    return out
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare_history(
+    history: List[Dict[str, Any]], current: Dict[str, Any], window: int
+) -> List[List[Any]]:
+    """Current p50 vs median of the last `window` runs' p50s, per mode/metric"""
+    rows = []
+    for mode, summary in current["modes"].items():
+        for metric in METRICS:
+            cur = (summary.get(metric) or {}).get("p50")
+            past = sorted(
+                rec["modes"][mode][metric]["p50"]
+                for rec in history[-window:]
+                if (rec.get("modes", {}).get(mode, {}).get(metric) or {}).get("p50")
+                is not None
+            )
+            base = past[len(past) // 2] if past else None
+            delta = (cur / base - 1.0) * 100.0 if cur and base else None
+            rows.append([mode, metric, base, cur, delta, len(past)])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--bin", type=Path, default=DEFAULT_BIN)
+    parser.add_argument("--runs", type=int, default=10, help="launches per mode")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--timeout", type=float, default=60.0, help="per launch")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--no-history", action="store_true")
+    parser.add_argument(
+        "--window", type=int, default=10, help="past runs in the baseline"
+    )
+    parser.add_argument(
+        "--fail-over",
+        type=float,
+        help="exit 1 if any p50 is this many percent above the baseline",
+    )
+    parser.add_argument("--json", help="write the full results to this file")
+    args = parser.parse_args()
+
+    if not args.bin.exists():
+        raise SystemExit(f"server binary not found: {args.bin}")
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for m in modes:
+        if m not in MODES:
+            raise SystemExit(f"unknown mode {m!r}; one of {', '.join(MODES)}")
+
+    samples: Dict[str, List[Dict[str, Any]]] = {m: [] for m in modes}
+    # Interleave modes so drift (thermal, page cache) hits all of them alike
+    for i in range(args.runs):
+        for mode in modes:
+            try:
+                res = run_mode(mode, args.bin, args.timeout)
+            except Exception as e:
+                res = {"error": str(e)}
+            samples[mode].append(res)
+            print(
+                f"[{i + 1}/{args.runs}] {mode:<8} "
+                + (
+                    res["error"]
+                    if "error" in res
+                    else f"init {res['initialize_ms']:.0f} ms "
+                    f"tools {res['tools_list_ms']:.0f} ms "
+                    f"rss {fmt_num(res['peak_rss_mb'])} MB"
+                )
+            )
+
+    stat = args.bin.stat()
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git": git_revision(),
+        "binary": {"size": stat.st_size, "mtime": int(stat.st_mtime)},
+        "runs": args.runs,
+        "modes": {m: summarize(s) for m, s in samples.items()},
+    }
+
+    print()
+    header = ["mode", "runs", "fail", "init p50", "init p95", "tools p50", "rss max"]
+    rows = []
+    for mode, s in record["modes"].items():
+        init, tools = s.get("initialize_ms") or {}, s.get("tools_list_ms") or {}
+        rows.append(
+            [
+                mode,
+                s["runs"],
+                s["failures"],
+                fmt_num(init.get("p50")),
+                fmt_num(init.get("p95")),
+                fmt_num(tools.get("p50")),
+                fmt_num((s.get("peak_rss_mb") or {}).get("max")),
+            ]
+        )
+    print(format_table(header, rows))
+
+    history: List[Dict[str, Any]] = []
+    if args.history.exists():
+        with open(args.history) as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    regressions = []
+    if history:
+        cmp_rows = compare_history(history, record, args.window)
+        print()
+        print(
+            format_table(
+                ["mode", "metric", "baseline p50", "p50", "delta %", "n"],
+                [
+                    [m, k, fmt_num(b), fmt_num(c), fmt_num(d), n]
+                    for m, k, b, c, d, n in cmp_rows
+                ],
+            )
+        )
+        if args.fail_over is not None:
+            regressions = [
+                r for r in cmp_rows if r[4] is not None and r[4] > args.fail_over
+            ]
+    if not args.no_history:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nAppended to {args.history}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(record, samples=samples), indent=2))
+        print(f"Wrote {args.json}")
+    if regressions:
+        for m, k, b, c, d, _ in regressions:
+            print(f"REGRESSION {m} {k}: {fmt_num(b)} -> {fmt_num(c)} (+{d:.1f}%)")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
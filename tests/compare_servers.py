@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
+import argparse
 import json
+import os
+import random
 import subprocess
+import threading
 import time
 from pathlib import Path
 
 import requests
+from perf_common import (
+    McpHttpSession,
+    ProcSampler,
+    format_table,
+    is_error,
+    latency_summary,
+    tool_json,
+)
 
 # Simple harness to compare basic tool list and a call between C# HTTP MCP and Rust HTTP MCP
 # Assumes:
 # - C# MCP server reachable at http://localhost:3000/mcp when its container is running
 # - Rust MCP server reachable at http://localhost:3001/mcp (we'll run locally on 3001)
+#
+# Load mode (--load) drives both servers with the same closed-loop workload and
+# prints throughput, latency percentiles, error rate and server RSS side by side:
+#   python3 compare_servers.py --load --sessions 16 --duration 30 \
+#       --mix draw_overlay=4,remove_overlay=3,take_screenshot=1,get_display_info=2
 
 RUST_PORT = 3001
 CS_PORT = 3000
@@ -75,14 +92,27 @@ def post(url, method, params=None, session=None, streamable=False, extra_headers
         return _post_json(url, payload, session=session)
 
 
-def main():
-    # Start Rust server on 3001
-    env = dict(**dict())
+def start_rust_server() -> subprocess.Popen:
+    env = dict(os.environ)
     env["MCP_HTTP_PORT"] = str(RUST_PORT)
-    rust_proc = subprocess.Popen(
-        [RUST_BIN], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    proc = subprocess.Popen(
+        [RUST_BIN], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
     )
     time.sleep(1.5)
+    return proc
+
+
+def stop_server(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=2)
+    except Exception:
+        proc.kill()
+
+
+def parity_check():
+    # Start Rust server on 3001
+    rust_proc = start_rust_server()
 
     try:
         rust_url = f"http://localhost:{RUST_PORT}/"
@@ -224,11 +254,274 @@ def main():
         print("OK: take_screenshot returns expected payloads")
 
     finally:
-        rust_proc.terminate()
+        stop_server(rust_proc)
+
+
+# ---------------------------------------------------------------------------
+# Load mode
+# ---------------------------------------------------------------------------
+
+DEFAULT_MIX = "draw_overlay=4,remove_overlay=3,take_screenshot=1,get_display_info=2"
+
+
+def parse_mix(spec: str) -> list:
+    """Parse "tool=weight,tool=weight" into [(tool, weight)]"""
+    mix = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    if not mix:
+        raise ValueError("empty tool mix")
+    return mix
+
+
+class LoadWorker(threading.Thread):
+    """One MCP session issuing tool calls back-to-back until the deadline"""
+
+    def __init__(self, url: str, mix: list, deadline: float, seed: int):
+        super().__init__(daemon=True)
+        self.url = url
+        self.mix = mix
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.latencies = {}  # tool -> [ms]
+        self.errors = {}  # tool -> count
+        self.init_error = None
+        self._live_ids = []
+
+    def _arguments(self, tool: str):
+        rng = self.rng
+        if tool == "draw_overlay":
+            w, h = rng.randint(40, 300), rng.randint(30, 200)
+            return {
+                "x": rng.randint(0, 1920 - w),
+                "y": rng.randint(0, 1080 - h),
+                "width": w,
+                "height": h,
+                "color": "#%06X" % rng.randint(0, 0xFFFFFF),
+                "opacity": 0.5,
+            }
+        if tool == "remove_overlay":
+            if not self._live_ids:
+                return None
+            oid = self._live_ids.pop(rng.randrange(len(self._live_ids)))
+            # C# binds overlayId, Rust binds overlay_id
+            return {"overlayId": oid, "overlay_id": oid}
+        if tool == "re_anchor_element":
+            if not self._live_ids:
+                return None
+            return {
+                "overlay_id": rng.choice(self._live_ids),
+                "x": rng.randint(-50, 50),
+                "y": rng.randint(-50, 50),
+                "anchor_mode": "relative",
+            }
+        return {}
+
+    def run(self):
+        client = McpHttpSession(self.url, client_name="cmp-load")
         try:
-            rust_proc.wait(timeout=2)
-        except Exception:
-            rust_proc.kill()
+            client.initialize()
+        except Exception as e:
+            self.init_error = str(e)
+            return
+        names = [m[0] for m in self.mix]
+        weights = [m[1] for m in self.mix]
+        try:
+            while time.monotonic() < self.deadline:
+                tool = self.rng.choices(names, weights)[0]
+                args = self._arguments(tool)
+                if args is None:
+                    tool, args = "draw_overlay", self._arguments("draw_overlay")
+                t0 = time.perf_counter()
+                try:
+                    resp = client.call_tool(tool, args)
+                    failed = is_error(resp)
+                except Exception:
+                    resp, failed = None, True
+                dt = (time.perf_counter() - t0) * 1000.0
+                self.latencies.setdefault(tool, []).append(dt)
+                if failed:
+                    self.errors[tool] = self.errors.get(tool, 0) + 1
+                elif tool == "draw_overlay":
+                    oid = tool_json(resp).get("overlay_id")
+                    if oid:
+                        self._live_ids.append(oid)
+        finally:
+            client.close()
+
+
+def run_load(url: str, pid, mix: list, sessions: int, duration: float, seed: int):
+    """Run the workload against one server and return its result dict"""
+    sampler = ProcSampler(pid, interval=0.5)
+    sampler.start()
+    start = time.monotonic()
+    deadline = start + duration
+    workers = [LoadWorker(url, mix, deadline, seed + i) for i in range(sessions)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.monotonic() - start
+    sampler.stop()
+
+    per_tool = {}
+    all_lat = []
+    total_errors = 0
+    for w in workers:
+        for tool, lat in w.latencies.items():
+            per_tool.setdefault(tool, {"latencies": [], "errors": 0})
+            per_tool[tool]["latencies"].extend(lat)
+            all_lat.extend(lat)
+        for tool, n in w.errors.items():
+            per_tool.setdefault(tool, {"latencies": [], "errors": 0})
+            per_tool[tool]["errors"] += n
+            total_errors += n
+    ops = len(all_lat)
+    return {
+        "url": url,
+        "sessions": sessions,
+        "sessions_failed": sum(1 for w in workers if w.init_error),
+        "duration_s": elapsed,
+        "ops": ops,
+        "throughput_ops_s": ops / elapsed if elapsed > 0 else 0.0,
+        "error_rate": total_errors / ops if ops else 0.0,
+        "latency_ms": latency_summary(all_lat),
+        "tools": {
+            tool: {
+                "count": len(d["latencies"]),
+                "errors": d["errors"],
+                "latency_ms": latency_summary(d["latencies"]),
+            }
+            for tool, d in sorted(per_tool.items())
+        },
+        "rss": sampler.rss_summary(),
+    }
+
+
+def print_load_report(results: dict):
+    names = list(results)
+    rows = []
+
+    def row(label, fn):
+        rows.append([label] + [fn(results[n]) for n in names])
+
+    row("sessions (failed)", lambda r: f"{r['sessions']} ({r['sessions_failed']})")
+    row("ops", lambda r: r["ops"])
+    row("throughput ops/s", lambda r: r["throughput_ops_s"])
+    row("error rate %", lambda r: r["error_rate"] * 100.0)
+    for key in ("mean", "p50", "p90", "p99", "max"):
+        row(f"latency {key} ms", lambda r, k=key: r["latency_ms"].get(k))
+    for key in ("rss_start_mb", "rss_peak_mb", "rss_end_mb"):
+        row(key.replace("_", " "), lambda r, k=key: r["rss"].get(k))
+    print(format_table(["metric"] + names, rows))
+
+    tools = sorted({t for r in results.values() for t in r["tools"]})
+    trows = []
+    for tool in tools:
+        cells = [tool]
+        for n in names:
+            t = results[n]["tools"].get(tool)
+            if not t:
+                cells.append("-")
+                continue
+            lat = t["latency_ms"]
+            cells.append(
+                f"n={t['count']} err={t['errors']} "
+                f"p50={lat.get('p50', 0):.1f} p99={lat.get('p99', 0):.1f}"
+            )
+        trows.append(cells)
+    print()
+    print(format_table(["tool"] + names, trows))
+
+
+def load_main(args):
+    mix = parse_mix(args.mix)
+    results = {}
+    cs_proc = None
+    cs_pid = args.cs_pid
+    if args.cs_bin:
+        env = dict(os.environ, PORT=str(CS_PORT), HEADLESS="1")
+        cs_proc = subprocess.Popen(
+            [args.cs_bin, "--http"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        cs_pid = cs_proc.pid
+        time.sleep(args.startup_wait)
+    cs_url = f"http://localhost:{CS_PORT}/mcp"
+    try:
+        # Run servers one after another so they do not compete for CPU
+        try:
+            # Reachability probe; closed so its session and keep-alive
+            # connection do not linger into the measured run
+            probe = McpHttpSession(cs_url, timeout=5)
+            try:
+                probe.initialize()
+            finally:
+                probe.close()
+            print(f"C#: {args.sessions} sessions x {args.duration:g}s ...")
+            results["csharp"] = run_load(
+                cs_url, cs_pid, mix, args.sessions, args.duration, args.seed
+            )
+        except Exception as e:
+            print(f"Note: C# MCP server not reachable at {cs_url}: {e}")
+    finally:
+        if cs_proc:
+            stop_server(cs_proc)
+
+    if not args.skip_rust:
+        rust_proc = start_rust_server()
+        try:
+            print(f"Rust: {args.sessions} sessions x {args.duration:g}s ...")
+            results["rust"] = run_load(
+                f"http://localhost:{RUST_PORT}/",
+                rust_proc.pid,
+                mix,
+                args.sessions,
+                args.duration,
+                args.seed,
+            )
+        finally:
+            stop_server(rust_proc)
+
+    if not results:
+        raise SystemExit("No server reachable; nothing to compare")
+    print()
+    print_load_report(results)
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps({"mix": dict(mix), "results": results}, indent=2)
+        )
+        print(f"\nWrote {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the C# and Rust MCP servers (parity or load)"
+    )
+    parser.add_argument("--load", action="store_true", help="run comparative load test")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help="tool=weight list (default: %(default)s)"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cs-bin", help="launch this C# binary on port 3000")
+    parser.add_argument("--cs-pid", type=int, help="pid of a running C# server (RSS)")
+    parser.add_argument("--startup-wait", type=float, default=8.0)
+    parser.add_argument("--skip-rust", action="store_true")
+    parser.add_argument("--json", help="write raw results to this file")
+    args = parser.parse_args()
+
+    if args.load:
+        load_main(args)
+    else:
+        parity_check()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,731 @@
+#!/usr/bin/env python3
+"""
+Python stand-in for the overlay-companion MCP server (stdlib only)
+
+Implements the same tool names and JSON response shapes as the C# server
+(draw_overlay, batch_overlay, remove_overlay, re_anchor_element,
+take_screenshot, get_display_info, get_overlay_capabilities, clipboard,
+mode, screenshot frequency, event subscriptions, check_session_status)
+over stdio and Streamable HTTP, so drivers, SSE parsing and harness code
+can be benchmarked without dotnet and without server-side noise.
+
+Server behaviour is injected from configuration:
+
+- latency:   per-tool service time in ms ("default=2,take_screenshot=80"),
+             with --jitter fixed | uniform (+-50%) | exp (exponential mean)
+- errors:    per-tool error rate ("default=0,draw_overlay=0.01") and the
+             kind of failure: tool (isError result), rpc (JSON-RPC error)
+             or http (HTTP 500; rpc on stdio)
+- payload:   screenshot resolution and entropy (share of noise rows, which
+             sets how well the PNG compresses), plus display layout
+
+All of these can also come from a JSON file (--config) using the same
+keys, e.g. {"latency": {"default": 2, "take_screenshot": 80},
+"error_rate": {"draw_overlay": 0.01}, "screenshot": "3840x2160"}.
+
+Example:
+    python3 mock_mcp_server.py --http --port 3000 --latency default=1,take_screenshot=60
+    python3 mock_mcp_server.py --stdio --error-rate default=0.05 --error-kind rpc
+"""
+
+import argparse
+import base64
+import inspect
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+PROTOCOL_VERSION = "2025-03-26"
+SERVER_INFO = {"name": "overlay-companion-mcp-mock", "version": "0.1"}
+
+
+def _schema(props: Dict[str, str], required: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {k: {"type": t} for k, t in props.items()},
+        "required": list(required),
+    }
+
+
+TOOLS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "draw_overlay": (
+        "Draw an overlay box on the screen",
+        _schema(
+            {
+                "x": "integer",
+                "y": "integer",
+                "width": "integer",
+                "height": "integer",
+                "color": "string",
+                "opacity": "number",
+                "id": "string",
+                "monitor_index": "integer",
+            },
+            ("x", "y", "width", "height"),
+        ),
+    ),
+    "batch_overlay": (
+        "Draw multiple overlays at once",
+        _schema({"overlays": "string", "oneAtATime": "boolean"}, ("overlays",)),
+    ),
+    "remove_overlay": (
+        "Remove a specific overlay by ID",
+        _schema({"overlayId": "string"}, ("overlayId",)),
+    ),
+    "re_anchor_element": (
+        "Reposition an overlay element relative to a screen element or coordinate",
+        _schema(
+            {
+                "overlay_id": "string",
+                "x": "integer",
+                "y": "integer",
+                "anchor_mode": "string",
+                "monitor_index": "integer",
+            },
+            ("overlay_id", "x", "y"),
+        ),
+    ),
+    "take_screenshot": (
+        "Take a screenshot of the screen or a specific region",
+        _schema(
+            {"x": "integer", "y": "integer", "width": "integer", "height": "integer"}
+        ),
+    ),
+    "get_display_info": (
+        "Get information about all connected displays",
+        _schema({}),
+    ),
+    "get_overlay_capabilities": (
+        "Get overlay engine capabilities: opacity, color formats, click-through, compositor",
+        _schema({}),
+    ),
+    "set_mode": (
+        "Set the operational mode of the overlay companion",
+        _schema({"mode": "string", "metadata": "string"}),
+    ),
+    "set_screenshot_frequency": (
+        "Configure automatic screenshot capture frequency",
+        _schema({"mode": "string", "intervalMs": "integer"}, ("mode",)),
+    ),
+    "get_clipboard": (
+        "Get the current clipboard content",
+        _schema({"format": "string"}),
+    ),
+    "set_clipboard": (
+        "Set the clipboard content",
+        _schema({"text": "string", "format": "string"}, ("text",)),
+    ),
+    "subscribe_events": (
+        "Subscribe to UI events like mouse movements and clicks",
+        _schema({"events": "string"}, ("events",)),
+    ),
+    "unsubscribe_events": (
+        "Unsubscribe from UI events",
+        _schema({"subscriptionId": "string"}, ("subscriptionId",)),
+    ),
+    "check_session_status": (
+        "Check if the session has been stopped by the user",
+        _schema({}),
+    ),
+}
+
+
+def parse_tool_values(spec: str) -> Dict[str, float]:
+    """Parse "tool=value,tool=value" ("default" applies to unlisted tools)"""
+    out: Dict[str, float] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition("=")
+        if not value:
+            name, value = "default", name
+        out[name.strip()] = float(value)
+    return out
+
+
+def parse_displays(spec: str) -> List[Dict[str, Any]]:
+    displays, next_x = [], 0
+    for i, part in enumerate(p for p in spec.split(",") if p.strip()):
+        w, h = (int(v) for v in part.strip().lower().split("x"))
+        displays.append(
+            {
+                "index": i,
+                "name": f"MOCK-{i}",
+                "width": w,
+                "height": h,
+                "x": next_x,
+                "y": 0,
+                "is_primary": i == 0,
+                "scale": 1.0,
+                "refresh_rate": 60.0,
+            }
+        )
+        next_x += w
+    return displays
+
+
+def encode_png(width: int, height: int, entropy: float, seed: int) -> bytes:
+    """RGB PNG where `entropy` of the rows are noise and the rest flat grey"""
+    rng = random.Random(seed)
+    flat = b"\x00" + b"\x40\x40\x40" * width
+    rows = []
+    for _ in range(height):
+        if rng.random() < entropy:
+            rows.append(b"\x00" + rng.randbytes(width * 3))
+        else:
+            rows.append(flat)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(tag + data) & 0xFFFFFFFF
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    idat = zlib.compress(b"".join(rows), 6)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", ihdr)
+        + chunk(b"IDAT", idat)
+        + chunk(b"IEND", b"")
+    )
+
+
+class ToolError(Exception):
+    pass
+
+
+class MockServer:
+    """Transport-independent request handling and tool state"""
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.latency = cfg["latency"]
+        self.jitter = cfg["jitter"]
+        self.error_rate = cfg["error_rate"]
+        self.error_kind = cfg["error_kind"]
+        self.entropy = cfg["entropy"]
+        self.seed = cfg["seed"]
+        self.displays = parse_displays(cfg["displays"])
+        w, h = (int(v) for v in cfg["screenshot"].lower().split("x"))
+        self.screen = (w, h)
+        self.rng = random.Random(cfg["seed"])
+        self.lock = threading.Lock()
+        self.overlays: Dict[str, Dict[str, Any]] = {}
+        self.subscriptions: Dict[str, List[str]] = {}
+        self.clipboard = ""
+        self.mode = "passive"
+        self._png_cache: Dict[Tuple[int, int], str] = {}
+        self.calls = 0
+
+    # Injection
+
+    def _value(self, table: Dict[str, float], tool: str) -> float:
+        return table.get(tool, table.get("default", 0.0))
+
+    def _delay(self, tool: str):
+        mean = self._value(self.latency, tool)
+        if mean <= 0:
+            return
+        with self.lock:
+            if self.jitter == "exp":
+                ms = self.rng.expovariate(1.0 / mean)
+            elif self.jitter == "uniform":
+                ms = self.rng.uniform(0.5 * mean, 1.5 * mean)
+            else:
+                ms = mean
+        time.sleep(ms / 1000.0)
+
+    def _fails(self, tool: str) -> bool:
+        rate = self._value(self.error_rate, tool)
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def _png_b64(self, w: int, h: int) -> str:
+        key = (w, h)
+        if key not in self._png_cache:
+            png = encode_png(w, h, self.entropy, self.seed)
+            self._png_cache[key] = base64.b64encode(png).decode("ascii")
+        return self._png_cache[key]
+
+    # JSON-RPC
+
+    def handle(self, msg: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Returns (response or None for notifications, http_500)"""
+        if "id" not in msg:
+            return None, False
+        method = msg.get("method")
+        params = msg.get("params") or {}
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                    "capabilities": {"tools": {"listChanged": False}},
+                    "serverInfo": SERVER_INFO,
+                }
+            elif method == "tools/list":
+                result = {
+                    "tools": [
+                        {"name": n, "description": d, "inputSchema": s}
+                        for n, (d, s) in TOOLS.items()
+                    ]
+                }
+            elif method == "tools/call":
+                return self._call(msg["id"], params)
+            elif method == "ping":
+                result = {}
+            else:
+                return (
+                    _rpc_error(msg["id"], -32601, f"Method not found: {method}"),
+                    False,
+                )
+        except Exception as e:
+            return _rpc_error(msg["id"], -32603, str(e)), False
+        return {"jsonrpc": "2.0", "id": msg["id"], "result": result}, False
+
+    def _call(self, req_id: Any, params: Dict[str, Any]):
+        name = params.get("name")
+        args = params.get("arguments") or {}
+        if name not in TOOLS:
+            return _rpc_error(req_id, -32602, f"Unknown tool: '{name}'"), False
+        with self.lock:
+            self.calls += 1
+        self._delay(name)
+        if self._fails(name):
+            if self.error_kind == "tool":
+                return _tool_result(req_id, f"Injected failure in {name}", True), False
+            return (
+                _rpc_error(req_id, -32603, f"Injected failure in {name}"),
+                self.error_kind == "http",
+            )
+        try:
+            tool = getattr(self, "tool_" + name)
+            data = tool(**_known_args(tool, args))
+        except (ToolError, TypeError, ValueError, KeyError) as e:
+            return (
+                _tool_result(req_id, f"An error occurred invoking '{name}': {e}", True),
+                False,
+            )
+        return _tool_result(req_id, json.dumps(data), False), False
+
+    # Tools (shapes follow src/MCP/Tools/*.cs)
+
+    def _monitor(self, index: int) -> Dict[str, Any]:
+        if index < 0 or index >= len(self.displays):
+            raise ToolError(f"Monitor {index} not found")
+        return self.displays[index]
+
+    def tool_draw_overlay(
+        self,
+        x,
+        y,
+        width,
+        height,
+        color="#FF0000",
+        opacity=0.5,
+        id=None,
+        monitor_index=0,
+    ):
+        mon = self._monitor(monitor_index)
+        bounds = {
+            "x": mon["x"] + x,
+            "y": mon["y"] + y,
+            "width": width,
+            "height": height,
+        }
+        oid = id or str(uuid.uuid4())
+        with self.lock:
+            self.overlays[oid] = {"bounds": bounds, "monitor_index": monitor_index}
+        return {
+            "overlay_id": oid,
+            "bounds": bounds,
+            "color": color,
+            "opacity": opacity,
+            "monitor_index": monitor_index,
+            "monitor_name": mon["name"],
+            "monitor_bounds": {k: mon[k] for k in ("x", "y", "width", "height")},
+        }
+
+    def tool_batch_overlay(self, overlays, oneAtATime=False):
+        items = json.loads(overlays)
+        ids = []
+        for ov in items:
+            mon = self._monitor(int(ov.get("monitor_index", 0)))
+            oid = str(uuid.uuid4())
+            bounds = {
+                "x": mon["x"] + int(ov.get("x", 0)),
+                "y": mon["y"] + int(ov.get("y", 0)),
+                "width": int(ov.get("width", 50)),
+                "height": int(ov.get("height", 50)),
+            }
+            with self.lock:
+                self.overlays[oid] = {"bounds": bounds, "monitor_index": mon["index"]}
+            temp = int(ov.get("temporary_ms", 0) or 0)
+            if temp > 0:
+                timer = threading.Timer(temp / 1000.0, self._expire, (oid,))
+                timer.daemon = True
+                timer.start()
+            ids.append(oid)
+        return {"overlay_ids": ids, "count": len(ids), "one_at_a_time": oneAtATime}
+
+    def _expire(self, oid: str):
+        with self.lock:
+            self.overlays.pop(oid, None)
+
+    def tool_remove_overlay(self, overlayId):
+        with self.lock:
+            removed = self.overlays.pop(overlayId, None) is not None
+        return {"removed": removed, "not_found": not removed, "overlay_id": overlayId}
+
+    def tool_re_anchor_element(
+        self, overlay_id, x, y, anchor_mode="absolute", monitor_index=0
+    ):
+        mon = self._monitor(monitor_index)
+        with self.lock:
+            ov = self.overlays.get(overlay_id)
+            if ov is None:
+                raise ToolError(f"Overlay {overlay_id} not found")
+            b = ov["bounds"]
+            old = {"x": b["x"], "y": b["y"]}
+            if anchor_mode == "relative":
+                b["x"], b["y"] = b["x"] + x, b["y"] + y
+            else:
+                b["x"], b["y"] = mon["x"] + x, mon["y"] + y
+            bounds = dict(b)
+        return {
+            "overlay_id": overlay_id,
+            "anchor_mode": anchor_mode,
+            "old_position": old,
+            "new_position": {"x": bounds["x"], "y": bounds["y"]},
+            "bounds": bounds,
+            "monitor_index": monitor_index,
+            "monitor_name": mon["name"],
+            "monitor_bounds": {k: mon[k] for k in ("x", "y", "width", "height")},
+        }
+
+    def tool_take_screenshot(self, x=None, y=None, width=None, height=None):
+        region = None
+        w, h = self.screen
+        if None not in (x, y, width, height):
+            region = {"x": x, "y": y, "width": width, "height": height}
+            w, h = max(1, width), max(1, height)
+        return {
+            "image_base64": self._png_b64(w, h),
+            "width": w,
+            "height": h,
+            "region": region,
+            "monitor_index": 0,
+            "display_scale": 1.0,
+            "viewport_scroll": {"x": 0, "y": 0},
+        }
+
+    def tool_get_display_info(self):
+        ds = self.displays
+        return {
+            "displays": ds,
+            "primary_display": ds[0] if ds else None,
+            "total_displays": len(ds),
+            "virtual_screen": {
+                "width": max(d["x"] + d["width"] for d in ds),
+                "height": max(d["y"] + d["height"] for d in ds),
+                "min_x": min(d["x"] for d in ds),
+                "min_y": min(d["y"] for d in ds),
+            },
+            "kasmvnc_integration": {
+                "connected": False,
+                "session_status": None,
+                "multi_monitor_support": False,
+                "overlay_support": False,
+            },
+        }
+
+    def tool_get_overlay_capabilities(self):
+        return {
+            "compositor": "mock",
+            "supports_click_through": True,
+            "supports_opacity": True,
+            "opacity_range": {"min": 0.0, "max": 1.0, "default_value": 0.5},
+            "color_formats": [
+                "#RRGGBB",
+                "#RRGGBBAA",
+                "#RGB",
+                "0xRRGGBB",
+                "named (fallback)",
+            ],
+        }
+
+    def tool_set_mode(self, mode="passive", metadata=None):
+        with self.lock:
+            previous, self.mode = self.mode, mode.lower()
+        return {
+            "ok": True,
+            "active_mode": self.mode,
+            "previous_mode": previous,
+            "metadata_applied": metadata is not None,
+        }
+
+    def tool_set_screenshot_frequency(self, mode, intervalMs=1000):
+        return {
+            "ok": True,
+            "mode": mode.lower(),
+            "applied_interval_ms": intervalMs,
+            "service_configured": True,
+        }
+
+    def tool_get_clipboard(self, format="text"):
+        return {
+            "text": self.clipboard,
+            "available": bool(self.clipboard),
+            "format": format,
+            "source": "mock",
+            "vm_bridge_available": False,
+        }
+
+    def tool_set_clipboard(self, text, format="text"):
+        self.clipboard = text
+        return {
+            "ok": True,
+            "text_length": len(text),
+            "format": format,
+            "confirmation_required": False,
+            "confirmed": True,
+            "source": "mock",
+            "vm_bridge_available": False,
+        }
+
+    def tool_subscribe_events(self, events):
+        sid = str(uuid.uuid4())
+        with self.lock:
+            self.subscriptions[sid] = list(json.loads(events))
+            total = len(self.subscriptions)
+        return {
+            "subscription_id": sid,
+            "subscribed": self.subscriptions[sid],
+            "monitoring_active": True,
+            "total_subscriptions": total,
+        }
+
+    def tool_unsubscribe_events(self, subscriptionId):
+        with self.lock:
+            ok = self.subscriptions.pop(subscriptionId, None) is not None
+            remaining = len(self.subscriptions)
+        return {
+            "ok": ok,
+            "subscription_id": subscriptionId,
+            "remaining_subscriptions": remaining,
+            "monitoring_active": remaining > 0,
+        }
+
+    def tool_check_session_status(self):
+        return {
+            "session_stopped": False,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": "Session is active and AI operations are permitted.",
+            "status": "active",
+        }
+
+
+def _rpc_error(req_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
+
+
+def _known_args(tool, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop arguments the tool does not declare, as the C# server does"""
+    params = inspect.signature(tool).parameters
+    return {k: v for k, v in args.items() if k in params}
+
+
+def _tool_result(req_id: Any, text: str, is_error: bool) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "result": {"content": [{"type": "text", "text": text}], "isError": is_error},
+    }
+
+
+# Transports
+
+
+def serve_stdio(server: MockServer):
+    """Newline-delimited JSON-RPC; requests run concurrently like the C# host"""
+    out_lock = threading.Lock()
+
+    def respond(msg):
+        resp, _ = server.handle(msg)
+        if resp is not None:
+            line = json.dumps(resp) + "\n"
+            with out_lock:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            continue
+        threading.Thread(target=respond, args=(msg,), daemon=True).start()
+
+
+def make_handler(server: MockServer):
+    sessions: Dict[str, float] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _send(self, status: int, body: bytes, ctype: str, extra=None):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (extra or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/health":
+                with server.lock:
+                    active, calls = len(server.overlays), server.calls
+                body = {
+                    "status": "healthy",
+                    "services": {"websocket_clients": 0, "active_overlays": active},
+                    "sessions": len(sessions),
+                    "calls": calls,
+                }
+                self._send(200, json.dumps(body).encode(), "application/json")
+            else:
+                self._send(405, b"", "text/plain")
+
+        def do_DELETE(self):
+            sessions.pop(self.headers.get("Mcp-Session-Id", ""), None)
+            self._send(200, b"", "text/plain")
+
+        def do_POST(self):
+            t0 = time.perf_counter()
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                self._send(400, b"invalid JSON", "text/plain")
+                return
+            resp, http_500 = server.handle(msg)
+            if resp is None:
+                self._send(202, b"", "text/plain")
+                return
+            headers = {}
+            sid = self.headers.get("Mcp-Session-Id")
+            if msg.get("method") == "initialize":
+                sid = uuid.uuid4().hex
+                sessions[sid] = time.time()
+            if sid:
+                headers["Mcp-Session-Id"] = sid
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            headers["Server-Timing"] = f"app;dur={elapsed_ms:.3f}"
+            if http_500:
+                self._send(500, json.dumps(resp).encode(), "application/json", headers)
+            elif "text/event-stream" in self.headers.get("Accept", ""):
+                body = f"event: message\ndata: {json.dumps(resp)}\n\n".encode()
+                self._send(200, body, "text/event-stream", headers)
+            else:
+                self._send(200, json.dumps(resp).encode(), "application/json", headers)
+
+    return Handler
+
+
+def serve_http(server: MockServer, host: str, port: int):
+    httpd = ThreadingHTTPServer((host, port), make_handler(server))
+    httpd.daemon_threads = True
+    print(
+        f"mock MCP server listening on http://{host}:{port}/mcp",
+        file=sys.stderr,
+        flush=True,
+    )
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+DEFAULTS = {
+    "latency": "default=0",
+    "jitter": "fixed",
+    "error_rate": "default=0",
+    "error_kind": "tool",
+    "screenshot": "1920x1080",
+    "entropy": 0.25,
+    "displays": "1920x1080",
+    "seed": 1,
+}
+
+
+def load_config(args) -> Dict[str, Any]:
+    cfg = dict(DEFAULTS)
+    if args.config:
+        with open(args.config) as f:
+            cfg.update(json.load(f))
+    for key in DEFAULTS:
+        value = getattr(args, key)
+        if value is not None:
+            cfg[key] = value
+    for key in ("latency", "error_rate"):
+        if isinstance(cfg[key], str):
+            cfg[key] = parse_tool_values(cfg[key])
+        elif not isinstance(cfg[key], dict):
+            cfg[key] = {"default": float(cfg[key])}
+    if cfg["jitter"] not in ("fixed", "uniform", "exp"):
+        raise SystemExit(f"unknown jitter {cfg['jitter']!r}")
+    if cfg["error_kind"] not in ("tool", "rpc", "http"):
+        raise SystemExit(f"unknown error kind {cfg['error_kind']!r}")
+    return cfg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock overlay-companion MCP server")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stdio", action="store_true")
+    mode.add_argument("--http", action="store_true", help="default")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--config", help="JSON file with any of the options below")
+    parser.add_argument(
+        "--latency", help="tool=ms list, e.g. default=2,take_screenshot=80"
+    )
+    parser.add_argument("--jitter", choices=["fixed", "uniform", "exp"])
+    parser.add_argument("--error-rate", dest="error_rate", help="tool=probability list")
+    parser.add_argument(
+        "--error-kind", dest="error_kind", choices=["tool", "rpc", "http"]
+    )
+    parser.add_argument("--screenshot", help="full-screen capture size, WxH")
+    parser.add_argument("--entropy", type=float, help="share of noise rows in PNGs")
+    parser.add_argument("--displays", help="display layout, e.g. 1920x1080,2560x1440")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MockServer(load_config(args))
+    if args.stdio:
+        serve_stdio(server)
+    else:
+        serve_http(server, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Multi-agent overlay churn load generator
+
+Opens many MCP sessions against one HTTP server. Each session models an agent
+issuing a weighted mix of draw_overlay, batch_overlay, re_anchor_element and
+remove_overlay calls on an open-loop arrival schedule:
+
+- poisson: every session gets rate/sessions ops/s with exponential gaps
+- zipf:    session k gets a share of the total rate proportional to 1/k^s,
+           so a few hot agents dominate (closer to real multi-agent traffic)
+
+Latency is reported both as service time (request on the wire) and response
+time from the scheduled arrival (includes queueing when a session falls
+behind), so saturation is visible instead of hidden by coordinated omission.
+The server's /health endpoint is polled for active overlay and WebSocket
+client counts.
+
+Example:
+    python3 overlay_churn_load.py --url http://localhost:3000/mcp \\
+        --sessions 64 --rate 400 --arrival zipf --duration 60 \\
+        --lifetimes 0=1,500=2,2000=4,10000=1 --pid $(pgrep overlay-companion)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from perf_common import (
+    McpHttpSession,
+    ProcSampler,
+    format_table,
+    is_error,
+    latency_summary,
+    tool_json,
+)
+
+DEFAULT_MIX = "draw_overlay=4,batch_overlay=1,re_anchor_element=3,remove_overlay=2"
+DEFAULT_LIFETIMES = "0=1,500=2,2000=4,10000=1"
+COLORS = ["#FF0000", "#00FF00", "#0000FF", "#FFAA00", "#FF00FF", "#00FFFF"]
+
+
+def parse_weights(spec: str, cast=str) -> list:
+    """Parse "key=weight,key=weight" into [(cast(key), weight)]"""
+    out = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            key, _, weight = part.partition("=")
+            out.append((cast(key.strip()), float(weight or 1)))
+    if not out:
+        raise ValueError(f"empty weight list: {spec!r}")
+    return out
+
+
+def session_rates(total_rate: float, sessions: int, arrival: str, zipf_s: float):
+    if arrival == "poisson":
+        return [total_rate / sessions] * sessions
+    weights = [1.0 / (k**zipf_s) for k in range(1, sessions + 1)]
+    norm = sum(weights)
+    return [total_rate * w / norm for w in weights]
+
+
+class Stats:
+    """Thread-safe aggregation shared by all agents"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.service_ms = {}
+        self.response_ms = {}
+        self.errors = {}
+        self.completions = []  # monotonic completion timestamps
+        self.overlays_drawn = 0
+
+    def record(self, op, scheduled, t0, t1, failed, drawn=0):
+        with self.lock:
+            self.service_ms.setdefault(op, []).append((t1 - t0) * 1000.0)
+            self.response_ms.setdefault(op, []).append((t1 - scheduled) * 1000.0)
+            self.completions.append(t1)
+            self.overlays_drawn += drawn
+            if failed:
+                self.errors[op] = self.errors.get(op, 0) + 1
+
+
+class Agent(threading.Thread):
+    def __init__(self, idx, url, rate, mix, lifetimes, start, deadline, seed, stats):
+        super().__init__(daemon=True)
+        self.idx = idx
+        self.url = url
+        self.rate = rate
+        self.mix = mix
+        self.lifetimes = lifetimes
+        self.start_at = start
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.stats = stats
+        self.live = {}  # overlay_id -> client-side expiry (monotonic, inf=permanent)
+        self.init_error = None
+
+    def _prune(self, now):
+        for oid in [o for o, exp in self.live.items() if exp <= now]:
+            del self.live[oid]
+
+    def _lifetime_ms(self):
+        values, weights = zip(*self.lifetimes)
+        return int(self.rng.choices(values, weights)[0])
+
+    def _rect(self):
+        w, h = self.rng.randint(40, 320), self.rng.randint(30, 200)
+        return {
+            "x": self.rng.randint(0, 1920 - w),
+            "y": self.rng.randint(0, 1080 - h),
+            "width": w,
+            "height": h,
+        }
+
+    def _call(self, client, op, now):
+        """Issue one op; returns (response, overlays drawn, new live ids)"""
+        if op == "draw_overlay":
+            # C# draw_overlay makes opacity < 1.0 overlays temporary (5s)
+            opacity = self.rng.choice([0.5, 1.0])
+            args = {**self._rect(), "color": self.rng.choice(COLORS)}
+            args["opacity"] = opacity
+            resp = client.call_tool(op, args)
+            oid = tool_json(resp).get("overlay_id")
+            ttl = 5.0 if opacity < 1.0 else float("inf")
+            return resp, 1, ({oid: now + ttl} if oid else {})
+        if op == "batch_overlay":
+            items = []
+            for _ in range(self.rng.randint(2, 8)):
+                item = {**self._rect(), "color": self.rng.choice(COLORS)}
+                item["temporary_ms"] = self._lifetime_ms()
+                items.append(item)
+            resp = client.call_tool(op, {"overlays": json.dumps(items)})
+            ids = tool_json(resp).get("overlay_ids") or []
+            live = {}
+            for oid, item in zip(ids, items):
+                ms = item["temporary_ms"]
+                live[oid] = now + ms / 1000.0 if ms > 0 else float("inf")
+            return resp, len(items), live
+        if op == "re_anchor_element":
+            oid = self.rng.choice(list(self.live))
+            args = {
+                "overlay_id": oid,
+                "x": self.rng.randint(-40, 40),
+                "y": self.rng.randint(-40, 40),
+                "anchor_mode": "relative",
+            }
+            return client.call_tool(op, args), 0, {}
+        if op == "remove_overlay":
+            oid = self.rng.choice(list(self.live))
+            self.live.pop(oid, None)
+            return client.call_tool(op, {"overlayId": oid}), 0, {}
+        raise ValueError(f"unsupported op {op}")
+
+    def run(self):
+        client = McpHttpSession(self.url, client_name=f"churn-{self.idx}")
+        try:
+            client.initialize()
+        except Exception as e:
+            self.init_error = str(e)
+            return
+        ops, weights = zip(*self.mix)
+        next_at = self.start_at + self.rng.expovariate(self.rate)
+        try:
+            while next_at < self.deadline:
+                now = time.monotonic()
+                if next_at > now:
+                    time.sleep(next_at - now)
+                scheduled = next_at
+                next_at += self.rng.expovariate(self.rate)
+
+                now = time.monotonic()
+                self._prune(now)
+                op = self.rng.choices(ops, weights)[0]
+                if op in ("re_anchor_element", "remove_overlay") and not self.live:
+                    op = "draw_overlay"
+                t0 = time.monotonic()
+                try:
+                    resp, drawn, live = self._call(client, op, t0)
+                    failed = is_error(resp)
+                except Exception:
+                    failed, drawn, live = True, 0, {}
+                t1 = time.monotonic()
+                self.live.update(live)
+                self.stats.record(op, scheduled, t0, t1, failed, drawn)
+        finally:
+            client.close()
+
+
+class HealthPoller(threading.Thread):
+    """Samples active_overlays / websocket_clients from the server's /health"""
+
+    def __init__(self, health_url, interval=1.0):
+        super().__init__(daemon=True)
+        self.health_url = health_url
+        self.interval = interval
+        self.samples = []
+        self._halt = threading.Event()
+
+    def run(self):
+        t0 = time.monotonic()
+        http = requests.Session()
+        while not self._halt.is_set():
+            try:
+                svc = http.get(self.health_url, timeout=2).json().get("services", {})
+                self.samples.append(
+                    {
+                        "t": time.monotonic() - t0,
+                        "active_overlays": svc.get("active_overlays"),
+                        "websocket_clients": svc.get("websocket_clients"),
+                    }
+                )
+            except (requests.RequestException, ValueError):
+                pass
+            self._halt.wait(self.interval)
+
+    def stop(self):
+        self._halt.set()
+        self.join(timeout=self.interval * 3)
+        return self.samples
+
+
+def health_url_for(mcp_url: str) -> str:
+    parts = urlsplit(mcp_url)
+    return urlunsplit((parts.scheme, parts.netloc, "/health", "", ""))
+
+
+def throughput_series(completions, start, bucket=1.0):
+    if not completions:
+        return []
+    n = int((max(completions) - start) // bucket) + 1
+    counts = [0] * n
+    for t in completions:
+        counts[max(0, int((t - start) // bucket))] += 1
+    return [c / bucket for c in counts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-agent overlay churn load")
+    parser.add_argument("--url", default="http://localhost:3000/mcp")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=200.0, help="total ops/s")
+    parser.add_argument("--arrival", choices=["poisson", "zipf"], default="poisson")
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0, help="excluded seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument(
+        "--lifetimes",
+        default=DEFAULT_LIFETIMES,
+        help="temporary_ms=weight list for batch_overlay (0 = permanent)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--pid", type=int, help="server pid for RSS/thread sampling")
+    parser.add_argument("--json", help="write full results to this file")
+    args = parser.parse_args()
+
+    mix = parse_weights(args.mix)
+    lifetimes = parse_weights(args.lifetimes, cast=int)
+    rates = session_rates(args.rate, args.sessions, args.arrival, args.zipf_s)
+
+    stats = Stats()
+    poller = HealthPoller(health_url_for(args.url))
+    sampler = ProcSampler(args.pid, interval=1.0)
+    start = time.monotonic() + 1.0  # let all sessions initialize first
+    deadline = start + args.duration
+    agents = [
+        Agent(i, args.url, rate, mix, lifetimes, start, deadline, args.seed + i, stats)
+        for i, rate in enumerate(rates)
+    ]
+    poller.start()
+    sampler.start()
+    for a in agents:
+        a.start()
+    for a in agents:
+        a.join()
+    health = poller.stop()
+    proc = sampler.stop()
+
+    series = throughput_series(stats.completions, start)
+    steady = series[int(args.warmup) :] or series
+    total_ops = sum(len(v) for v in stats.service_ms.values())
+    total_errors = sum(stats.errors.values())
+    active = [s["active_overlays"] for s in health if s["active_overlays"] is not None]
+
+    result = {
+        "config": vars(args),
+        "sessions_failed": sum(1 for a in agents if a.init_error),
+        "offered_ops_s": args.rate,
+        "sustained_ops_s": sum(steady) / len(steady) if steady else 0.0,
+        "ops": total_ops,
+        "overlays_drawn": stats.overlays_drawn,
+        "error_rate": total_errors / total_ops if total_ops else 0.0,
+        "service_ms": latency_summary(
+            v for lat in stats.service_ms.values() for v in lat
+        ),
+        "response_ms": latency_summary(
+            v for lat in stats.response_ms.values() for v in lat
+        ),
+        "ops_detail": {
+            op: {
+                "count": len(stats.service_ms[op]),
+                "errors": stats.errors.get(op, 0),
+                "service_ms": latency_summary(stats.service_ms[op]),
+                "response_ms": latency_summary(stats.response_ms[op]),
+            }
+            for op in sorted(stats.service_ms)
+        },
+        "active_overlays_peak": max(active) if active else None,
+        "throughput_series": series,
+        "health_series": health,
+        "proc_series": proc,
+    }
+
+    print(
+        f"offered {args.rate:g} ops/s ({args.arrival}) over {args.sessions} sessions, "
+        f"sustained {result['sustained_ops_s']:.1f} ops/s, "
+        f"errors {result['error_rate'] * 100:.2f}%, "
+        f"peak active overlays {result['active_overlays_peak']}"
+    )
+    rows = []
+    for op, d in result["ops_detail"].items():
+        s, r = d["service_ms"], d["response_ms"]
+        rows.append(
+            [op, d["count"], d["errors"], s.get("p50"), s.get("p99"), r.get("p50")]
+            + [r.get("p99"), r.get("max")]
+        )
+    print(
+        format_table(
+            ["op", "count", "errors", "svc p50", "svc p99", "resp p50", "resp p99"]
+            + ["resp max"],
+            rows,
+        )
+    )
+    if proc:
+        first, last = proc[0], proc[-1]
+        print(
+            f"server rss {first['rss_kb'] / 1024:.1f} -> "
+            f"{last['rss_kb'] / 1024:.1f} MiB, "
+            f"threads {first['threads']} -> {last['threads']}"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
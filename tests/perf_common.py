@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the MCP load and benchmark scripts under tests/
+
+- McpHttpSession: persistent Streamable HTTP client (one MCP session per instance)
+- McpStdioSession: persistent newline-delimited JSON-RPC client over a child's stdio
+- wait_for_http: poll a server until initialize succeeds
+- latency_summary: percentile summary of a list of latencies in milliseconds
+- proc_stats / ProcSampler: RSS, thread, fd and child-process sampling from /proc
+- format_table: plain-text side-by-side tables for terminal reports
+"""
+
+import json
+import math
+import os
+import queue
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+PROTOCOL_VERSION = "2025-03-26"
+
+
+class McpSessionBase:
+    """
+    Transport-independent MCP calls on top of request()/notify().
+
+    After every request, last_raw holds the raw JSON text of the response
+    message so callers can measure payload size and client decode cost.
+    HTTP sessions also keep the response headers (lower-case names) in
+    last_headers, e.g. for Server-Timing.
+    """
+
+    client_name = "perf"
+    last_raw: Optional[str] = None
+    last_headers: Dict[str, str] = {}
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        raise NotImplementedError
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        raise NotImplementedError
+
+    def initialize(self) -> dict:
+        resp = self.request(
+            "initialize",
+            {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": self.client_name, "version": "0.1"},
+            },
+        )
+        self.notify("notifications/initialized")
+        return resp
+
+    def list_tools(self) -> dict:
+        return self.request("tools/list")
+
+    def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> dict:
+        return self.request("tools/call", {"name": name, "arguments": arguments or {}})
+
+
+class McpHttpSession(McpSessionBase):
+    """
+    Minimal Streamable HTTP MCP client that keeps one session open.
+
+    Unlike the probe scripts, this reuses a single requests.Session and the
+    Mcp-Session-Id header across calls so it can be used for load generation.
+    Not thread-safe: use one instance per worker thread.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0, client_name: str = "perf"):
+        self.url = url
+        self.timeout = timeout
+        self.client_name = client_name
+        self.session_id: Optional[str] = None
+        self._http = requests.Session()
+        self._next_id = 0
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/event-stream",
+            "MCP-Protocol-Version": PROTOCOL_VERSION,
+        }
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        return headers
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        """Send a JSON-RPC request and return the matching response object"""
+        self._next_id += 1
+        req_id = self._next_id
+        payload = {
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "method": method,
+            "params": params or {},
+        }
+        with self._http.post(
+            self.url,
+            json=payload,
+            headers=self._headers(),
+            timeout=self.timeout,
+            stream=True,
+        ) as r:
+            self.last_headers = {k.lower(): v for k, v in r.headers.items()}
+            r.raise_for_status()
+            sid = r.headers.get("Mcp-Session-Id")
+            if sid:
+                self.session_id = sid
+            ctype = r.headers.get("Content-Type", "")
+            if ctype.startswith("application/json"):
+                self.last_raw = r.text
+            else:
+                # Default 512-byte chunks make long data: lines (screenshots)
+                # quadratic to reassemble
+                lines = r.iter_lines(chunk_size=1 << 16, decode_unicode=True)
+                self.last_raw = _read_sse_frame(lines, req_id)
+            return json.loads(self.last_raw)
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a JSON-RPC notification (no response body expected)"""
+        payload = {"jsonrpc": "2.0", "method": method}
+        if params:
+            payload["params"] = params
+        try:
+            self._http.post(
+                self.url, json=payload, headers=self._headers(), timeout=self.timeout
+            )
+        except requests.RequestException:
+            pass
+
+    def close(self):
+        """Terminate the server-side session (best effort) and the HTTP pool"""
+        if self.session_id:
+            try:
+                self._http.delete(self.url, headers=self._headers(), timeout=2)
+            except requests.RequestException:
+                pass
+        self._http.close()
+
+
+def _read_sse_frame(lines: Iterable[str], req_id: int) -> str:
+    # Server may interleave notifications; return the frame answering req_id
+    data_lines: List[str] = []
+    for line in lines:
+        if line is None:
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[len("data:") :].strip())
+            continue
+        if line == "" and data_lines:
+            raw = "".join(data_lines)
+            data_lines = []
+            if json.loads(raw).get("id") == req_id:
+                return raw
+    if data_lines:
+        return "".join(data_lines)
+    raise RuntimeError("No data frame received from streamable HTTP response")
+
+
+class McpStdioSession(McpSessionBase):
+    """
+    Persistent stdio MCP client for a server started as a child process.
+
+    The .NET server prints log and warning lines on stdout next to the
+    protocol, so anything that is not a JSON object is skipped.
+    """
+
+    def __init__(
+        self,
+        cmd: List[str],
+        env: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        client_name: str = "perf",
+    ):
+        self.timeout = timeout
+        self.client_name = client_name
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            bufsize=0,
+        )
+        self._lines: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._next_id = 0
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _read_loop(self):
+        for line in iter(self.proc.stdout.readline, b""):
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _send(self, payload: dict):
+        self.proc.stdin.write(json.dumps(payload).encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> dict:
+        self._next_id += 1
+        req_id = self._next_id
+        self._send(
+            {"jsonrpc": "2.0", "id": req_id, "method": method, "params": params or {}}
+        )
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no response to {method} within {self.timeout}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                raise RuntimeError(f"server exited (code {self.proc.poll()})")
+            text = line.decode("utf-8", errors="replace").strip()
+            if not text.startswith("{"):
+                continue
+            try:
+                msg = json.loads(text)
+            except ValueError:
+                continue
+            if msg.get("id") == req_id:
+                self.last_raw = text
+                return msg
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        payload = {"jsonrpc": "2.0", "method": method}
+        if params:
+            payload["params"] = params
+        self._send(payload)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def wait_for_http(url: str, timeout: float = 30.0, interval: float = 0.05) -> float:
+    """Poll until initialize succeeds; returns seconds waited"""
+    t0 = time.monotonic()
+    while True:
+        client = McpHttpSession(url, timeout=2.0)
+        try:
+            client.initialize()
+            return time.monotonic() - t0
+        except (requests.RequestException, RuntimeError, ValueError):
+            if time.monotonic() - t0 > timeout:
+                raise TimeoutError(f"{url} not ready after {timeout}s")
+            time.sleep(interval)
+        finally:
+            client.close()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def tool_text(resp: dict) -> Optional[str]:
+    """First text content block of a tools/call response"""
+    content = (resp or {}).get("result", {}).get("content") or []
+    if content and content[0].get("type") == "text":
+        return content[0].get("text")
+    return None
+
+
+def tool_json(resp: dict) -> dict:
+    """Parse the first text block of a tools/call response as JSON ({} if not JSON)"""
+    txt = tool_text(resp)
+    if not txt:
+        return {}
+    try:
+        data = json.loads(txt)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def is_error(resp: dict) -> bool:
+    if not isinstance(resp, dict) or resp.get("error") is not None:
+        return True
+    return bool((resp.get("result") or {}).get("isError"))
+
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_samples:
+        return float("nan")
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def latency_summary(
+    samples_ms: Iterable[float], points: Sequence[float] = (50, 90, 95, 99)
+) -> Dict[str, float]:
+    s = sorted(samples_ms)
+    out: Dict[str, float] = {"count": len(s)}
+    if not s:
+        return out
+    out["mean"] = sum(s) / len(s)
+    out["min"] = s[0]
+    for p in points:
+        out[f"p{p:g}"] = percentile(s, p)
+    out["max"] = s[-1]
+    return out
+
+
+def proc_stats(pid: int) -> Optional[Dict[str, int]]:
+    """RSS (KiB), thread count, open fds and direct children of a process, from /proc"""
+    base = Path("/proc") / str(pid)
+    try:
+        status = (base / "status").read_text()
+    except OSError:
+        return None
+    stats = {"rss_kb": 0, "threads": 0, "fds": 0, "children": 0}
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            stats["rss_kb"] = int(line.split()[1])
+        elif line.startswith("Threads:"):
+            stats["threads"] = int(line.split()[1])
+    try:
+        stats["fds"] = len(os.listdir(base / "fd"))
+    except OSError:
+        pass
+    children = 0
+    try:
+        for tid in os.listdir(base / "task"):
+            try:
+                children += len((base / "task" / tid / "children").read_text().split())
+            except OSError:
+                continue
+    except OSError:
+        pass
+    stats["children"] = children
+    return stats
+
+
+class ProcSampler(threading.Thread):
+    """Background sampler of proc_stats(pid) at a fixed interval"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._halt = threading.Event()
+        self._t0 = time.monotonic()
+
+    def run(self):
+        if not self.pid:
+            return
+        while not self._halt.is_set():
+            st = proc_stats(self.pid)
+            if st is None:
+                break
+            self.samples.append({"t": time.monotonic() - self._t0, **st})
+            self._halt.wait(self.interval)
+
+    def stop(self) -> List[Dict[str, float]]:
+        self._halt.set()
+        if self.is_alive():
+            self.join(timeout=self.interval * 4)
+        return self.samples
+
+    def rss_summary(self) -> Dict[str, float]:
+        rss = [s["rss_kb"] / 1024.0 for s in self.samples]
+        if not rss:
+            return {}
+        return {
+            "rss_start_mb": rss[0],
+            "rss_end_mb": rss[-1],
+            "rss_peak_mb": max(rss),
+            "rss_mean_mb": sum(rss) / len(rss),
+        }
+
+
+def fmt_num(v: Any, digits: int = 1) -> str:
+    if v is None:
+        return "n/a"
+    if isinstance(v, float):
+        if math.isnan(v):
+            return "n/a"
+        return f"{v:.{digits}f}"
+    return str(v)
+
+
+def format_table(header: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    cells = [list(header)] + [[fmt_num(c) for c in row] for row in rows]
+    widths = [max(len(str(r[i])) for r in cells) for i in range(len(header))]
+    lines = []
+    for n, row in enumerate(cells):
+        line = "  ".join(str(c).ljust(widths[i]) for i, c in enumerate(row))
+        lines.append(line.rstrip())
+        if n == 0:
+            lines.append("  ".join("-" * w for w in widths))
+    return "\n".join(lines)
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC traffic recorder and time-accurate replayer
+
+Record real agent sessions, then play them back against another server
+build to compare latency under the same, production-shaped traffic.
+
+Recording (both proxies are transparent to the client):
+
+    # stdio: use this as the server command in the MCP client config
+    python3 rpc_trace.py record-stdio --out agent.trace.gz -- \\
+        ./build/publish/overlay-companion-mcp --stdio
+
+    # HTTP: point the client at :3100 instead of :3000
+    python3 rpc_trace.py record-http --listen 3100 \\
+        --target http://127.0.0.1:3000 --out agent.trace.gz
+
+Trace format: gzip'd JSON lines. The first line is a header
+({"trace": 1, "transport": ..., "started": ...}); every other line is one
+message: {"t": ms since start, "d": ">" client->server | "<" server->client,
+"s": session key, "m": message}. HTTP sessions are keyed by Mcp-Session-Id
+(initialize requests by connection until the server assigns one). Long
+strings in server responses (screenshots) are replaced by their length
+unless --full is given; client requests are always kept verbatim.
+
+Replay:
+
+    python3 rpc_trace.py replay agent.trace.gz --url http://127.0.0.1:3000/mcp
+    python3 rpc_trace.py replay agent.trace.gz --scale 0.25 --cmd "./oc --stdio"
+    python3 rpc_trace.py replay agent.trace.gz --max --copies 16 --url ...
+
+- original timing (default): each session starts at its recorded offset
+  and each client message is sent at its recorded time
+- scaled timing (--scale F): all recorded gaps multiplied by F
+- max speed (--max): no waits, --copies N parallel copies of every session
+
+Within a session, requests are sent one at a time like an agent waiting
+on each result; if the server is slower than in the recording, later
+sends slip and the slip is reported as schedule lag. The report compares
+replayed latency with the recorded latency per method/tool.
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from perf_common import (
+    McpHttpSession,
+    McpStdioSession,
+    fmt_num,
+    format_table,
+    latency_summary,
+)
+
+# Server->client strings longer than this are elided unless --full; replay
+# only needs ids and timing, and screenshots would dominate the trace
+ELIDE_OVER = 512
+
+
+def _elide(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > ELIDE_OVER:
+        return {"$elided": len(value)}
+    if isinstance(value, dict):
+        return {k: _elide(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_elide(v) for v in value]
+    return value
+
+
+def _wait_for_stop(done: threading.Event):
+    """
+    Block until done is set or SIGTERM/SIGINT arrives. Clients stop stdio
+    servers by closing stdin and signalling right away; the handler only
+    sets the event, so the caller's cleanup (which writes the gzip
+    trailer) can never be cut short by an exception.
+    """
+
+    def stop(*_):
+        done.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while not done.wait(0.5):
+        pass
+
+
+class TraceWriter:
+    def __init__(self, path: Path, transport: str, full: bool = False, **meta):
+        self.full = full
+        self._f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        header = {
+            "trace": 1,
+            "transport": transport,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **meta,
+        }
+        self._f.write(json.dumps(header) + "\n")
+        self._count = 0
+
+    def write(self, direction: str, session: str, msg: Any):
+        # Batches are recorded as their individual messages
+        items = msg if isinstance(msg, list) else [msg]
+        if direction == "<" and not self.full:
+            items = [_elide(m) for m in items]
+        t = round((time.perf_counter() - self._t0) * 1000.0, 3)
+        with self._lock:
+            for m in items:
+                rec = {"t": t, "d": direction, "s": session, "m": m}
+                self._f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            self._count += len(items)
+            if self._count % 64 == 0:
+                self._f.flush()
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+def _parse_line(line: bytes) -> Optional[Any]:
+    text = line.decode("utf-8", errors="replace").strip()
+    if not text.startswith(("{", "[")):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+# Recording: stdio
+
+
+def record_stdio(args) -> int:
+    writer = TraceWriter(Path(args.out), "stdio", args.full, command=args.command)
+    proc = subprocess.Popen(args.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    done = threading.Event()
+
+    def pump_in():
+        try:
+            for line in iter(sys.stdin.buffer.readline, b""):
+                msg = _parse_line(line)
+                if msg is not None:
+                    writer.write(">", "stdio", msg)
+                proc.stdin.write(line)
+                proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            done.set()
+
+    def pump_out():
+        for line in iter(proc.stdout.readline, b""):
+            sys.stdout.buffer.write(line)
+            sys.stdout.buffer.flush()
+            msg = _parse_line(line)
+            if msg is not None:
+                writer.write("<", "stdio", msg)
+
+    threading.Thread(target=pump_in, daemon=True).start()
+    out_thread = threading.Thread(target=pump_out, daemon=True)
+    out_thread.start()
+    _wait_for_stop(done)
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.terminate()
+        proc.wait()
+    out_thread.join(timeout=5)
+    writer.close()
+    return proc.returncode or 0
+
+
+# Recording: HTTP
+
+
+def _sse_messages(raw: str) -> List[Any]:
+    out = []
+    for frame in raw.replace("\r\n", "\n").split("\n\n"):
+        data = "".join(
+            line[len("data:") :].strip()
+            for line in frame.split("\n")
+            if line.startswith("data:")
+        )
+        if data:
+            try:
+                out.append(json.loads(data))
+            except ValueError:
+                pass
+    return out
+
+
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length"}
+
+
+def make_proxy_handler(target: str, writer: TraceWriter):
+    parts = urlsplit(target)
+    local = threading.local()
+
+    def upstream() -> http.client.HTTPConnection:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(
+                parts.hostname, parts.port or 80, timeout=300
+            )
+            local.conn = conn
+        return conn
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def _forward(self, body: Optional[bytes]):
+            headers = {
+                k: v
+                for k, v in self.headers.items()
+                if k.lower() not in _HOP_HEADERS and k.lower() != "host"
+            }
+            for attempt in (0, 1):
+                conn = upstream()
+                try:
+                    conn.request(self.command, self.path, body=body, headers=headers)
+                    return conn.getresponse()
+                except (http.client.HTTPException, ConnectionError):
+                    conn.close()
+                    local.conn = None
+                    if attempt:
+                        raise
+            raise RuntimeError("unreachable")
+
+        def _relay(self, resp: http.client.HTTPResponse, body: bytes):
+            self.send_response(resp.status, resp.reason)
+            for k, v in resp.getheaders():
+                if k.lower() not in _HOP_HEADERS:
+                    self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            session = self.headers.get("Mcp-Session-Id")
+            try:
+                msg = json.loads(body)
+            except ValueError:
+                msg = None
+            # Until the server assigns a session, key by client connection
+            key = session or f"conn-{self.client_address[1]}"
+            if msg is not None:
+                writer.write(">", key, msg)
+            resp = self._forward(body)
+            data = resp.read()
+            session = resp.getheader("Mcp-Session-Id") or session
+            if session and key != session:
+                writer.write("=", key, {"session": session})
+            ctype = resp.getheader("Content-Type", "")
+            text = data.decode("utf-8", errors="replace")
+            if ctype.startswith("text/event-stream"):
+                for m in _sse_messages(text):
+                    writer.write("<", session or key, m)
+            elif ctype.startswith("application/json") and text.strip():
+                try:
+                    writer.write("<", session or key, json.loads(text))
+                except ValueError:
+                    pass
+            self._relay(resp, data)
+
+        def do_DELETE(self):
+            session = self.headers.get("Mcp-Session-Id")
+            if session:
+                writer.write("x", session, {})
+            resp = self._forward(None)
+            self._relay(resp, resp.read())
+
+        def do_GET(self):
+            # Server-to-client streams and /health are passed through as-is
+            resp = self._forward(None)
+            self.send_response(resp.status, resp.reason)
+            for k, v in resp.getheaders():
+                if k.lower() not in _HOP_HEADERS:
+                    self.send_header(k, v)
+            length = resp.getheader("Content-Length")
+            if length is not None:
+                self.send_header("Content-Length", length)
+                self.end_headers()
+                self.wfile.write(resp.read())
+                return
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                while True:
+                    chunk = resp.read1(65536)
+                    if not chunk:
+                        break
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                local.conn = None
+
+    return Handler
+
+
+def record_http(args) -> int:
+    writer = TraceWriter(Path(args.out), "http", args.full, target=args.target)
+    httpd = ThreadingHTTPServer(
+        ("127.0.0.1", args.listen), make_proxy_handler(args.target, writer)
+    )
+    httpd.daemon_threads = True
+    print(
+        f"recording http://127.0.0.1:{args.listen} -> {args.target} into {args.out}",
+        file=sys.stderr,
+    )
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    _wait_for_stop(threading.Event())
+    httpd.shutdown()
+    httpd.server_close()
+    writer.close()
+    return 0
+
+
+# Replay
+
+
+def load_trace(path: Path) -> Dict[str, Any]:
+    """Header plus per-session client messages with recorded latencies"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        records = [json.loads(line) for line in f if line.strip()]
+    alias: Dict[str, str] = {}
+    for r in records:
+        if r["d"] == "=":
+            alias[r["s"]] = r["m"]["session"]
+    sessions: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[tuple, Dict[str, Any]] = {}
+    for r in records:
+        key = alias.get(r["s"], r["s"])
+        sess = sessions.setdefault(key, {"start": r["t"], "steps": []})
+        msg = r["m"]
+        if r["d"] == ">" and isinstance(msg, dict) and "method" in msg:
+            step = {"t": r["t"] - sess["start"], "msg": msg, "recorded_ms": None}
+            sess["steps"].append(step)
+            if "id" in msg:
+                pending[(key, json.dumps(msg["id"]))] = step
+        elif r["d"] == "<" and isinstance(msg, dict) and "id" in msg:
+            step = pending.pop((key, json.dumps(msg["id"])), None)
+            if step is not None:
+                step["recorded_ms"] = r["t"] - sess["start"] - step["t"]
+    sessions = {k: v for k, v in sessions.items() if v["steps"]}
+    t0 = min((s["start"] for s in sessions.values()), default=0.0)
+    for s in sessions.values():
+        s["start"] -= t0
+    return {"header": header, "sessions": sessions}
+
+
+def op_name(msg: Dict[str, Any]) -> str:
+    if msg.get("method") == "tools/call":
+        return "tools/call:" + str((msg.get("params") or {}).get("name"))
+    return msg.get("method", "?")
+
+
+class SessionReplay(threading.Thread):
+    def __init__(self, session: Dict[str, Any], args, start_at: float, copy: int):
+        super().__init__(daemon=True)
+        self.session = session
+        self.args = args
+        self.start_at = start_at
+        self.copy = copy
+        self.results: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    def _client(self):
+        if self.args.url:
+            return McpHttpSession(self.args.url, client_name="replay")
+        return McpStdioSession(shlex.split(self.args.cmd), client_name="replay")
+
+    def run(self):
+        scale = 0.0 if self.args.max else self.args.scale
+        client = None
+        try:
+            client = self._client()
+            for step in self.session["steps"]:
+                due = self.start_at + step["t"] * scale / 1000.0
+                lag = 0.0
+                if scale:
+                    wait = due - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    else:
+                        lag = -wait * 1000.0
+                msg = step["msg"]
+                if "id" not in msg:
+                    client.notify(msg["method"], msg.get("params"))
+                    continue
+                t1 = time.perf_counter()
+                ok = True
+                try:
+                    resp = client.request(msg["method"], msg.get("params"))
+                    ok = "error" not in resp and not (resp.get("result") or {}).get(
+                        "isError"
+                    )
+                except Exception:
+                    ok = False
+                self.results.append(
+                    {
+                        "op": op_name(msg),
+                        "ms": (time.perf_counter() - t1) * 1000.0,
+                        "recorded_ms": step["recorded_ms"],
+                        "lag_ms": lag,
+                        "ok": ok,
+                    }
+                )
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+
+def replay(args) -> int:
+    if bool(args.url) == bool(args.cmd):
+        raise SystemExit("replay needs exactly one of --url or --cmd")
+    trace = load_trace(Path(args.trace))
+    sessions = trace["sessions"]
+    if not sessions:
+        raise SystemExit("trace contains no client requests")
+    copies = args.copies if args.max else 1
+    scale = 0.0 if args.max else args.scale
+    mode = f"max x{copies}" if args.max else f"scale {scale:g}"
+    n_msgs = sum(len(s["steps"]) for s in sessions.values())
+    print(f"replaying {len(sessions)} sessions, {n_msgs} messages ({mode})")
+
+    t0 = time.perf_counter() + 0.1
+    workers = [
+        SessionReplay(s, args, t0 + s["start"] * scale / 1000.0, c)
+        for c in range(copies)
+        for s in sessions.values()
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+
+    by_op: Dict[str, List[Dict[str, Any]]] = {}
+    for w in workers:
+        for r in w.results:
+            by_op.setdefault(r["op"], []).append(r)
+    rows, report = [], {"mode": mode, "wall_s": wall, "ops": {}}
+    for op, rs in sorted(by_op.items()):
+        rep = latency_summary([r["ms"] for r in rs])
+        rec = latency_summary(
+            [r["recorded_ms"] for r in rs if r["recorded_ms"] is not None]
+        )
+        lag = latency_summary([r["lag_ms"] for r in rs])
+        errors = sum(1 for r in rs if not r["ok"])
+        delta = (rep["p50"] / rec["p50"] - 1.0) * 100.0 if rec.get("p50") else None
+        report["ops"][op] = {
+            "replayed": rep,
+            "recorded": rec,
+            "lag": lag,
+            "errors": errors,
+        }
+        rows.append(
+            [
+                op,
+                len(rs),
+                errors,
+                fmt_num(rec.get("p50")),
+                fmt_num(rep.get("p50")),
+                fmt_num(delta),
+                fmt_num(rec.get("p95")),
+                fmt_num(rep.get("p95")),
+                fmt_num(lag.get("p95")),
+            ]
+        )
+    print(
+        format_table(
+            [
+                "op",
+                "n",
+                "err",
+                "rec p50",
+                "p50",
+                "delta %",
+                "rec p95",
+                "p95",
+                "lag p95",
+            ],
+            rows,
+        )
+    )
+    total = sum(len(w.results) for w in workers)
+    print(f"\n{total} requests in {wall:.2f} s ({total / wall:.1f}/s)")
+    failed = [w for w in workers if w.error]
+    for w in failed:
+        print(f"session copy {w.copy} aborted: {w.error}")
+    report["requests"] = total
+    report["aborted_sessions"] = len(failed)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.json}")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON-RPC recorder and replayer")
+    sub = parser.add_subparsers(dest="cmd_name", required=True)
+
+    p = sub.add_parser("record-stdio", help="proxy a stdio server and record")
+    p.add_argument("--out", required=True)
+    p.add_argument("--full", action="store_true", help="keep large payloads")
+    p.add_argument("command", nargs=argparse.REMAINDER)
+
+    p = sub.add_parser("record-http", help="reverse-proxy an HTTP server and record")
+    p.add_argument("--listen", type=int, default=3100)
+    p.add_argument("--target", default="http://127.0.0.1:3000")
+    p.add_argument("--out", required=True)
+    p.add_argument("--full", action="store_true", help="keep large payloads")
+
+    p = sub.add_parser("replay", help="play a trace back against a server")
+    p.add_argument("trace")
+    p.add_argument("--url", help="Streamable HTTP endpoint to replay against")
+    p.add_argument("--cmd", help="stdio server command (one process per session)")
+    p.add_argument("--scale", type=float, default=1.0, help="multiply recorded gaps")
+    p.add_argument("--max", action="store_true", help="no waits; use --copies")
+    p.add_argument("--copies", type=int, default=1, help="parallel copies with --max")
+    p.add_argument("--json", help="write the report to this file")
+
+    args = parser.parse_args()
+    if args.cmd_name == "record-stdio":
+        if args.command and args.command[0] == "--":
+            args.command = args.command[1:]
+        if not args.command:
+            raise SystemExit("record-stdio needs a server command after --")
+        sys.exit(record_stdio(args))
+    if args.cmd_name == "record-http":
+        sys.exit(record_http(args))
+    sys.exit(replay(args))
+
+
+if __name__ == "__main__":
+    main()
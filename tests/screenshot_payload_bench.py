@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Screenshot payload and encode-cost benchmark across resolutions
+
+For each display layout (720p up to 5K, plus Xinerama multi-monitor layouts)
+this starts a private Xvfb, then measures:
+
+- capture time: the capture tool the server falls back to under X11
+  (ImageMagick `import -window root png:-`), run directly
+- raw PNG size
+- base64 size and the full JSON-RPC payload size as received over
+  stdio and over Streamable HTTP
+- client decode time: JSON parse of the envelope, JSON parse of the text
+  block, and base64 decode, measured separately
+- end-to-end take_screenshot latency over stdio and over HTTP
+
+The report also shows what the text encoding costs: payload bytes per PNG
+byte and the share of end-to-end time spent decoding on the client.
+System.Text.Json escapes '+' as \\u002B by default, so the escape count is
+reported too.
+
+Example:
+    python3 screenshot_payload_bench.py --iterations 10 \\
+        --layouts 1280x720,1920x1080,3840x2160,5120x2880,1920x1080+1920x1080
+"""
+
+import argparse
+import base64
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from perf_common import (
+    McpHttpSession,
+    McpStdioSession,
+    format_table,
+    free_port,
+    latency_summary,
+    tool_json,
+    wait_for_http,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BIN = ROOT / "build" / "publish" / "overlay-companion-mcp"
+DEFAULT_LAYOUTS = (
+    "1280x720,1920x1080,2560x1440,3840x2160,5120x2880,"
+    "1920x1080+1920x1080,1920x1080+1920x1080+1920x1080,1920x1080+3840x2160"
+)
+
+
+def parse_layout(spec: str):
+    """Parse "1920x1080+2560x1440" into [(1920, 1080), (2560, 1440)]."""
+    screens = []
+    for part in spec.split("+"):
+        w, h = part.lower().split("x")
+        screens.append((int(w), int(h)))
+    return screens
+
+
+def start_xvfb(screens):
+    """Start Xvfb on a free display number; returns (proc, ':N')"""
+    read_fd, write_fd = os.pipe()
+    cmd = ["Xvfb", "-displayfd", str(write_fd), "-nolisten", "tcp"]
+    if len(screens) > 1:
+        cmd.append("+xinerama")
+    for i, (w, h) in enumerate(screens):
+        cmd += ["-screen", str(i), f"{w}x{h}x24"]
+    proc = subprocess.Popen(
+        cmd, pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as r:
+        number = r.readline().strip()
+    if not number:
+        proc.kill()
+        raise RuntimeError("Xvfb failed to start")
+    return proc, f":{number}"
+
+
+def stop_proc(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def set_background(display, image):
+    if image and shutil.which("display"):
+        subprocess.run(
+            ["display", "-window", "root", str(image)],
+            env={**os.environ, "DISPLAY": display},
+            timeout=30,
+            check=False,
+        )
+
+
+def bench_capture(display, iterations):
+    env = {**os.environ, "DISPLAY": display}
+    times, png = [], b""
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        out = subprocess.run(
+            ["import", "-window", "root", "png:-"], env=env, capture_output=True
+        )
+        times.append((time.perf_counter() - t0) * 1000.0)
+        png = out.stdout or png
+    return times, png
+
+
+def decode_costs(raw: str):
+    """Time each client-side decode stage of one take_screenshot response"""
+    t0 = time.perf_counter()
+    envelope = json.loads(raw)
+    t1 = time.perf_counter()
+    text = envelope["result"]["content"][0]["text"]
+    inner = json.loads(text)
+    t2 = time.perf_counter()
+    img = base64.b64decode(inner.get("image_base64") or "")
+    t3 = time.perf_counter()
+    return {
+        "envelope_parse_ms": (t1 - t0) * 1000.0,
+        "text_parse_ms": (t2 - t1) * 1000.0,
+        "b64_decode_ms": (t3 - t2) * 1000.0,
+        "png_bytes": len(img),
+        "b64_bytes": len(inner.get("image_base64") or ""),
+        "escapes": raw.count("\\\\u002B") + raw.count("\\\\u002b"),
+    }
+
+
+def bench_transport(client, iterations):
+    client.initialize()
+    client.call_tool("take_screenshot", {})  # warm-up (JIT, first capture)
+    e2e, payload, decode = [], 0, None
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        resp = client.call_tool("take_screenshot", {})
+        e2e.append((time.perf_counter() - t0) * 1000.0)
+        if not tool_json(resp).get("image_base64"):
+            raise RuntimeError("take_screenshot returned no image")
+        payload = len(client.last_raw.encode("utf-8"))
+        decode = decode_costs(client.last_raw)
+    return {"e2e_ms": latency_summary(e2e), "payload_bytes": payload, **decode}
+
+
+def bench_layout(args, spec):
+    screens = parse_layout(spec)
+    xvfb, display = start_xvfb(screens)
+    result = {
+        "layout": spec,
+        "pixels": sum(w * h for w, h in screens),
+        "display": display,
+    }
+    try:
+        set_background(display, args.background)
+        cap_ms, png = bench_capture(display, args.iterations)
+        result["capture_ms"] = latency_summary(cap_ms)
+        result["png_bytes"] = len(png)
+
+        env = {**os.environ, "DISPLAY": display}
+        if "stdio" in args.transports:
+            client = McpStdioSession([str(args.bin), "--stdio"], env=env, timeout=60)
+            try:
+                result["stdio"] = bench_transport(client, args.iterations)
+            except Exception as e:
+                result["stdio"] = {"error": str(e)}
+            finally:
+                client.close()
+
+        if "http" in args.transports:
+            port = free_port()
+            server = subprocess.Popen(
+                [str(args.bin), "--http"],
+                env={**env, "PORT": str(port)},
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            url = f"http://127.0.0.1:{port}/mcp"
+            try:
+                wait_for_http(url, timeout=60)
+                client = McpHttpSession(url, timeout=60)
+                try:
+                    result["http"] = bench_transport(client, args.iterations)
+                finally:
+                    client.close()
+            except Exception as e:
+                result["http"] = {"error": str(e)}
+            finally:
+                stop_proc(server)
+    finally:
+        stop_proc(xvfb)
+    return result
+
+
+def report(results):
+    rows = []
+    for r in results:
+        png = r.get("png_bytes") or 0
+        row = [
+            r["layout"],
+            f"{r['pixels'] / 1e6:.1f}",
+            r["capture_ms"].get("p50"),
+            png / 1024.0,
+        ]
+        for name in ("stdio", "http"):
+            t = r.get(name) or {}
+            if "e2e_ms" not in t:
+                row += [None, None, None, None]
+                continue
+            decode_ms = t["envelope_parse_ms"] + t["text_parse_ms"] + t["b64_decode_ms"]
+            row += [
+                t["payload_bytes"] / 1024.0,
+                t["payload_bytes"] / t["png_bytes"] if t["png_bytes"] else None,
+                t["e2e_ms"].get("p50"),
+                100.0 * decode_ms / t["e2e_ms"]["p50"],
+            ]
+        rows.append(row)
+    print(
+        format_table(
+            ["layout", "MPix", "capture p50", "png KiB"]
+            + ["stdio KiB", "stdio x", "stdio p50", "stdio dec%"]
+            + ["http KiB", "http x", "http p50", "http dec%"],
+            rows,
+        )
+    )
+    print(
+        "\nx = payload bytes per PNG byte (base64 + JSON escaping overhead); "
+        "dec% = client decode time as a share of p50 end-to-end latency"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screenshot payload benchmark")
+    parser.add_argument("--bin", type=Path, default=DEFAULT_BIN)
+    parser.add_argument("--layouts", default=DEFAULT_LAYOUTS)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--transports", default="stdio,http")
+    parser.add_argument(
+        "--background", type=Path, help="image to paint on the root window"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    for tool in ("Xvfb", "import"):
+        if not shutil.which(tool):
+            raise SystemExit(f"{tool} is required (apt-get install xvfb imagemagick)")
+    if not args.bin.exists():
+        raise SystemExit(f"server binary not found: {args.bin}")
+
+    results = []
+    for spec in args.layouts.split(","):
+        print(f"layout {spec} ...")
+        results.append(bench_layout(args, spec))
+    print()
+    report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
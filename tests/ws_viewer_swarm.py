@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+WebSocket viewer swarm benchmark for overlay event fan-out
+
+Connects hundreds or thousands of passive viewers to /ws/overlays (served by
+OverlayEventBroadcaster / OverlayWebSocketHub), a configurable fraction of
+which are deliberately slow readers, then drives overlay churn through MCP
+(draw_overlay with a known id, then remove_overlay). Every received event is
+timestamped on arrival and matched to the tool call that caused it, giving
+the delivery latency from tool call start to each viewer.
+
+Viewers are spread over several worker processes, each with its own asyncio
+loop, so client-side parsing does not dominate the measurement. All
+timestamps use CLOCK_MONOTONIC, which is shared across processes on Linux.
+
+Run with several viewer counts to see how fan-out degrades:
+    python3 ws_viewer_swarm.py --url http://localhost:3000/mcp \\
+        --viewers 100,500,2000 --slow-fraction 0.05 --slow-delay-ms 200
+
+Requires: pip install websockets requests
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import resource
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from perf_common import McpHttpSession, format_table, is_error, latency_summary
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - optional dependency
+    websockets = None
+
+
+def ws_url_for(mcp_url: str, path: str, token: str = "") -> str:
+    parts = urlsplit(mcp_url)
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    query = f"token={token}" if token else ""
+    return urlunsplit((scheme, parts.netloc, path, query, ""))
+
+
+def event_key(raw):
+    """(kind, overlay_id) for overlay events in either broadcaster's shape"""
+    try:
+        msg = json.loads(raw)
+    except ValueError:
+        return None
+    kind = msg.get("type")
+    if kind in ("overlay_created", "overlay_updated"):
+        ov = msg.get("overlay") or {}
+        oid = ov.get("id") or ov.get("Id")
+    elif kind == "overlay_removed":
+        oid = msg.get("overlay_id") or msg.get("overlayId")
+    else:
+        return None
+    return (kind, oid) if oid else None
+
+
+async def _viewer(idx, uri, slow_delay, records, stop, connect_sem, ready):
+    rec = {
+        "idx": idx,
+        "slow": slow_delay > 0,
+        "connected": False,
+        "disconnected": False,
+        "events": [],
+    }
+    records.append(rec)
+    async with connect_sem:
+        try:
+            ws = await websockets.connect(
+                uri,
+                open_timeout=15,
+                ping_interval=None,
+                # Slow readers must not be hidden by client-side buffering
+                max_queue=1 if slow_delay > 0 else 64,
+            )
+        except Exception as e:
+            rec["connect_error"] = str(e)
+            ready.append(idx)
+            return
+    rec["connected"] = True
+    ready.append(idx)
+    try:
+        async for raw in ws:
+            t = time.monotonic()
+            key = event_key(raw)
+            if key:
+                rec["events"].append((key[0], key[1], t))
+            if slow_delay > 0:
+                await asyncio.sleep(slow_delay)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        rec["disconnected"] = not stop.is_set()
+        await ws.close()
+
+
+async def _worker_main(uri, viewers, slow_delay, ready_q, stop_evt, result_q):
+    records, ready = [], []
+    stop = asyncio.Event()
+    sem = asyncio.Semaphore(64)
+    tasks = [
+        asyncio.create_task(
+            _viewer(i, uri, slow_delay if slow else 0.0, records, stop, sem, ready)
+        )
+        for i, slow in viewers
+    ]
+    while len(ready) < len(viewers):
+        await asyncio.sleep(0.05)
+    ready_q.put(sum(1 for r in records if r["connected"]))
+    while not stop_evt.is_set():
+        await asyncio.sleep(0.05)
+    stop.set()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    result_q.put(records)
+
+
+def _worker(uri, viewers, slow_delay, ready_q, stop_evt, result_q):
+    asyncio.run(_worker_main(uri, viewers, slow_delay, ready_q, stop_evt, result_q))
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def drive_churn(url, ops, rate, live, run_tag):
+    """Draw/remove overlays with known ids; returns {(kind, id): call start}"""
+    client = McpHttpSession(url, client_name="ws-swarm")
+    client.initialize()
+    calls, errors = {}, 0
+    drawn = []
+    interval = 1.0 / rate
+    next_at = time.monotonic()
+    try:
+        for i in range(ops):
+            now = time.monotonic()
+            if next_at > now:
+                time.sleep(next_at - now)
+            next_at += interval
+            if len(drawn) >= live:
+                oid = drawn.pop(0)
+                t0 = time.monotonic()
+                resp = client.call_tool(
+                    "remove_overlay", {"overlayId": oid, "overlay_id": oid}
+                )
+                calls[("overlay_removed", oid)] = t0
+            else:
+                oid = f"swarm-{run_tag}-{i}"
+                t0 = time.monotonic()
+                resp = client.call_tool(
+                    "draw_overlay",
+                    {
+                        "id": oid,
+                        "x": (i * 37) % 1600,
+                        "y": (i * 23) % 900,
+                        "width": 120,
+                        "height": 80,
+                        "color": "#FF00FF",
+                        "opacity": 1.0,
+                    },
+                )
+                calls[("overlay_created", oid)] = t0
+                drawn.append(oid)
+            errors += is_error(resp)
+        for oid in drawn:
+            t0 = time.monotonic()
+            client.call_tool("remove_overlay", {"overlayId": oid, "overlay_id": oid})
+            calls[("overlay_removed", oid)] = t0
+    finally:
+        client.close()
+    return calls, errors
+
+
+def run_round(args, n_viewers, run_tag):
+    uri = ws_url_for(args.url, args.ws_path, args.token)
+    n_slow = int(round(n_viewers * args.slow_fraction))
+    # Spread slow viewers evenly rather than bunching them in one worker
+    slow_every = n_viewers // n_slow if n_slow else 0
+    viewers = [
+        (i, bool(slow_every) and i % slow_every == 0 and i // slow_every < n_slow)
+        for i in range(n_viewers)
+    ]
+    workers = max(1, min(args.workers, n_viewers))
+    shards = [viewers[w::workers] for w in range(workers)]
+
+    ctx = mp.get_context("spawn")
+    ready_q, result_q, stop_evt = ctx.Queue(), ctx.Queue(), ctx.Event()
+    procs = [
+        ctx.Process(
+            target=_worker,
+            args=(uri, shard, args.slow_delay_ms / 1000.0, ready_q, stop_evt, result_q),
+            daemon=True,
+        )
+        for shard in shards
+    ]
+    for p in procs:
+        p.start()
+    connected = sum(ready_q.get(timeout=120) for _ in procs)
+
+    calls, call_errors = drive_churn(args.url, args.ops, args.rate, args.live, run_tag)
+    time.sleep(args.drain)
+    stop_evt.set()
+    records = []
+    for _ in procs:
+        records.extend(result_q.get(timeout=60))
+    for p in procs:
+        p.join(timeout=10)
+
+    fast_lat, slow_lat, per_viewer_p99 = [], [], []
+    missing = 0
+    for rec in records:
+        if not rec["connected"]:
+            continue
+        seen = {}
+        for kind, oid, t in rec["events"]:
+            t0 = calls.get((kind, oid))
+            if t0 is not None and (kind, oid) not in seen:
+                seen[(kind, oid)] = (t - t0) * 1000.0
+        missing += len(calls) - len(seen)
+        lat = list(seen.values())
+        (slow_lat if rec["slow"] else fast_lat).extend(lat)
+        if lat:
+            per_viewer_p99.append(latency_summary(lat)["p99"])
+
+    return {
+        "viewers": n_viewers,
+        "slow_viewers": sum(1 for _, slow in viewers if slow),
+        "connected": connected,
+        "connect_failures": n_viewers - connected,
+        "disconnected": sum(1 for r in records if r["disconnected"]),
+        "events_expected": len(calls) * connected,
+        "events_missing": missing,
+        "tool_errors": call_errors,
+        "latency_fast_ms": latency_summary(fast_lat),
+        "latency_slow_ms": latency_summary(slow_lat),
+        "viewer_p99_spread_ms": latency_summary(per_viewer_p99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket viewer swarm benchmark")
+    parser.add_argument("--url", default="http://localhost:3000/mcp")
+    parser.add_argument("--ws-path", default="/ws/overlays")
+    parser.add_argument("--token", default="", help="viewer token if protected")
+    parser.add_argument("--viewers", default="100,500,1000", help="comma list")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-delay-ms", type=float, default=200.0)
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--ops", type=int, default=200, help="tool calls per round")
+    parser.add_argument("--rate", type=float, default=20.0, help="tool calls/s")
+    parser.add_argument("--live", type=int, default=20, help="overlays kept alive")
+    parser.add_argument("--drain", type=float, default=5.0, help="seconds after churn")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if websockets is None:
+        raise SystemExit("websockets is required: pip install websockets")
+    raise_fd_limit()
+
+    results = []
+    for n, count in enumerate(int(v) for v in args.viewers.split(",")):
+        print(f"round {n}: {count} viewers ...")
+        results.append(run_round(args, count, f"{int(time.time())}-{n}"))
+
+    rows = []
+    for r in results:
+        f, s = r["latency_fast_ms"], r["latency_slow_ms"]
+        rows.append(
+            [r["viewers"], r["connected"], r["disconnected"], r["events_missing"]]
+            + [f.get("p50"), f.get("p99"), f.get("max"), s.get("p50"), s.get("p99")]
+        )
+    print(
+        format_table(
+            ["viewers", "connected", "dropped", "missing", "fast p50", "fast p99"]
+            + ["fast max", "slow p50", "slow p99"],
+            rows,
+        )
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()